@@ -1,3 +1,5 @@
+import atexit
+
 from flask import Flask
 from flask_restx import Api
 
@@ -24,4 +26,16 @@ def create_app(config_name: str = "development") -> Flask:
 	api.add_namespace(places_ns, path="/api/v1/places")
 	api.add_namespace(reviews_ns, path="/api/v1/reviews")
 
+	from config import config
+	settings = config.get(config_name, config["default"])
+	if settings.DATA_DIR:
+		from app.persistence.journal import Journal
+		from app.persistence.repository import repository
+		if repository.journal is None:
+			journal = Journal(repository, settings.DATA_DIR,
+			                  interval=settings.SNAPSHOT_INTERVAL, fsync=settings.WAL_FSYNC)
+			journal.open()
+			atexit.register(journal.close)
+		app.extensions["journal"] = repository.journal
+
 	return app
@@ -2,6 +2,7 @@ from http import HTTPStatus
 from flask import request
 from flask_restx import Namespace, Resource, fields
 
+from app.api.v1.pagination import paginate
 from app.services.facade import facade
 
 api = Namespace("amenities", description="Amenity operations")
@@ -20,7 +21,11 @@ amenity_model = api.model(
 class AmenityList(Resource):
     @api.marshal_list_with(amenity_model)
     def get(self):
-        return [a.to_dict() for a in facade.list_amenities()]
+        try:
+            amenities, headers = paginate(facade.list_amenities)
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        return [a.to_dict() for a in amenities], HTTPStatus.OK, headers
 
     @api.expect(amenity_model, validate=True)
     @api.marshal_with(amenity_model, code=HTTPStatus.CREATED)
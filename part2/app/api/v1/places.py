@@ -2,7 +2,9 @@ from http import HTTPStatus
 from flask import request
 from flask_restx import Namespace, Resource, fields
 
+from app.api.v1.pagination import paginate
 from app.services.facade import facade
+from app.services.geo import haversine_km
 
 api = Namespace("places", description="Place operations")
 
@@ -30,26 +32,91 @@ place_model = api.model(
         "longitude": fields.Float,
         "owner_id": fields.String,
         "amenity_ids": fields.List(fields.String),
+        "review_count": fields.Integer,
+        "avg_rating": fields.Float,
         "owner": fields.Raw,
         "amenities": fields.List(fields.Raw),
     },
 )
 
+place_distance_model = api.clone("PlaceDistance", place_model, {"distance_km": fields.Float})
+
+price_band_model = api.model(
+    "PriceBand",
+    {
+        "low": fields.Float,
+        "high": fields.Float,
+        "count": fields.Integer,
+    },
+)
+
+MAX_RADIUS_KM = 1000
+MAX_BINS = 100
+
+
+def _float_arg(name, required=False, low=None, high=None):
+    raw = request.args.get(name)
+    if raw is None:
+        if required:
+            raise ValueError(f"{name} is required")
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number") from None
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def _search_places(limit, after):
+    return facade.search_places(
+        min_price=_float_arg("min_price"),
+        max_price=_float_arg("max_price"),
+        q=request.args.get("q"),
+        amenity=request.args.get("amenity"),
+        sort=request.args.get("sort"),
+        limit=limit,
+        after=after,
+    )
+
+
+def _serialize_places(places):
+    """Serialize places, resolving every owner and amenity in one pass."""
+    owners = facade.get_users({p.owner_id for p in places})
+    amenities = facade.get_amenities({aid for p in places for aid in p.amenity_ids})
+    # Each related entity is converted once, however many places share it.
+    owner_dicts = {oid: o.to_dict() for oid, o in owners.items()}
+    amenity_dicts = {aid: a.to_dict() for aid, a in amenities.items()}
+    result = []
+    for place in places:
+        data = place.to_dict()
+        data["owner"] = owner_dicts.get(place.owner_id)
+        data["amenities"] = [amenity_dicts[aid] for aid in place.amenity_ids if aid in amenity_dicts]
+        result.append(data)
+    return result
+
 
 def _serialize_place(place):
-    data = place.to_dict()
-    owner = facade.get_user(place.owner_id)
-    data["owner"] = owner.to_dict() if owner else None
-    amenities = [facade.get_amenity(aid) for aid in place.amenity_ids]
-    data["amenities"] = [a.to_dict() for a in amenities if a]
-    return data
+    return _serialize_places([place])[0]
 
 
 @api.route("")
 class PlaceList(Resource):
+    @api.doc(params={
+        "min_price": "Lowest price to include",
+        "max_price": "Highest price to include",
+        "q": "Text to look for in the title or description",
+        "amenity": "Only places offering this amenity id",
+        "sort": "price or -price",
+    })
     @api.marshal_list_with(place_model)
     def get(self):
-        return [_serialize_place(p) for p in facade.list_places()]
+        try:
+            places, headers = paginate(_search_places)
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        return _serialize_places(places), HTTPStatus.OK, headers
 
     @api.expect(place_payload, validate=True)
     @api.marshal_with(place_model, code=HTTPStatus.CREATED)
@@ -69,6 +136,91 @@ class PlaceList(Resource):
         return _serialize_place(place), HTTPStatus.CREATED
 
 
+@api.route("/nearby")
+class PlaceNearby(Resource):
+    @api.doc(params={
+        "lat": "Latitude of the centre point",
+        "lon": "Longitude of the centre point",
+        "radius_km": f"Search radius in kilometres (max {MAX_RADIUS_KM})",
+    })
+    @api.marshal_list_with(place_distance_model)
+    def get(self):
+        try:
+            lat = _float_arg("lat", required=True, low=-90, high=90)
+            lon = _float_arg("lon", required=True, low=-180, high=180)
+            radius_km = _float_arg("radius_km", required=True, low=0, high=MAX_RADIUS_KM)
+            places, headers = paginate(
+                lambda limit, after: facade.places_nearby(lat, lon, radius_km, limit, after)
+            )
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        result = _serialize_places(places)
+        for data, place in zip(result, places):
+            data["distance_km"] = round(haversine_km(lat, lon, place.latitude, place.longitude), 3)
+        return result, HTTPStatus.OK, headers
+
+
+@api.route("/price-histogram")
+class PlacePriceHistogram(Resource):
+    @api.doc(params={
+        "bins": f"Number of equal-width price bands (1-{MAX_BINS}, default 10)",
+        "min_price": "Start of the first band (default: lowest price)",
+        "max_price": "End of the last band (default: highest price)",
+    })
+    @api.marshal_list_with(price_band_model)
+    def get(self):
+        try:
+            bins = int(_float_arg("bins", low=1, high=MAX_BINS) or 10)
+            bands = facade.price_histogram(
+                bins, _float_arg("min_price"), _float_arg("max_price")
+            )
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        return [{"low": low, "high": high, "count": count} for low, high, count in bands]
+
+
+@api.route("/search")
+class PlaceSearch(Resource):
+    @api.doc(params={"q": "Words that must all appear in the title or description"})
+    @api.marshal_list_with(place_model)
+    def get(self):
+        query = (request.args.get("q") or "").strip()
+        if not query:
+            api.abort(HTTPStatus.BAD_REQUEST, "q is required")
+        try:
+            places, headers = paginate(
+                lambda limit, after: facade.search_place_text(query, limit, after)
+            )
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        return _serialize_places(places), HTTPStatus.OK, headers
+
+
+@api.route("/bbox")
+class PlaceBoundingBox(Resource):
+    @api.doc(params={
+        "min_lat": "Southern edge",
+        "min_lon": "Western edge (greater than max_lon to cross the antimeridian)",
+        "max_lat": "Northern edge",
+        "max_lon": "Eastern edge",
+    })
+    @api.marshal_list_with(place_model)
+    def get(self):
+        try:
+            box = [
+                _float_arg("min_lat", required=True, low=-90, high=90),
+                _float_arg("min_lon", required=True, low=-180, high=180),
+                _float_arg("max_lat", required=True, low=-90, high=90),
+                _float_arg("max_lon", required=True, low=-180, high=180),
+            ]
+            places, headers = paginate(
+                lambda limit, after: facade.places_in_bbox(*box, limit=limit, after=after)
+            )
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        return _serialize_places(places), HTTPStatus.OK, headers
+
+
 @api.route("/<string:place_id>")
 @api.response(HTTPStatus.NOT_FOUND, "Place not found")
 class PlaceResource(Resource):
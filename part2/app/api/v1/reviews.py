@@ -2,6 +2,7 @@ from http import HTTPStatus
 from flask import request
 from flask_restx import Namespace, Resource, fields
 
+from app.api.v1.pagination import paginate
 from app.services.facade import facade
 
 api = Namespace("reviews", description="Review operations")
@@ -22,7 +23,11 @@ review_model = api.model(
 class ReviewList(Resource):
     @api.marshal_list_with(review_model)
     def get(self):
-        return [r.to_dict() for r in facade.list_reviews()]
+        try:
+            reviews, headers = paginate(facade.list_reviews)
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        return [r.to_dict() for r in reviews], HTTPStatus.OK, headers
 
     @api.expect(review_model, validate=True)
     @api.marshal_with(review_model, code=HTTPStatus.CREATED)
@@ -39,6 +44,23 @@ class ReviewList(Resource):
         return review.to_dict(), HTTPStatus.CREATED
 
 
+@api.route("/search")
+class ReviewSearch(Resource):
+    @api.doc(params={"q": "Words that must all appear in the review text"})
+    @api.marshal_list_with(review_model)
+    def get(self):
+        query = (request.args.get("q") or "").strip()
+        if not query:
+            api.abort(HTTPStatus.BAD_REQUEST, "q is required")
+        try:
+            reviews, headers = paginate(
+                lambda limit, after: facade.search_review_text(query, limit, after)
+            )
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        return [r.to_dict() for r in reviews], HTTPStatus.OK, headers
+
+
 @api.route("/<string:review_id>")
 @api.response(HTTPStatus.NOT_FOUND, "Review not found")
 class ReviewResource(Resource):
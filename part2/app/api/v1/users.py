@@ -2,6 +2,7 @@ from http import HTTPStatus
 from flask import request
 from flask_restx import Namespace, Resource, fields
 
+from app.api.v1.pagination import paginate
 from app.services.facade import facade
 
 api = Namespace("users", description="User operations")
@@ -33,7 +34,11 @@ user_model = api.model(
 class UserList(Resource):
     @api.marshal_list_with(user_model)
     def get(self):
-        return [u.to_dict() for u in facade.list_users()]
+        try:
+            users, headers = paginate(facade.list_users)
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
+        return [u.to_dict() for u in users], HTTPStatus.OK, headers
 
     @api.expect(user_payload, validate=True)
     @api.marshal_with(user_model, code=HTTPStatus.CREATED)
@@ -66,14 +71,17 @@ class UserResource(Resource):
     @api.marshal_with(user_model)
     def put(self, user_id: str):
         data = request.get_json(force=True)
-        user = facade.update_user(
-            user_id,
-            email=data.get("email"),
-            password=data.get("password"),
-            first_name=data.get("first_name"),
-            last_name=data.get("last_name"),
-            is_admin=data.get("is_admin"),
-        )
+        try:
+            user = facade.update_user(
+                user_id,
+                email=data.get("email"),
+                password=data.get("password"),
+                first_name=data.get("first_name"),
+                last_name=data.get("last_name"),
+                is_admin=data.get("is_admin"),
+            )
+        except ValueError as e:
+            api.abort(HTTPStatus.BAD_REQUEST, str(e))
         if not user:
             api.abort(HTTPStatus.NOT_FOUND, "User not found")
         return user.to_dict()
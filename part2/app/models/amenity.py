@@ -3,6 +3,9 @@ from app.models.base_model import BaseModel
 class Amenity(BaseModel):
     """Amenity entity."""
 
+    __slots__ = ("name", "description")
+    FIELDS = BaseModel.FIELDS + __slots__
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = (kwargs.get("name") or "").strip()
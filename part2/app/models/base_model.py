@@ -1,26 +1,104 @@
+import sys
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def _seconds(value):
+    """Store a timestamp as float seconds since the epoch (naive UTC)."""
+    if value is None or isinstance(value, float):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return (value - _EPOCH) / _SECOND
+    return float(value)
+
+
+def _datetime(seconds):
+    return None if seconds is None else _EPOCH + timedelta(seconds=seconds)
+
+
+def intern_id(value):
+    """Share one string object per id, so references to an entity cost no copy."""
+    return sys.intern(value) if type(value) is str else value
+
 
 class BaseModel:
-    """Base model with id and timestamps."""
+    """Base model with id and timestamps.
+
+    Models use ``__slots__`` so millions of them fit in memory: no
+    per-instance ``__dict__``, timestamps kept as float seconds (exposed as
+    ``datetime`` through properties) and ids interned so the entity and
+    every reference to it share one string. ``FIELDS`` lists the public
+    attributes that make up an entity's state.
+    """
+
+    __slots__ = ("id", "_created_at", "_updated_at")
+    FIELDS = ("id", "created_at", "updated_at")
 
     def __init__(self, **kwargs):
-        self.id = kwargs.get("id", str(uuid.uuid4()))
-        self.created_at = kwargs.get("created_at", datetime.utcnow())
-        self.updated_at = kwargs.get("updated_at", datetime.utcnow())
+        self.id = intern_id(kwargs.get("id", str(uuid.uuid4())))
+        now = time.time()
+        self._created_at = _seconds(kwargs.get("created_at", now))
+        self._updated_at = _seconds(kwargs.get("updated_at", now))
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every slot along the MRO, base first: the order of pickled state
+        cls._SLOTS = tuple(
+            name for klass in reversed(cls.__mro__) for name in klass.__dict__.get("__slots__", ())
+        )
+
+    @property
+    def created_at(self):
+        return _datetime(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = _seconds(value)
+
+    @property
+    def updated_at(self):
+        return _datetime(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = _seconds(value)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self._SLOTS)
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # Pickled before the models had slots: public attribute names
+            for name, value in state.items():
+                setattr(self, name, value)
+            return
+        for name, value in zip(self._SLOTS, state):
+            setattr(self, name, value)
 
     def to_dict(self) -> dict:
+        created_at, updated_at = self.created_at, self.updated_at
         return {
             "id": self.id,
-            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            "updated_at": self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at,
+            "created_at": created_at.isoformat() if created_at is not None else None,
+            "updated_at": updated_at.isoformat() if updated_at is not None else None,
         }
 
     def touch(self):
-        self.updated_at = datetime.utcnow()
+        self._updated_at = time.time()
 
     def update(self, **kwargs):
         for key, value in kwargs.items():
             if key not in {"id", "created_at"}:
                 setattr(self, key, value)
         self.touch()
+
+
+BaseModel._SLOTS = BaseModel.__slots__
@@ -1,8 +1,17 @@
-from app.models.base_model import BaseModel
+from app.models.base_model import BaseModel, intern_id
 
 class Place(BaseModel):
     """Place entity."""
 
+    __slots__ = (
+        "title", "description", "price", "latitude", "longitude", "owner_id",
+        "_amenity_ids", "review_count", "rating_sum",
+    )
+    FIELDS = BaseModel.FIELDS + (
+        "title", "description", "price", "latitude", "longitude", "owner_id",
+        "amenity_ids", "review_count", "rating_sum",
+    )
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.title = (kwargs.get("title") or "").strip()
@@ -10,8 +19,27 @@ class Place(BaseModel):
         self.price = float(kwargs.get("price", 0))
         self.latitude = float(kwargs.get("latitude", 0))
         self.longitude = float(kwargs.get("longitude", 0))
-        self.owner_id = (kwargs.get("owner_id") or "").strip()
-        self.amenity_ids = list(kwargs.get("amenity_ids", []))
+        self.owner_id = intern_id((kwargs.get("owner_id") or "").strip())
+        self.amenity_ids = kwargs.get("amenity_ids", ())
+        # Review aggregates, maintained by the facade as reviews change
+        self.review_count = int(kwargs.get("review_count", 0))
+        self.rating_sum = int(kwargs.get("rating_sum", 0))
+
+    @property
+    def amenity_ids(self):
+        """Amenity ids as a tuple; change them with add_amenity/remove_amenity
+        or by assigning a new sequence."""
+        return self._amenity_ids
+
+    @amenity_ids.setter
+    def amenity_ids(self, value):
+        self._amenity_ids = tuple(intern_id(amenity_id) for amenity_id in value)
+
+    @property
+    def avg_rating(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
 
     def validate(self):
         """Validate place attributes."""
@@ -53,19 +81,15 @@ class Place(BaseModel):
         if self.description and len(self.description) > 1000:
             return False, "Description must be under 1000 characters"
         
-        # Amenity IDs validation
-        if not isinstance(self.amenity_ids, list):
-            return False, "Amenity IDs must be a list"
-        
         return True, None
 
     def add_amenity(self, amenity_id: str):
-        if amenity_id and amenity_id not in self.amenity_ids:
-            self.amenity_ids.append(amenity_id)
+        if amenity_id and amenity_id not in self._amenity_ids:
+            self._amenity_ids += (intern_id(amenity_id),)
 
     def remove_amenity(self, amenity_id: str):
-        if amenity_id in self.amenity_ids:
-            self.amenity_ids.remove(amenity_id)
+        if amenity_id in self._amenity_ids:
+            self._amenity_ids = tuple(a for a in self._amenity_ids if a != amenity_id)
 
     def to_dict(self):
         data = super().to_dict()
@@ -77,7 +101,9 @@ class Place(BaseModel):
                 "latitude": self.latitude,
                 "longitude": self.longitude,
                 "owner_id": self.owner_id,
-                "amenity_ids": self.amenity_ids,
+                "amenity_ids": list(self._amenity_ids),
+                "review_count": self.review_count,
+                "avg_rating": self.avg_rating,
             }
         )
         return data
@@ -1,14 +1,17 @@
-from app.models.base_model import BaseModel
+from app.models.base_model import BaseModel, intern_id
 
 class Review(BaseModel):
     """Review entity."""
 
+    __slots__ = ("text", "rating", "user_id", "place_id")
+    FIELDS = BaseModel.FIELDS + __slots__
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.text = (kwargs.get("text") or "").strip()
         self.rating = int(kwargs.get("rating", 0))
-        self.user_id = (kwargs.get("user_id") or "").strip()
-        self.place_id = (kwargs.get("place_id") or "").strip()
+        self.user_id = intern_id((kwargs.get("user_id") or "").strip())
+        self.place_id = intern_id((kwargs.get("place_id") or "").strip())
 
     def validate(self):
         """Validate review attributes."""
@@ -4,6 +4,9 @@ import re
 class User(BaseModel):
     """User entity."""
 
+    __slots__ = ("first_name", "last_name", "email", "password", "is_admin")
+    FIELDS = BaseModel.FIELDS + __slots__
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.first_name = (kwargs.get("first_name") or "").strip()
@@ -0,0 +1,322 @@
+"""Columnar snapshot files for the in-memory Repository.
+
+A snapshot stores each entity type column by column, one column per model
+slot, so a warm start maps the file and reads entities and index keys out
+of it on demand instead of unpickling every object up front:
+
+- float, int and bool columns are raw ``array`` buffers (``d``, ``q``, ``?``);
+- str columns are one UTF-8 blob of NUL-separated values, plus an
+  ``array('q')`` of where each value starts;
+- anything else (tuples, ``None`` mixed in, huge ints) is a pickled list.
+
+Each type also stores its row numbers sorted by id, so looking an id up
+is a binary search over the mapped ids. The file ends with a pickled
+header describing every section, then the 8-byte offset of that header.
+"""
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import MutableMapping
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+VERSION = 2
+_TRAILER = struct.Struct("<Q")
+
+
+def _interned(name: Optional[str]) -> bool:
+    # References to other entities repeat, so share one string per value as
+    # the models do; a table's own ids are shared through _Table.ids instead
+    return name is not None and name.endswith("_id")
+
+
+# Writing
+def _section(stream, data) -> Tuple[int, int]:
+    """Write one 8-byte aligned buffer; returns (offset, length)."""
+    stream.write(b"\0" * (-stream.tell() % 8))
+    offset = stream.tell()
+    data = memoryview(data).cast("B")
+    stream.write(data)
+    return offset, len(data)
+
+
+def _column(stream, values: List[Any]) -> tuple:
+    kinds = set(map(type, values))
+    if kinds == {float}:
+        return ("d", _section(stream, array("d", values)))
+    if kinds == {bool}:
+        return ("?", _section(stream, bytes(values)))
+    if kinds == {int}:
+        try:
+            return ("q", _section(stream, array("q", values)))
+        except OverflowError:
+            pass
+    if kinds == {str}:
+        data = [value.encode("utf-8", "surrogatepass") for value in values]
+        blob = b"\0".join(data)
+        offsets = array("q", accumulate((len(item) + 1 for item in data), initial=0))
+        # Without NULs inside the values, the whole column decodes with one split
+        split = blob.count(b"\0") == len(data) - 1
+        return ("s", _section(stream, offsets), _section(stream, blob), split)
+    return ("o", _section(stream, pickle.dumps(values, protocol=5)))
+
+
+def freeze(bucket) -> Tuple[Any, Optional[Tuple[str, ...]], List[Any]]:
+    """Copy a bucket for writing: (class, slots, each entity's state in bucket order).
+
+    Entities that are not slotted models, or of mixed classes, are copied
+    as they are, with ``slots`` None. Hold the repository's lock for the
+    type while copying.
+    """
+    if isinstance(bucket, SnapshotBucket) and bucket._table.slots is not None:
+        table = bucket._table
+        # Rows never read are copied from the mapped columns, not built
+        return table.cls, table.slots, [row[1:] for row in bucket.records(table.slots)]
+    entities = list(bucket.values())
+    cls = type(entities[0]) if entities else None
+    slots = getattr(cls, "_SLOTS", None)
+    if slots is None or "id" not in slots or any(type(entity) is not cls for entity in entities):
+        return cls, None, entities
+    return cls, slots, list(map(cls.__getstate__, entities))
+
+
+def _table(stream, cls: Any, slots: Optional[Tuple[str, ...]], states: List[Any]) -> Dict[str, Any]:
+    if slots is None:
+        # Keep the objects whole, next to their ids
+        columns = {"id": [entity.id for entity in states], None: states}
+    else:
+        columns = {name: list(values) for name, values in zip(slots, zip(*states))}
+    ids = [entity_id.encode("utf-8", "surrogatepass") for entity_id in columns.get("id", ())]
+    order = array("q", sorted(range(len(ids)), key=ids.__getitem__))
+    return {
+        "class": cls,
+        "slots": slots,
+        "count": len(states),
+        "order": _section(stream, order),
+        "columns": {name: _column(stream, values) for name, values in columns.items()},
+    }
+
+
+def write(stream, buckets: Dict[str, tuple], log: int) -> int:
+    """Write buckets copied by ``freeze`` as a snapshot; returns the entity count."""
+    header = {"version": VERSION, "log": log,
+              "types": {entity_type: _table(stream, *frozen)
+                        for entity_type, frozen in buckets.items()}}
+    offset = stream.tell()
+    pickle.dump(header, stream, protocol=5)
+    stream.write(_TRAILER.pack(offset))
+    return sum(len(states) for _, _, states in buckets.values())
+
+
+# Reading
+class _Column:
+    """One mapped column; values are decoded as they are read."""
+
+    def __init__(self, mapped: mmap.mmap, name: Optional[str], descriptor: tuple):
+        self.kind = descriptor[0]
+        self._mapped = mapped
+        self._intern = _interned(name)
+        self._objects: Optional[List[Any]] = None
+        offset, length = descriptor[1]
+        if self.kind == "s":
+            self._offsets = memoryview(mapped)[offset:offset + length].cast("q")
+            self._base, self._length = descriptor[2]
+            self._split = descriptor[3]
+        elif self.kind == "o":
+            self._pickled = (offset, length)
+        else:
+            self._values = memoryview(mapped)[offset:offset + length].cast(self.kind)
+
+    def raw(self, row: int) -> bytes:
+        """The encoded bytes of a str value."""
+        start = self._base + self._offsets[row]
+        return self._mapped[start:self._base + self._offsets[row + 1] - 1]
+
+    def value(self, row: int) -> Any:
+        if self.kind == "s":
+            value = self.raw(row).decode("utf-8", "surrogatepass")
+            return sys.intern(value) if self._intern else value
+        if self.kind == "o":
+            return self.values()[row]
+        return self._values[row]
+
+    def values(self) -> List[Any]:
+        """Every value, in row order."""
+        if self.kind == "o":
+            if self._objects is None:
+                offset, length = self._pickled
+                self._objects = pickle.loads(self._mapped[offset:offset + length])
+            return self._objects
+        if self.kind != "s":
+            return self._values.tolist()
+        data = self._mapped[self._base:self._base + self._length]
+        if self._split:
+            values = data.decode("utf-8", "surrogatepass").split("\0")
+        else:
+            offsets = self._offsets.tolist()
+            values = [data[start:end - 1].decode("utf-8", "surrogatepass")
+                      for start, end in zip(offsets, offsets[1:])]
+        return list(map(sys.intern, values)) if self._intern else values
+
+
+class _Table:
+    """One entity type's rows in a mapped snapshot."""
+
+    def __init__(self, mapped: mmap.mmap, entry: Dict[str, Any]):
+        self.cls = entry["class"]
+        self.slots = entry["slots"]
+        self.count = entry["count"]
+        offset, length = entry["order"]
+        self._order = memoryview(mapped)[offset:offset + length].cast("q")
+        self.columns = {name: _Column(mapped, name, descriptor)
+                        for name, descriptor in entry["columns"].items()}
+        self._ids: Optional[List[str]] = None
+
+    def ids(self) -> List[str]:
+        """Every id in row order, decoded once."""
+        if self._ids is None:
+            self._ids = self.columns["id"].values() if self.count else []
+        return self._ids
+
+    def find(self, entity_id: Any) -> int:
+        """Row of an id, or -1."""
+        if type(entity_id) is not str or not self.count:
+            return -1
+        key = entity_id.encode("utf-8", "surrogatepass")
+        ids, order = self.columns["id"], self._order
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ids.raw(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and ids.raw(order[lo]) == key:
+            return order[lo]
+        return -1
+
+    def entity(self, row: int) -> Any:
+        if self.slots is None:
+            return self.columns[None].value(row)
+        ids = self._ids
+        entity = self.cls.__new__(self.cls)
+        entity.__setstate__(tuple(
+            ids[row] if name == "id" and ids is not None else self.columns[name].value(row)
+            for name in self.slots
+        ))
+        return entity
+
+
+class SnapshotBucket(MutableMapping):
+    """A repository bucket whose entities start out in a mapped snapshot.
+
+    An entity is built from its row the first time it is read, and kept,
+    so repeated reads return the same object. Writes go to plain dicts
+    over the snapshot rows: ``_entities`` for rows read or replaced,
+    ``_gone`` for rows deleted, ``_tail`` for ids stored since, so the
+    iteration order is that of a dict filled the same way. ``get`` is as
+    safe without a lock as a dict's; writes need the repository's lock.
+    """
+
+    def __init__(self, table: _Table):
+        self._table = table
+        self._entities: Dict[str, Any] = {}
+        self._gone: set = set()
+        self._tail: Dict[str, Any] = {}
+
+    def _in_table(self, entity_id: str) -> bool:
+        return entity_id not in self._gone and (
+            entity_id in self._entities or self._table.find(entity_id) >= 0
+        )
+
+    def get(self, entity_id: str, default: Any = None) -> Any:
+        entity = self._tail.get(entity_id)
+        if entity is not None:
+            return entity
+        if entity_id in self._gone:
+            return default
+        entity = self._entities.get(entity_id)
+        if entity is None:
+            row = self._table.find(entity_id)
+            if row < 0:
+                return default
+            # setdefault: a racing reader of the same row gets the same object
+            entity = self._entities.setdefault(entity_id, self._table.entity(row))
+        return entity
+
+    def __getitem__(self, entity_id: str) -> Any:
+        entity = self.get(entity_id)
+        if entity is None:
+            raise KeyError(entity_id)
+        return entity
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._tail or self._in_table(entity_id)
+
+    def __setitem__(self, entity_id: str, entity: Any) -> None:
+        if entity_id not in self._tail and self._in_table(entity_id):
+            self._entities[entity_id] = entity
+        else:
+            self._tail[entity_id] = entity
+
+    def __delitem__(self, entity_id: str) -> None:
+        if entity_id in self._tail:
+            del self._tail[entity_id]
+        elif self._in_table(entity_id):
+            self._gone.add(entity_id)
+            self._entities.pop(entity_id, None)
+        else:
+            raise KeyError(entity_id)
+
+    def __len__(self) -> int:
+        return self._table.count - len(self._gone) + len(self._tail)
+
+    def __iter__(self) -> Iterator[str]:
+        gone = self._gone
+        for entity_id in self._table.ids():
+            if entity_id not in gone:
+                yield entity_id
+        yield from list(self._tail)
+
+    def values(self) -> List[Any]:
+        """Every entity, building the rows not read yet."""
+        return [entity for entity in map(self.get, self) if entity is not None]
+
+    def records(self, attributes: Tuple[str, ...]) -> List[Tuple[Any, ...]]:
+        """``(id, *attributes)`` for every entity, in bucket order.
+
+        Rows not read yet come straight from the columns, without building
+        their entities; this is what index loads iterate.
+        """
+        def record(entity):
+            return (entity.id, *(getattr(entity, attribute, None) for attribute in attributes))
+
+        columns = self._table.columns
+        if self._table.slots is None or any(attribute not in columns for attribute in attributes):
+            return [record(entity) for entity in self.values()]
+        rows = zip(self._table.ids(), *(columns[attribute].values() for attribute in attributes))
+        gone, entities = set(self._gone), dict(self._entities)
+        changed = gone.union(entities)
+        if changed:
+            rows = (row if row[0] not in changed else
+                    None if row[0] in gone or row[0] not in entities else
+                    record(entities[row[0]]) for row in rows)
+            found = [row for row in rows if row is not None]
+        else:
+            found = list(rows)
+        found.extend(record(entity) for entity in list(self._tail.values()))
+        return found
+
+
+def read(path: str) -> Tuple[int, Dict[str, SnapshotBucket]]:
+    """Map a snapshot file; returns the log number it names and one bucket per type."""
+    with open(path, "rb") as stream:
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    (offset,) = _TRAILER.unpack(mapped[-_TRAILER.size:])
+    header = pickle.loads(mapped[offset:-_TRAILER.size])
+    if header.get("version") != VERSION:
+        raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+    return header["log"], {entity_type: SnapshotBucket(_Table(mapped, entry))
+                           for entity_type, entry in header["types"].items()}
@@ -0,0 +1,182 @@
+"""Snapshot and write-ahead log persistence for the in-memory Repository.
+
+The data directory holds one snapshot file and a few numbered log files:
+
+- ``snapshot.bin``: every bucket in insertion order, stored column by
+  column (see ``app.persistence.columnar``), naming the first log that
+  is not in it.
+- ``wal.<n>.log``: one pickled ``(operation, entity_type, payload)``
+  record per ``add``/``update``/``delete``, appended and flushed as the
+  repository changes.
+
+A snapshot first switches writes to a new log, then dumps the buckets, so
+anything that lands during the dump is also in that log. Warm start maps
+the snapshot and installs its buckets as they are: entities are built
+from their rows when first read and each index when first used, so
+opening costs little more than reading the file header. The logs
+numbered from the one the snapshot names are then replayed; replay is
+idempotent, and a record torn by a crash at the end of the last log is
+dropped.
+"""
+import os
+import pickle
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.persistence import columnar
+from app.persistence.repository import Repository
+
+SNAPSHOT = "snapshot.bin"
+
+
+class Journal:
+    """Keep a Repository on disk as snapshot + write-ahead log."""
+
+    def __init__(
+        self,
+        repository: Repository,
+        directory: str,
+        interval: Optional[float] = None,
+        fsync: bool = False,
+    ):
+        self.repository = repository
+        self.directory = directory
+        self.interval = interval
+        self.fsync = fsync
+        self._log = None
+        self._log_number = 0
+        self._write_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+
+    # Paths
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _log_path(self, number: int) -> str:
+        return self._path(f"wal.{number}.log")
+
+    def _log_numbers(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.directory):
+            parts = name.split(".")
+            if len(parts) == 3 and parts[0] == "wal" and parts[2] == "log" and parts[1].isdigit():
+                numbers.append(int(parts[1]))
+        return sorted(numbers)
+
+    # Lifecycle
+    def open(self) -> Dict[str, int]:
+        """Restore the repository from disk and start logging its writes.
+
+        Returns how many entities came from the snapshot and the log.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        start, loaded = self._load_snapshot()
+        replayed = 0
+        numbers = [n for n in self._log_numbers() if n >= start]
+        for number in numbers:
+            replayed += self._replay(number, truncate=number == numbers[-1])
+        self._switch_log(max(numbers, default=start - 1) + 1)
+        self.repository.journal = self
+        if self.interval:
+            self._timer = threading.Thread(target=self._run, name="repository-snapshots",
+                                           daemon=True)
+            self._timer.start()
+        return {"snapshot": loaded, "log": replayed}
+
+    def close(self) -> None:
+        """Take a final snapshot and stop logging."""
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        if self._log is None:
+            return
+        self.snapshot()
+        self.repository.journal = None
+        with self._write_lock:
+            self._log.close()
+            self._log = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.snapshot()
+
+    # Writing
+    def record(self, operation: str, entity_type: str, payload: Any) -> None:
+        """Append one repository write to the log."""
+        data = pickle.dumps((operation, entity_type, payload), protocol=5)
+        with self._write_lock:
+            self._log.write(data)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+
+    def _switch_log(self, number: int) -> None:
+        log = open(self._log_path(number), "ab")
+        with self._write_lock:
+            previous, self._log, self._log_number = self._log, log, number
+        if previous is not None:
+            previous.close()
+
+    def snapshot(self) -> int:
+        """Write a new snapshot and drop the logs it covers; returns its size in entities."""
+        with self._snapshot_lock:
+            number = self._log_number + 1
+            self._switch_log(number)
+            # Copy each bucket up front; writes during the dump are in the new log
+            buckets = {}
+            for entity_type, bucket in list(self.repository._storage.items()):
+                with self.repository.lock(entity_type):
+                    buckets[entity_type] = columnar.freeze(bucket)
+            temporary = self._path(SNAPSHOT + ".tmp")
+            with open(temporary, "wb") as stream:
+                count = columnar.write(stream, buckets, number)
+                stream.flush()
+                os.fsync(stream.fileno())
+            # A bucket still mapping the old file keeps reading it after the rename
+            os.replace(temporary, self._path(SNAPSHOT))
+            for old in self._log_numbers():
+                if old < number:
+                    os.remove(self._log_path(old))
+            return count
+
+    # Reading
+    def _load_snapshot(self):
+        path = self._path(SNAPSHOT)
+        if not os.path.exists(path):
+            return 0, 0
+        log, storage = columnar.read(path)
+        # Indexes are built from the mapped columns when first used
+        self.repository._storage = storage
+        return log, sum(len(bucket) for bucket in storage.values())
+
+    def _replay(self, number: int, truncate: bool) -> int:
+        repository = self.repository
+        count = 0
+        good = 0
+        with open(self._log_path(number), "rb") as stream:
+            while True:
+                try:
+                    # Each record was pickled on its own, so unpickle it on its own
+                    operation, entity_type, payload = pickle.load(stream)
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+                    if not truncate:
+                        raise
+                    break
+                good = stream.tell()
+                if operation == "delete":
+                    repository.delete(payload, entity_type)
+                elif repository.exists(payload.id, entity_type):
+                    repository.update(payload)
+                else:
+                    repository.add(payload)
+                count += 1
+        if truncate:
+            # Drop a record half-written when the process died
+            with open(self._log_path(number), "r+b") as stream:
+                stream.truncate(good)
+        return count
@@ -0,0 +1,129 @@
+"""NDJSON export and import for the in-memory repository.
+
+Records use the same format as part 3's ``flask hbnb export`` and
+``flask hbnb import``: one JSON object per line, ``{"type": ..., <field>:
+<value>, ...}``, datetimes as ISO 8601 strings, parents before children.
+Place amenity lists travel as separate ``place_amenity`` records.
+"""
+import json
+from datetime import datetime
+from itertools import groupby, islice
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional
+
+from app.models import Amenity, Place, Review, User
+from app.persistence.repository import Repository
+
+# record type -> model, parents first
+MODELS = {
+    "user": User,
+    "amenity": Amenity,
+    "place": Place,
+    "review": Review,
+}
+
+# Derived fields, rebuilt from the reviews on import
+DERIVED = ("review_count", "rating_sum")
+
+Progress = Callable[[str, int], None]
+
+
+def _record(record_type: str, entity) -> Dict[str, Any]:
+    record = {"type": record_type}
+    for name in entity.FIELDS:
+        if name == "amenity_ids":
+            continue
+        value = getattr(entity, name)
+        record[name] = value.isoformat() if isinstance(value, datetime) else value
+    return record
+
+
+def export_records(repository: Repository) -> Iterator[Dict[str, Any]]:
+    """Lazily yield every stored entity and amenity link as a record."""
+    for record_type in ("user", "amenity", "place"):
+        for entity in repository.iter_all(MODELS[record_type].__name__):
+            yield _record(record_type, entity)
+    for place in repository.iter_all("Place"):
+        for amenity_id in place.amenity_ids:
+            yield {"type": "place_amenity", "place_id": place.id, "amenity_id": amenity_id}
+    for review in repository.iter_all("Review"):
+        yield _record("review", review)
+
+
+def _entity(record_type: str, record: Dict[str, Any]):
+    fields = {k: v for k, v in record.items() if k != "type" and k not in DERIVED}
+    for name in ("created_at", "updated_at"):
+        if isinstance(fields.get(name), str):
+            fields[name] = datetime.fromisoformat(fields[name])
+    return MODELS[record_type](**fields)
+
+
+def import_records(
+    repository: Repository,
+    records: Iterable[Dict[str, Any]],
+    chunk_size: int = 1000,
+    progress: Optional[Progress] = None,
+) -> Dict[str, int]:
+    """Add records from ``export_records`` (or part 3), chunk by chunk.
+
+    Entities go through ``Repository.bulk_create``, so each chunk is all or
+    nothing and a ``ValueError`` keeps the chunks before it. Place review
+    aggregates are rebuilt from the imported reviews. Returns the number of
+    records per type.
+    """
+    counts: Dict[str, int] = {}
+    for record_type, group in groupby(records, key=lambda record: record.get("type")):
+        if record_type != "place_amenity" and record_type not in MODELS:
+            raise ValueError(f"Unknown record type: {record_type!r}")
+        while True:
+            chunk = list(islice(group, chunk_size))
+            if not chunk:
+                break
+            if record_type == "place_amenity":
+                _link_amenities(repository, chunk)
+            else:
+                entities = [_entity(record_type, record) for record in chunk]
+                repository.bulk_create(entities, chunk_size=len(entities))
+                if record_type == "review":
+                    _count_reviews(repository, entities)
+            counts[record_type] = counts.get(record_type, 0) + len(chunk)
+            if progress:
+                progress(record_type, counts[record_type])
+    return counts
+
+
+def _link_amenities(repository: Repository, links: Iterable[Dict[str, Any]]) -> None:
+    for link in links:
+        place = repository.get(link["place_id"], "Place")
+        if place is None:
+            raise ValueError(f"Unknown place: {link['place_id']!r}")
+        place.add_amenity(link["amenity_id"])
+        repository.update(place)
+
+
+def _count_reviews(repository: Repository, reviews: Iterable[Review]) -> None:
+    for review in reviews:
+        place = repository.get(review.place_id, "Place")
+        if place is not None:
+            place.review_count += 1
+            place.rating_sum += review.rating
+            repository.update(place)
+
+
+def dump(repository: Repository, stream: IO[str]) -> int:
+    """Write the repository to a text stream as NDJSON; returns the line count."""
+    count = 0
+    for record in export_records(repository):
+        stream.write(json.dumps(record) + "\n")
+        count += 1
+    return count
+
+
+def load(
+    repository: Repository,
+    stream: IO[str],
+    chunk_size: int = 1000,
+    progress: Optional[Progress] = None,
+) -> Dict[str, int]:
+    """Read NDJSON lines from a text stream into the repository."""
+    records = (json.loads(line) for line in stream if line.strip())
+    return import_records(repository, records, chunk_size, progress)
@@ -1,53 +1,1157 @@
+import heapq
+import math
+import re
+import threading
 import uuid
+from array import array
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-class Repository:
-    """Simple in-memory repository."""
+try:
+    import numpy
+except ImportError:  # optional: column scans fall back to plain loops
+    numpy = None
+
+# Mean Earth radius, as in app.services.geo (not imported: it would be circular)
+EARTH_RADIUS_KM = 6371.0088
+
+
+class _AttributeIndex:
+    """Hash index mapping one attribute's values to entity ids."""
+
+    def __init__(self, attribute: str, unique: bool = False):
+        self.attribute = attribute
+        self.attributes = (attribute,)
+        self.unique = unique
+        # value -> ordered set of entity ids (dict keys keep insertion order)
+        self._entries: Dict[Any, Dict[str, None]] = {}
+        # entity id -> value it is currently indexed under
+        self._keys: Dict[str, Any] = {}
+
+    def check(self, entity) -> None:
+        """Raise ValueError if indexing entity would break uniqueness."""
+        if not self.unique:
+            return
+        value = getattr(entity, self.attribute, None)
+        if value is None:
+            return
+        owners = self._entries.get(value)
+        if owners and entity.id not in owners:
+            raise ValueError(f"Duplicate value for unique attribute '{self.attribute}'")
+
+    def put(self, entity) -> None:
+        value = getattr(entity, self.attribute, None)
+        if entity.id in self._keys:
+            if self._keys[entity.id] == value:
+                return
+            self.discard(entity.id)
+        if value is None:
+            return
+        self._entries.setdefault(value, {})[entity.id] = None
+        self._keys[entity.id] = value
+
+    def discard(self, entity_id: str) -> None:
+        if entity_id not in self._keys:
+            return
+        value = self._keys.pop(entity_id)
+        ids = self._entries.get(value)
+        if ids is not None:
+            ids.pop(entity_id, None)
+            if not ids:
+                del self._entries[value]
+
+    def lookup(self, value: Any) -> List[str]:
+        try:
+            return list(self._entries.get(value, ()))
+        except TypeError:  # unhashable lookup value never matches
+            return []
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys.clear()
+
+    def load(self, rows: Iterable[Tuple[str, Any]]) -> None:
+        """Index many (id, value) rows at once into an empty index."""
+        entries, keys = self._entries, self._keys
+        for entity_id, value in rows:
+            if value is not None:
+                entries.setdefault(value, {})[entity_id] = None
+                keys[entity_id] = value
+
+
+class _SortedIndex:
+    """Ordered index over one attribute, for range filters and sorting.
+
+    Entries are kept as a sorted list of (value, entity id) pairs, so ties
+    are broken by id and every entity has a stable position to page from.
+    """
+
+    unique = False
+
+    def __init__(self, attribute: str):
+        self.attribute = attribute
+        self.attributes = (attribute,)
+        self._entries: List[Tuple[Any, str]] = []
+        self._keys: Dict[str, Any] = {}
+
+    def check(self, entity) -> None:
+        pass
+
+    def put(self, entity) -> None:
+        value = getattr(entity, self.attribute, None)
+        if entity.id in self._keys:
+            if self._keys[entity.id] == value:
+                return
+            self.discard(entity.id)
+        if value is None:
+            return
+        insort(self._entries, (value, entity.id))
+        self._keys[entity.id] = value
+
+    def discard(self, entity_id: str) -> None:
+        if entity_id not in self._keys:
+            return
+        entry = (self._keys.pop(entity_id), entity_id)
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def lookup(self, value: Any) -> List[str]:
+        return list(self.range(value, value))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys.clear()
+
+    def load(self, rows: Iterable[Tuple[str, Any]]) -> None:
+        """Index many (id, value) rows at once: one sort instead of an insort each."""
+        for entity_id, value in rows:
+            if value is not None:
+                self._entries.append((value, entity_id))
+                self._keys[entity_id] = value
+        # By id, then stably by value: two key sorts beat comparing the pairs
+        self._entries.sort(key=itemgetter(1))
+        self._entries.sort(key=itemgetter(0))
+
+    def _upper_bound(self, value: Any) -> int:
+        """Index of the first entry whose value is greater than value."""
+        lo, hi = 0, len(self._entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entries[mid][0] <= value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(
+        self,
+        low: Any = None,
+        high: Any = None,
+        reverse: bool = False,
+        after: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Iterate ids with low <= value <= high, resuming after an entity id.
+
+        The matching entries are copied up front, so later writes do not
+        disturb the iteration.
+        """
+        start = 0 if low is None else bisect_left(self._entries, (low,))
+        stop = len(self._entries) if high is None else self._upper_bound(high)
+        if after is not None:
+            if after not in self._keys:
+                raise ValueError("Unknown cursor")
+            anchor = (self._keys[after], after)
+            if reverse:
+                stop = min(stop, bisect_left(self._entries, anchor))
+            else:
+                start = max(start, bisect_right(self._entries, anchor))
+        entries = self._entries[start:stop]
+        if reverse:
+            entries.reverse()
+        return (entity_id for _, entity_id in entries)
+
+
+class _GridIndex:
+    """Uniform lat/lon grid for bounding-box queries over point entities.
+
+    Each entity lives in the cell covering its coordinates, so a bbox query
+    only visits the cells it overlaps (or the occupied cells, if fewer).
+    """
+
+    unique = False
+
+    def __init__(self, lat_attribute: str, lon_attribute: str, cell_degrees: float = 0.1):
+        self.lat_attribute = lat_attribute
+        self.lon_attribute = lon_attribute
+        self.attributes = (lat_attribute, lon_attribute)
+        self.cell_degrees = cell_degrees
+        # cell -> {entity id: (lat, lon)}
+        self._cells: Dict[Tuple[int, int], Dict[str, Tuple[float, float]]] = {}
+        # entity id -> (cell, point)
+        self._keys: Dict[str, Tuple[Tuple[int, int], Tuple[float, float]]] = {}
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def check(self, entity) -> None:
+        pass
+
+    def put(self, entity) -> None:
+        lat = getattr(entity, self.lat_attribute, None)
+        lon = getattr(entity, self.lon_attribute, None)
+        point = None if lat is None or lon is None else (lat, lon)
+        if entity.id in self._keys:
+            if self._keys[entity.id][1] == point:
+                return
+            self.discard(entity.id)
+        if point is None:
+            return
+        cell = self._cell(lat, lon)
+        self._cells.setdefault(cell, {})[entity.id] = point
+        self._keys[entity.id] = (cell, point)
+
+    def discard(self, entity_id: str) -> None:
+        if entity_id not in self._keys:
+            return
+        cell, _ = self._keys.pop(entity_id)
+        members = self._cells.get(cell)
+        if members is not None:
+            members.pop(entity_id, None)
+            if not members:
+                del self._cells[cell]
+
+    def lookup(self, value: Any) -> List[str]:
+        return []
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._keys.clear()
+
+    def load(self, rows: Iterable[Tuple[str, Any, Any]]) -> None:
+        """Index many (id, lat, lon) rows at once into an empty index."""
+        for entity_id, lat, lon in rows:
+            if lat is None or lon is None:
+                continue
+            cell = self._cell(lat, lon)
+            self._cells.setdefault(cell, {})[entity_id] = (lat, lon)
+            self._keys[entity_id] = (cell, (lat, lon))
+
+    def within(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> List[str]:
+        """Ids inside the box; min_lon > max_lon wraps the antimeridian."""
+        if min_lon > max_lon:
+            return (self.within(min_lat, min_lon, max_lat, 180.0)
+                    + self.within(min_lat, -180.0, max_lat, max_lon))
+        found = []
+        low_row, low_col = self._cell(min_lat, min_lon)
+        high_row, high_col = self._cell(max_lat, max_lon)
+        span = (high_row - low_row + 1) * (high_col - low_col + 1)
+        if span <= len(self._cells):
+            cells = (
+                self._cells.get((row, col))
+                for row in range(low_row, high_row + 1)
+                for col in range(low_col, high_col + 1)
+            )
+        else:
+            cells = (
+                members for (row, col), members in self._cells.items()
+                if low_row <= row <= high_row and low_col <= col <= high_col
+            )
+        for members in cells:
+            if not members:
+                continue
+            for entity_id, (lat, lon) in members.items():
+                if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
+                    found.append(entity_id)
+        return found
+
+
+class _ColumnStore:
+    """Columnar copy of numeric attributes, for scans over every entity.
+
+    Each attribute is an ``array('d')`` with one row per entity, next to a
+    row -> id list and an id -> row map. Range filters, histograms and
+    nearest-point queries then read contiguous floats instead of touching
+    each entity object; with NumPy installed they run vectorized over the
+    same buffers. Missing values and deleted rows hold NaN, which fails
+    every comparison, and freed rows are reused by the next insert.
+    """
+
+    unique = False
+
+    def __init__(self, attributes: Tuple[str, ...]):
+        self.attributes = attributes
+        self._columns: Dict[str, array] = {attribute: array("d") for attribute in attributes}
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    @staticmethod
+    def _float(value: Any) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    def check(self, entity) -> None:
+        pass
+
+    def put(self, entity) -> None:
+        row = self._rows.get(entity.id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+                self._ids[row] = entity.id
+            else:
+                row = len(self._ids)
+                self._ids.append(entity.id)
+                for column in self._columns.values():
+                    column.append(math.nan)
+            self._rows[entity.id] = row
+        for attribute, column in self._columns.items():
+            column[row] = self._float(getattr(entity, attribute, None))
+
+    def discard(self, entity_id: str) -> None:
+        row = self._rows.pop(entity_id, None)
+        if row is None:
+            return
+        self._ids[row] = None
+        for column in self._columns.values():
+            column[row] = math.nan
+        self._free.append(row)
+
+    def lookup(self, value: Any) -> List[str]:
+        return []
+
+    def clear(self) -> None:
+        self._columns = {attribute: array("d") for attribute in self.attributes}
+        self._ids = []
+        self._rows = {}
+        self._free = []
+
+    def load(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        """Fill an empty store from (id, *attributes) rows, one column at a time."""
+        rows = list(rows)
+        self._ids = [row[0] for row in rows]
+        self._rows = {entity_id: row for row, entity_id in enumerate(self._ids)}
+        for position, attribute in enumerate(self.attributes, 1):
+            values = [row[position] for row in rows]
+            try:
+                self._columns[attribute] = array("d", values)
+            except TypeError:  # None or a non-number somewhere: convert one by one
+                self._columns[attribute] = array("d", map(self._float, values))
+
+    def _view(self, attribute: str):
+        # A view, not a copy; it must be dropped before the array next grows
+        return numpy.frombuffer(self._columns[attribute], dtype=numpy.float64)
+
+    def select(self, bounds: Dict[str, Tuple[Optional[float], Optional[float]]]) -> List[str]:
+        """Ids whose values satisfy every (low, high) bound, in row order.
+
+        A missing bound is open; low > high selects values outside the gap,
+        as for a longitude range crossing the antimeridian.
+        """
+        if not self._ids:
+            return []
+        limits = [
+            (attribute,
+             -math.inf if low is None else low,
+             math.inf if high is None else high)
+            for attribute, (low, high) in bounds.items()
+        ]
+        if numpy is not None:
+            mask = numpy.ones(len(self._ids), dtype=bool)
+            for attribute, low, high in limits:
+                values = self._view(attribute)
+                if low <= high:
+                    mask &= (values >= low) & (values <= high)
+                else:
+                    mask &= (values >= low) | (values <= high)
+            rows = numpy.flatnonzero(mask).tolist()
+        elif not limits:
+            rows = range(len(self._ids))
+        else:
+            # The first bound walks its column; the others only check survivors
+            (attribute, low, high), rest = limits[0], limits[1:]
+            values = self._columns[attribute]
+            if low <= high:
+                rows = [row for row, value in enumerate(values) if low <= value <= high]
+            else:
+                rows = [row for row, value in enumerate(values) if value >= low or value <= high]
+            for attribute, low, high in rest:
+                values = self._columns[attribute]
+                if low <= high:
+                    rows = [row for row in rows if low <= values[row] <= high]
+                else:
+                    rows = [row for row in rows if values[row] >= low or values[row] <= high]
+        ids = self._ids
+        return [ids[row] for row in rows if ids[row] is not None]
+
+    def histogram(
+        self,
+        attribute: str,
+        bins: int,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+    ) -> List[Tuple[float, float, int]]:
+        """Count values in ``bins`` equal-width bins between low and high.
+
+        Open bounds default to the smallest and largest stored value. Values
+        outside the bounds are not counted; the last bin includes ``high``.
+        Returns (bin start, bin end, count) triples.
+        """
+        if bins < 1:
+            raise ValueError("bins must be at least 1")
+        if low is not None and high is not None and low > high:
+            raise ValueError("low must not be greater than high")
+        given_low = low is not None
+        if numpy is not None:
+            values = self._view(attribute)
+            values = values[~numpy.isnan(values)]
+            if low is None and len(values):
+                low = float(values.min())
+            if high is None and len(values):
+                high = float(values.max())
+        else:
+            values = self._columns[attribute]
+            if low is None or high is None:
+                live = [value for value in values if value == value]
+                if low is None and live:
+                    low = min(live)
+                if high is None and live:
+                    high = max(live)
+        if low is None or high is None:
+            return []
+        if low > high:
+            # Only one bound was given and every stored value lies beyond it
+            low, high = (low, low) if given_low else (high, high)
+        width = (high - low) / bins
+        scale = 1 / width if width > 0 else 0.0
+        if numpy is not None:
+            values = values[(values >= low) & (values <= high)]
+            slots = ((values - low) * scale).astype(numpy.intp)
+            counts = numpy.bincount(slots, minlength=bins + 1).tolist()
+        else:
+            # One spare slot catches value == high, folded into the last bin
+            counts = [0] * (bins + 1)
+            for value in values:
+                if low <= value <= high:
+                    counts[int((value - low) * scale)] += 1
+        counts[bins - 1] += counts[bins]
+        return [
+            (low + i * width, high if i == bins - 1 else low + (i + 1) * width, counts[i])
+            for i in range(bins)
+        ]
+
+    def nearest(
+        self,
+        lat_attribute: str,
+        lon_attribute: str,
+        lat: float,
+        lon: float,
+        k: int,
+        radius_km: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        """The k (id, distance in km) pairs closest to a point, nearest first.
+
+        Distances are great-circle (haversine); ties are broken by id.
+        """
+        if not self._ids or k < 1:
+            return []
+        phi = math.radians(lat)
+        if numpy is not None:
+            lats = numpy.radians(self._view(lat_attribute))
+            lons = numpy.radians(self._view(lon_attribute) - lon)
+            a = (numpy.sin((lats - phi) / 2) ** 2
+                 + math.cos(phi) * numpy.cos(lats) * numpy.sin(lons / 2) ** 2)
+            distances = 2 * EARTH_RADIUS_KM * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))
+            del lats, lons, a
+            limit = math.inf if radius_km is None else radius_km
+            rows = numpy.flatnonzero(distances <= limit)
+            if len(rows) > k:
+                # Keep every row tied with the k-th distance, for the id tie-break
+                kth = numpy.partition(distances[rows], k - 1)[k - 1]
+                rows = rows[distances[rows] <= kth]
+            found = [(self._ids[row], float(distances[row])) for row in rows.tolist()]
+        else:
+            cos_phi = math.cos(phi)
+            found = []
+            for entity_id, row_lat, row_lon in zip(
+                self._ids, self._columns[lat_attribute], self._columns[lon_attribute]
+            ):
+                if entity_id is None or row_lat != row_lat or row_lon != row_lon:
+                    continue
+                row_phi = math.radians(row_lat)
+                a = (math.sin((row_phi - phi) / 2) ** 2
+                     + cos_phi * math.cos(row_phi) * math.sin(math.radians(row_lon - lon) / 2) ** 2)
+                distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+                if radius_km is None or distance <= radius_km:
+                    found.append((entity_id, distance))
+        return heapq.nsmallest(k, found, key=lambda item: (item[1], item[0]))
+
+
+class _TextIndex:
+    """Inverted index over text attributes, ranked with BM25.
+
+    Each term maps to the ids containing it and their term frequency, so a
+    search only touches the postings of the query terms, never the bucket.
+    A bulk ``load`` is deferred until the index is next used, so a warm
+    start does not pay for tokenizing every document up front.
+    """
+
+    unique = False
+    K1 = 1.2
+    B = 0.75
+    _TOKEN = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, attributes: Tuple[str, ...]):
+        self.attributes = attributes
+        # term -> {entity id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # entity id -> (term counts, document length)
+        self._docs: Dict[str, Tuple[Counter, int]] = {}
+        self._total_length = 0
+        self._pending: List[Tuple[Any, ...]] = []
+
+    def _catch_up(self) -> None:
+        if self._pending:
+            pending, self._pending = self._pending, []
+            for row in pending:
+                self._put(row[0], row[1:])
+
+    @classmethod
+    def tokenize(cls, text: Optional[str]) -> List[str]:
+        return cls._TOKEN.findall(text.lower()) if text else []
+
+    def check(self, entity) -> None:
+        pass
+
+    def put(self, entity) -> None:
+        self._catch_up()
+        self._put(entity.id, [getattr(entity, attribute, None) for attribute in self.attributes])
+
+    def _put(self, entity_id: str, texts) -> None:
+        tokens: List[str] = []
+        for text in texts:
+            tokens.extend(self.tokenize(text))
+        counts = Counter(tokens)
+        current = self._docs.get(entity_id)
+        if current is not None:
+            if current[0] == counts:
+                return
+            self.discard(entity_id)
+        if not counts:
+            return
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[entity_id] = tf
+        self._docs[entity_id] = (counts, len(tokens))
+        self._total_length += len(tokens)
+
+    def discard(self, entity_id: str) -> None:
+        self._catch_up()
+        if entity_id not in self._docs:
+            return
+        counts, length = self._docs.pop(entity_id)
+        self._total_length -= length
+        for term in counts:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(entity_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def lookup(self, value: Any) -> List[str]:
+        return [entity_id for entity_id, _ in self.search(value)]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._docs.clear()
+        self._total_length = 0
+        self._pending = []
+
+    def load(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        """Queue many (id, *attributes) rows to be indexed on first use."""
+        self._pending.extend(rows)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return (id, score) for documents containing every query term, best first."""
+        self._catch_up()
+        terms = set(self.tokenize(query))
+        if not terms or not self._docs:
+            return []
+        postings = [self._postings.get(term) for term in terms]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        candidates = [i for i in postings[0] if all(i in p for p in postings[1:])]
+        total = len(self._docs)
+        avg_length = self._total_length / total
+        scored = []
+        for entity_id in candidates:
+            length = self._docs[entity_id][1]
+            norm = self.K1 * (1 - self.B + self.B * length / avg_length)
+            score = 0.0
+            for p in postings:
+                idf = math.log((total - len(p) + 0.5) / (len(p) + 0.5) + 1)
+                tf = p[entity_id]
+                score += idf * tf * (self.K1 + 1) / (tf + norm)
+            scored.append((entity_id, score))
+        key = lambda item: (item[1], item[0])
+        if limit is None:
+            return sorted(scored, key=key, reverse=True)
+        return heapq.nlargest(limit, scored, key=key)
+
+
+class _InsertionOrder:
+    """Insertion order of a bucket's ids, seekable for keyset pagination.
+
+    Every id gets an increasing sequence number when it is first added.
+    Deleted ids are tombstoned and swept out once they make up half the
+    list, so seeking past a cursor stays a binary search.
+    """
 
     def __init__(self):
-        self._storage: Dict[str, Dict[str, Any]] = {}
+        self._seqs: List[int] = []
+        self._ids: List[Optional[str]] = []
+        # id -> sequence number, kept for tombstones until the next sweep
+        self._seq_of: Dict[str, int] = {}
+        self._next_seq = 0
+        self._dead = 0
+
+    def append(self, entity_id: str) -> None:
+        seq = self._seq_of.get(entity_id)
+        if seq is not None:
+            i = bisect_left(self._seqs, seq)
+            if self._ids[i] is not None:
+                return
+            # re-added after a delete: the old slot stays a tombstone
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seqs.append(seq)
+        self._ids.append(entity_id)
+        self._seq_of[entity_id] = seq
+
+    def load(self, entity_ids: Iterable[str]) -> None:
+        """Fill an empty order with distinct ids, oldest first."""
+        self._ids = list(entity_ids)
+        self._seqs = list(range(len(self._ids)))
+        self._seq_of = dict(zip(self._ids, self._seqs))
+        self._next_seq = len(self._ids)
+
+    def remove(self, entity_id: str) -> None:
+        seq = self._seq_of.get(entity_id)
+        if seq is None:
+            return
+        i = bisect_left(self._seqs, seq)
+        if self._ids[i] is None:
+            return
+        self._ids[i] = None
+        self._dead += 1
+        if self._dead * 2 > len(self._ids):
+            self._sweep()
+
+    def _sweep(self) -> None:
+        live = [(s, i) for s, i in zip(self._seqs, self._ids) if i is not None]
+        self._seqs = [s for s, _ in live]
+        self._ids = [i for _, i in live]
+        self._seq_of = {i: s for s, i in live}
+        self._dead = 0
+
+    def _start(self, after: Optional[str]) -> int:
+        if after is None:
+            return 0
+        seq = self._seq_of.get(after)
+        if seq is None:
+            raise ValueError("Unknown cursor")
+        return bisect_right(self._seqs, seq)
+
+    def iter_ids(self, after: Optional[str] = None) -> Iterator[str]:
+        """Iterate live ids after a cursor, over a copy taken now."""
+        ids = self._ids[self._start(after):]
+        return (entity_id for entity_id in ids if entity_id is not None)
+
+    def page(self, limit: Optional[int], after: Optional[str] = None) -> List[str]:
+        live = (entity_id for entity_id in islice(self._ids, self._start(after), None)
+                if entity_id is not None)
+        return list(islice(live, limit))
+
+
+class Repository:
+    """Simple in-memory repository.
+
+    Attributes listed in ``INDEXES`` get a hash index per entity type, so
+    ``get_by_attribute`` and ``find_all_by_attribute`` on them are O(1)
+    instead of a scan of the whole bucket. Unique indexes reject a second
+    entity with the same value by raising ``ValueError``.
+
+    ``get_all`` takes an optional ``limit`` and ``after`` cursor (the id of
+    the last entity already seen) and only touches one page of entities.
+    Attributes in ``SORTED_INDEXES`` can be range-scanned in value order
+    with ``iter_range``, and types in ``GRID_INDEXES`` answer bounding-box
+    queries through ``iter_bbox``. Text attributes in ``TEXT_INDEXES``
+    feed an inverted index searched with ``search_text``. Numeric
+    attributes in ``COLUMN_STORES`` are also kept column by column for
+    ``select_range``, ``histogram`` and ``nearest``, which scan every
+    entity; pass ``columns={}`` to go without them.
+
+    When ``journal`` is set (see ``app.persistence.journal``), every
+    successful ``add``, ``update`` and ``delete`` is also written to it.
+    Replacing the storage wholesale, as a warm start does, leaves each
+    index to be rebuilt from the buckets the first time it is used.
+
+    The repository is safe to share between threads. Each entity type has
+    its own reentrant lock, held by writes and by index lookups; ``get``,
+    ``get_many`` and unpaged ``get_all`` read the bucket without it. The
+    ``iter_*`` methods iterate a copy of the matching ids taken under the
+    lock and skip entities deleted since. Use ``lock(entity_type)`` to make
+    a read-modify-write of several calls atomic (taking several types'
+    locks in name order), and ``add_if_absent`` to claim a unique value.
+    """
+
+    # entity type -> {attribute: unique}
+    INDEXES: Dict[str, Dict[str, bool]] = {
+        "User": {"email": True},
+        "Place": {"owner_id": False},
+        "Review": {"place_id": False},
+    }
+
+    # entity type -> attributes kept in value order
+    SORTED_INDEXES: Dict[str, Tuple[str, ...]] = {
+        "Place": ("price",),
+    }
+
+    # entity type -> (latitude attribute, longitude attribute)
+    GRID_INDEXES: Dict[str, Tuple[str, str]] = {
+        "Place": ("latitude", "longitude"),
+    }
+
+    # entity type -> attributes searched together as one document
+    TEXT_INDEXES: Dict[str, Tuple[str, ...]] = {
+        "Place": ("title", "description"),
+        "Review": ("text",),
+    }
+
+    # entity type -> numeric attributes copied into contiguous columns
+    COLUMN_STORES: Dict[str, Tuple[str, ...]] = {
+        "Place": ("price", "latitude", "longitude"),
+    }
+
+    def __init__(
+        self,
+        indexes: Optional[Dict[str, Dict[str, bool]]] = None,
+        columns: Optional[Dict[str, Tuple[str, ...]]] = None,
+    ):
+        self._indexes: Dict[str, Dict[str, _AttributeIndex]] = {}
+        self._orders: Dict[str, _InsertionOrder] = {}
+        self._buckets: Dict[str, Dict[str, Any]] = {}
+        # entity type -> names of indexes still to be built from the bucket
+        self._pending: Dict[str, set] = {}
+        self.journal = None
+        self._locks: Dict[str, threading.RLock] = {}
+        declared = self.INDEXES if indexes is None else indexes
+        for entity_type, attributes in declared.items():
+            for attribute, unique in attributes.items():
+                self.register_index(entity_type, attribute, unique=unique)
+        for entity_type, attributes in self.SORTED_INDEXES.items():
+            for attribute in attributes:
+                self.register_index(entity_type, attribute, ordered=True)
+        for entity_type, (lat_attribute, lon_attribute) in self.GRID_INDEXES.items():
+            self._install_index(
+                entity_type, self._grid_key(lat_attribute, lon_attribute),
+                _GridIndex(lat_attribute, lon_attribute),
+            )
+        for entity_type, attributes in self.TEXT_INDEXES.items():
+            self._install_index(entity_type, self._text_key(attributes), _TextIndex(attributes))
+        self._columns: Dict[str, _ColumnStore] = {}
+        for entity_type, attributes in (self.COLUMN_STORES if columns is None else columns).items():
+            self._columns[entity_type] = _ColumnStore(attributes)
+            self._install_index(entity_type, "columns", self._columns[entity_type])
+
+    @property
+    def _storage(self) -> Dict[str, Dict[str, Any]]:
+        return self._buckets
+
+    @_storage.setter
+    def _storage(self, value: Dict[str, Dict[str, Any]]) -> None:
+        # Replacing the storage wholesale (tests reset it this way) must not
+        # leave indexes pointing at entities that are gone.
+        self._buckets = value
+        self._rebuild_indexes()
 
     def _bucket(self, entity_type: str) -> Dict[str, Any]:
-        if entity_type not in self._storage:
-            self._storage[entity_type] = {}
-        return self._storage[entity_type]
+        bucket = self._storage.get(entity_type)
+        if bucket is None:
+            # setdefault is atomic, so racing threads end up with one bucket
+            bucket = self._storage.setdefault(entity_type, {})
+        return bucket
+
+    def _order(self, entity_type: str) -> _InsertionOrder:
+        with self.lock(entity_type):
+            if entity_type not in self._orders:
+                order = _InsertionOrder()
+                order.load(self._bucket(entity_type))
+                self._orders[entity_type] = order
+            return self._orders[entity_type]
+
+    def _append_order(self, entity_type: str, entity_id: str) -> None:
+        # Until it is first needed, the order is the bucket's own
+        order = self._orders.get(entity_type)
+        if order is not None:
+            order.append(entity_id)
+
+    @contextmanager
+    def lock(self, entity_type: str) -> Iterator[None]:
+        """Hold the entity type's lock; reentrant, so repository calls work inside."""
+        lock = self._locks.get(entity_type)
+        if lock is None:
+            lock = self._locks.setdefault(entity_type, threading.RLock())
+        with lock:
+            yield
+
+    def _resolve(self, entity_type: str, entity_ids: Iterable[str]) -> Iterator[Any]:
+        """Map ids to entities, skipping any deleted meanwhile."""
+        bucket = self._bucket(entity_type)
+        for entity_id in entity_ids:
+            entity = bucket.get(entity_id)
+            if entity is not None:
+                yield entity
+
+    # Indexes
+    def register_index(
+        self, entity_type: str, attribute: str, unique: bool = False, ordered: bool = False
+    ) -> None:
+        """Declare a secondary index and build it from the current data."""
+        index = _SortedIndex(attribute) if ordered else _AttributeIndex(attribute, unique=unique)
+        self._install_index(entity_type, attribute, index)
+
+    def _install_index(self, entity_type: str, name: str, index) -> None:
+        for entity in self._buckets.get(entity_type, {}).values():
+            index.check(entity)
+            index.put(entity)
+        self._indexes.setdefault(entity_type, {})[name] = index
+        self._pending.get(entity_type, set()).discard(name)
+
+    @staticmethod
+    def _grid_key(lat_attribute: str, lon_attribute: str) -> str:
+        return f"{lat_attribute},{lon_attribute}"
 
+    @staticmethod
+    def _text_key(attributes: Tuple[str, ...]) -> str:
+        return "text:" + ",".join(attributes)
+
+    def _rebuild_indexes(self) -> None:
+        self._orders = {}
+        for entity_type, indexes in self._indexes.items():
+            for index in indexes.values():
+                index.clear()
+            self._pending[entity_type] = set(indexes)
+
+    def _index(self, entity_type: str, name: str):
+        """The named index, built from the bucket first if that is still pending."""
+        index = self._indexes.get(entity_type, {}).get(name)
+        if index is not None and name in self._pending.get(entity_type, ()):
+            with self.lock(entity_type):
+                pending = self._pending[entity_type]
+                if name in pending:
+                    self._load_index(entity_type, index)
+                    pending.discard(name)
+        return index
+
+    def _load_index(self, entity_type: str, index) -> None:
+        bucket = self._buckets.get(entity_type, {})
+        attributes = index.attributes
+        # A snapshot bucket reads the indexed columns without building every entity
+        records = getattr(bucket, "records", None)
+        if records is not None:
+            index.load(records(attributes))
+        else:
+            index.load([(entity.id, *(getattr(entity, attribute, None) for attribute in attributes))
+                        for entity in bucket.values()])
+
+    def _built_indexes(self, entity_type: str) -> List[Any]:
+        """The indexes a write must keep up to date.
+
+        Pending indexes will see the write when they are built; unique ones
+        are built now, since checking a value needs every stored one.
+        """
+        indexes = self._indexes.get(entity_type, {})
+        for name, index in indexes.items():
+            if index.unique:
+                self._index(entity_type, name)
+        pending = self._pending.get(entity_type, ())
+        return [index for name, index in indexes.items() if name not in pending]
+
+    def _reindex(self, entity) -> None:
+        indexes = self._built_indexes(entity.__class__.__name__)
+        for index in indexes:
+            index.check(entity)
+        for index in indexes:
+            index.put(entity)
+
+    # CRUD
     def add(self, entity) -> None:
         if not getattr(entity, "id", None):
             entity.id = str(uuid.uuid4())
         if not getattr(entity, "created_at", None):
             entity.created_at = datetime.utcnow()
-        bucket = self._bucket(entity.__class__.__name__)
-        bucket[entity.id] = entity
+        entity_type = entity.__class__.__name__
+        with self.lock(entity_type):
+            self._reindex(entity)
+            self._bucket(entity_type)[entity.id] = entity
+            self._append_order(entity_type, entity.id)
+            if self.journal is not None:
+                self.journal.record("add", entity_type, entity)
+
+    def add_if_absent(self, entity, attribute: str) -> Any:
+        """Add entity unless another one already has its value of attribute.
+
+        Check and insert happen under one lock, so concurrent callers cannot
+        both claim a value. Returns the stored entity: ``entity`` itself if
+        it was added, otherwise the one that holds the value.
+        """
+        with self.lock(entity.__class__.__name__):
+            existing = self.get_by_attribute(
+                entity.__class__.__name__, attribute, getattr(entity, attribute, None)
+            )
+            if existing is not None:
+                return existing
+            self.add(entity)
+            return entity
 
     def get(self, entity_id: str, entity_type: str) -> Optional[Any]:
         return self._bucket(entity_type).get(entity_id)
 
-    def get_all(self, entity_type: str) -> List[Any]:
-        return list(self._bucket(entity_type).values())
+    def get_many(self, entity_ids: Iterable[str], entity_type: str) -> Dict[str, Any]:
+        """Resolve several ids at once; missing ids are left out."""
+        bucket = self._bucket(entity_type)
+        found = {}
+        for entity_id in entity_ids:
+            entity = bucket.get(entity_id)
+            if entity is not None:
+                found[entity_id] = entity
+        return found
+
+    def get_all(
+        self, entity_type: str, limit: Optional[int] = None, after: Optional[str] = None
+    ) -> List[Any]:
+        bucket = self._bucket(entity_type)
+        if limit is None and after is None:
+            # One C-level copy: a consistent snapshot without taking the lock
+            return list(bucket.values())
+        with self.lock(entity_type):
+            return [bucket[entity_id] for entity_id in self._order(entity_type).page(limit, after)]
+
+    def iter_all(self, entity_type: str, after: Optional[str] = None) -> Iterator[Any]:
+        """Lazily yield entities in insertion order, resuming after a cursor."""
+        with self.lock(entity_type):
+            entity_ids = self._order(entity_type).iter_ids(after)
+        return self._resolve(entity_type, entity_ids)
+
+    def iter_range(
+        self,
+        entity_type: str,
+        attribute: str,
+        low: Any = None,
+        high: Any = None,
+        reverse: bool = False,
+        after: Optional[str] = None,
+    ) -> Iterator[Any]:
+        """Lazily yield entities ordered by a sorted-indexed attribute.
+
+        Only entities with low <= value <= high are visited; ``after`` resumes
+        from the position of that entity id.
+        """
+        index = self._index(entity_type, attribute)
+        with self.lock(entity_type):
+            entity_ids = index.range(low, high, reverse=reverse, after=after)
+        return self._resolve(entity_type, entity_ids)
+
+    def iter_bbox(
+        self,
+        entity_type: str,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+    ) -> Iterator[Any]:
+        """Lazily yield entities whose coordinates fall inside the box."""
+        lat_attribute, lon_attribute = self.GRID_INDEXES[entity_type]
+        index = self._index(entity_type, self._grid_key(lat_attribute, lon_attribute))
+        with self.lock(entity_type):
+            entity_ids = index.within(min_lat, min_lon, max_lat, max_lon)
+        return self._resolve(entity_type, entity_ids)
+
+    def search_text(
+        self, entity_type: str, query: str, limit: Optional[int] = None
+    ) -> List[Tuple[Any, float]]:
+        """Rank entities matching every term of query; returns (entity, score) pairs."""
+        index = self._index(entity_type, self._text_key(self.TEXT_INDEXES[entity_type]))
+        bucket = self._bucket(entity_type)
+        with self.lock(entity_type):
+            return [(bucket[entity_id], score) for entity_id, score in index.search(query, limit)]
+
+    def _column_store(self, entity_type: str) -> _ColumnStore:
+        if entity_type not in self._columns:
+            raise ValueError(f"No column store for {entity_type}")
+        return self._index(entity_type, "columns")
+
+    def select_range(self, entity_type: str, **bounds: Tuple[Any, Any]) -> List[Any]:
+        """Entities with low <= value <= high for every ``attribute=(low, high)``.
+
+        A ``None`` bound is open; low > high selects values outside the gap.
+        Scans the column store, so no order is promised.
+        """
+        store = self._column_store(entity_type)
+        with self.lock(entity_type):
+            entity_ids = store.select(bounds)
+        return list(self._resolve(entity_type, entity_ids))
+
+    def histogram(
+        self,
+        entity_type: str,
+        attribute: str,
+        bins: int = 10,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+    ) -> List[Tuple[float, float, int]]:
+        """Equal-width (bin start, bin end, count) buckets of a column-stored attribute."""
+        store = self._column_store(entity_type)
+        with self.lock(entity_type):
+            return store.histogram(attribute, bins, low, high)
+
+    def nearest(
+        self,
+        entity_type: str,
+        lat: float,
+        lon: float,
+        k: int = 10,
+        radius_km: Optional[float] = None,
+    ) -> List[Tuple[Any, float]]:
+        """The k entities closest to a point as (entity, km) pairs, nearest first."""
+        lat_attribute, lon_attribute = self.GRID_INDEXES[entity_type]
+        store = self._column_store(entity_type)
+        bucket = self._bucket(entity_type)
+        with self.lock(entity_type):
+            found = store.nearest(lat_attribute, lon_attribute, lat, lon, k, radius_km)
+        # Skip anything deleted since the scan
+        pairs = ((bucket.get(entity_id), distance) for entity_id, distance in found)
+        return [(entity, distance) for entity, distance in pairs if entity is not None]
 
     def get_by_attribute(self, entity_type: str, attribute: str, value: Any) -> Optional[Any]:
         """Get entity by attribute value."""
+        index = self._index(entity_type, attribute)
+        if index is not None:
+            with self.lock(entity_type):
+                ids = index.lookup(value)
+                return self._bucket(entity_type).get(ids[0]) if ids else None
         bucket = self._bucket(entity_type)
-        for entity in bucket.values():
+        for entity in list(bucket.values()):
             if getattr(entity, attribute, None) == value:
                 return entity
         return None
 
+    def find_all_by_attribute(self, entity_type: str, attribute: str, value: Any) -> List[Any]:
+        """Get every entity whose attribute equals value."""
+        bucket = self._bucket(entity_type)
+        index = self._index(entity_type, attribute)
+        if index is not None:
+            with self.lock(entity_type):
+                return [bucket[entity_id] for entity_id in index.lookup(value)]
+        return [e for e in list(bucket.values()) if getattr(e, attribute, None) == value]
+
     def update(self, entity) -> None:
         entity_type = entity.__class__.__name__
-        bucket = self._bucket(entity_type)
-        bucket[entity.id] = entity
+        with self.lock(entity_type):
+            self._reindex(entity)
+            self._bucket(entity_type)[entity.id] = entity
+            self._append_order(entity_type, entity.id)
+            if self.journal is not None:
+                self.journal.record("update", entity_type, entity)
 
     def delete(self, entity_id: str, entity_type: str) -> bool:
         bucket = self._bucket(entity_type)
-        if entity_id in bucket:
+        with self.lock(entity_type):
+            if entity_id not in bucket:
+                return False
+            for index in self._built_indexes(entity_type):
+                index.discard(entity_id)
+            order = self._orders.get(entity_type)
+            if order is not None:
+                order.remove(entity_id)
             del bucket[entity_id]
+            if self.journal is not None:
+                self.journal.record("delete", entity_type, entity_id)
             return True
-        return False
 
     def exists(self, entity_id: str, entity_type: str) -> bool:
         return entity_id in self._bucket(entity_type)
 
+    # Bulk writes
+    BULK_CHUNK_SIZE = 1000
+
+    def bulk_create(self, entities: Iterable[Any], chunk_size: Optional[int] = None) -> int:
+        """Add many entities, all-or-nothing per chunk.
+
+        Each chunk is checked against stored ids, the unique indexes and
+        itself before any of it is stored, so a ``ValueError`` leaves the
+        earlier chunks in place and none of the failing one. ``entities``
+        is consumed lazily. Returns the number added.
+        """
+        return self._bulk(entities, chunk_size, upsert=False)
+
+    def bulk_upsert(self, entities: Iterable[Any], chunk_size: Optional[int] = None) -> int:
+        """Like ``bulk_create``, but entities whose id is stored replace it."""
+        return self._bulk(entities, chunk_size, upsert=True)
+
+    def _bulk(self, entities: Iterable[Any], chunk_size: Optional[int], upsert: bool) -> int:
+        count = 0
+        iterator = iter(entities)
+        while True:
+            chunk = list(islice(iterator, chunk_size or self.BULK_CHUNK_SIZE))
+            if not chunk:
+                return count
+            with ExitStack() as stack:
+                # Hold every type's lock for the whole chunk, in a fixed order
+                for entity_type in sorted({entity.__class__.__name__ for entity in chunk}):
+                    stack.enter_context(self.lock(entity_type))
+                self._check_chunk(chunk, upsert)
+                for entity in chunk:
+                    if upsert and self.exists(entity.id, entity.__class__.__name__):
+                        self.update(entity)
+                    else:
+                        self.add(entity)
+            count += len(chunk)
+
+    def _check_chunk(self, chunk: List[Any], upsert: bool) -> None:
+        seen_ids = set()
+        # (entity type, attribute) -> {value: id} for unique values in this chunk
+        seen_values: Dict[Tuple[str, str], Dict[Any, str]] = {}
+        for entity in chunk:
+            if not getattr(entity, "id", None):
+                entity.id = str(uuid.uuid4())
+            entity_type = entity.__class__.__name__
+            key = (entity_type, entity.id)
+            if not upsert and (key in seen_ids or self.exists(entity.id, entity_type)):
+                raise ValueError(f"Duplicate id '{entity.id}'")
+            seen_ids.add(key)
+            for index in self._built_indexes(entity_type):
+                index.check(entity)
+                if not getattr(index, "unique", False):
+                    continue
+                value = getattr(entity, index.attribute, None)
+                if value is None:
+                    continue
+                owners = seen_values.setdefault((entity_type, index.attribute), {})
+                if owners.setdefault(value, entity.id) != entity.id:
+                    raise ValueError(
+                        f"Duplicate value for unique attribute '{index.attribute}'"
+                    )
+
 repository = Repository()
@@ -1,12 +1,16 @@
-from typing import Any, List, Optional, Union
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from app.models import Amenity, Place, Review, User
 from app.persistence.repository import repository
+from app.services.geo import bounding_box, haversine_km
 
 
 class Facade:
     """Facade to orchestrate business logic and persistence."""
 
+    PLACE_SORTS = ("price", "-price")
+
     def __init__(self):
         self.repo = repository
 
@@ -19,11 +23,6 @@ class Facade:
         last_name: Optional[str] = None,
         is_admin: bool = False,
     ) -> Optional[User]:
-        # Check if email already exists
-        existing_user = self.repo.get_by_attribute("User", "email", email)
-        if existing_user:
-            raise ValueError("Email already registered")
-        
         user = User(
             email=email,
             password=password,
@@ -31,14 +30,19 @@ class Facade:
             last_name=last_name,
             is_admin=is_admin,
         )
-        self.repo.add(user)
+        # Check and insert atomically, so concurrent sign-ups cannot share an email
+        if self.repo.add_if_absent(user, "email") is not user:
+            raise ValueError("Email already registered")
         return user
 
     def get_user(self, user_id: str) -> Optional[User]:
         return self.repo.get(user_id, "User")
 
-    def list_users(self) -> List[User]:
-        return self.repo.get_all("User")
+    def get_users(self, user_ids: Iterable[str]) -> Dict[str, User]:
+        return self.repo.get_many(user_ids, "User")
+
+    def list_users(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[User]:
+        return self.repo.get_all("User", limit=limit, after=after)
 
     def update_user(
         self,
@@ -48,10 +52,25 @@ class Facade:
         first_name: Optional[str] = None,
         last_name: Optional[str] = None,
         is_admin: Optional[bool] = None,
+    ) -> Optional[User]:
+        with self.repo.lock("User"):
+            return self._update_user(user_id, email, password, first_name, last_name, is_admin)
+
+    def _update_user(
+        self,
+        user_id: str,
+        email: Optional[str],
+        password: Optional[str],
+        first_name: Optional[str],
+        last_name: Optional[str],
+        is_admin: Optional[bool],
     ) -> Optional[User]:
         user = self.get_user(user_id)
         if not user:
             return None
+        if email is not None and email != user.email:
+            if self.repo.get_by_attribute("User", "email", email):
+                raise ValueError("Email already registered")
         updates: dict[str, Any] = {}
         if email is not None:
             updates["email"] = email
@@ -76,8 +95,11 @@ class Facade:
     def get_amenity(self, amenity_id: str) -> Optional[Amenity]:
         return self.repo.get(amenity_id, "Amenity")
 
-    def list_amenities(self) -> List[Amenity]:
-        return self.repo.get_all("Amenity")
+    def get_amenities(self, amenity_ids: Iterable[str]) -> Dict[str, Amenity]:
+        return self.repo.get_many(amenity_ids, "Amenity")
+
+    def list_amenities(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[Amenity]:
+        return self.repo.get_all("Amenity", limit=limit, after=after)
 
     def update_amenity(
         self, amenity_id: str, name: Optional[str] = None, description: Optional[str] = None
@@ -96,7 +118,7 @@ class Facade:
 
     # Places
     def _amenities_exist(self, amenity_ids: List[str]) -> bool:
-        return all(self.get_amenity(a_id) for a_id in amenity_ids)
+        return len(self.get_amenities(set(amenity_ids))) == len(set(amenity_ids))
 
     def create_place(
         self,
@@ -128,8 +150,117 @@ class Facade:
     def get_place(self, place_id: str) -> Optional[Place]:
         return self.repo.get(place_id, "Place")
 
-    def list_places(self) -> List[Place]:
-        return self.repo.get_all("Place")
+    def list_places(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[Place]:
+        return self.repo.get_all("Place", limit=limit, after=after)
+
+    def search_places(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        q: Optional[str] = None,
+        amenity: Optional[str] = None,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[Place]:
+        """Filter and sort places, reading only as far as one page needs.
+
+        Price bounds and price sorting walk the sorted price index; text and
+        amenity filters are applied to that stream until the page is full.
+        """
+        if sort is not None and sort not in self.PLACE_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(self.PLACE_SORTS)}")
+        if sort or min_price is not None or max_price is not None:
+            places = self.repo.iter_range(
+                "Place", "price", low=min_price, high=max_price,
+                reverse=sort == "-price", after=after,
+            )
+        else:
+            places = self.repo.iter_all("Place", after=after)
+        if q:
+            needle = q.casefold()
+            places = (
+                p for p in places
+                if needle in p.title.casefold() or needle in p.description.casefold()
+            )
+        if amenity:
+            places = (p for p in places if amenity in p.amenity_ids)
+        return list(islice(places, limit))
+
+    def places_in_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[Place]:
+        """Places inside a bounding box, ordered by id."""
+        places = sorted(
+            self.repo.iter_bbox("Place", min_lat, min_lon, max_lat, max_lon),
+            key=lambda p: p.id,
+        )
+        return self._page_after(places, limit, after)
+
+    def places_nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[Place]:
+        """Places within radius_km of a point, nearest first.
+
+        The grid index narrows candidates to the circle's bounding box; the
+        exact haversine distance then drops the corners and orders the rest.
+        """
+        ranked = []
+        for place in self.repo.iter_bbox("Place", *bounding_box(lat, lon, radius_km)):
+            distance = haversine_km(lat, lon, place.latitude, place.longitude)
+            if distance <= radius_km:
+                ranked.append((distance, place.id, place))
+        ranked.sort(key=lambda entry: entry[:2])
+        return self._page_after([place for _, _, place in ranked], limit, after)
+
+    def price_histogram(
+        self,
+        bins: int = 10,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> List[Tuple[float, float, int]]:
+        """Number of places per equal-width price band, from the price column."""
+        return self.repo.histogram("Place", "price", bins, min_price, max_price)
+
+    def search_place_text(
+        self, query: str, limit: Optional[int] = None, after: Optional[str] = None
+    ) -> List[Place]:
+        """Places whose title or description contain every query term, best match first."""
+        return self._search_text("Place", query, limit, after)
+
+    def _search_text(
+        self, entity_type: str, query: str, limit: Optional[int], after: Optional[str]
+    ) -> List[Any]:
+        if after is None:
+            return [entity for entity, _ in self.repo.search_text(entity_type, query, limit)]
+        ranked = [entity for entity, _ in self.repo.search_text(entity_type, query)]
+        return self._page_after(ranked, limit, after)
+
+    @staticmethod
+    def _page_after(items: List[Any], limit: Optional[int], after: Optional[str]) -> List[Any]:
+        start = 0
+        if after is not None:
+            for i, item in enumerate(items):
+                if item.id == after:
+                    start = i + 1
+                    break
+            else:
+                raise ValueError("Unknown cursor")
+        return items[start:] if limit is None else items[start:start + limit]
+
+    def list_places_for_owner(self, owner_id: str) -> List[Place]:
+        return self.repo.find_all_by_attribute("Place", "owner_id", owner_id)
 
     def update_place(
         self,
@@ -180,18 +311,25 @@ class Facade:
             return None
         review = Review(user_id=user_id, place_id=place_id, rating=rating, text=text)
         self.repo.add(review)
+        self._adjust_rating(review.place_id, 1, review.rating)
         return review
 
     def get_review(self, review_id: str) -> Optional[Review]:
         return self.repo.get(review_id, "Review")
 
-    def list_reviews(self) -> List[Review]:
-        return self.repo.get_all("Review")
+    def list_reviews(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[Review]:
+        return self.repo.get_all("Review", limit=limit, after=after)
+
+    def search_review_text(
+        self, query: str, limit: Optional[int] = None, after: Optional[str] = None
+    ) -> List[Review]:
+        """Reviews whose text contains every query term, best match first."""
+        return self._search_text("Review", query, limit, after)
 
     def list_reviews_for_place(self, place_id: str) -> Optional[List[Review]]:
         if not self.get_place(place_id):
             return None
-        return [r for r in self.list_reviews() if r.place_id == place_id]
+        return self.repo.find_all_by_attribute("Review", "place_id", place_id)
 
     def update_review(
         self,
@@ -217,12 +355,37 @@ class Facade:
             updates["rating"] = rating
         if text is not None:
             updates["text"] = text
-        review.update(**updates)
-        self.repo.update(review)
+        # Locked so a concurrent edit cannot move the same rating twice
+        # (locks are taken in type-name order: Place, then Review)
+        with self.repo.lock("Place"), self.repo.lock("Review"):
+            old_place_id, old_rating = review.place_id, review.rating
+            review.update(**updates)
+            self.repo.update(review)
+            if (old_place_id, old_rating) != (review.place_id, review.rating):
+                self._adjust_rating(old_place_id, -1, -old_rating)
+                self._adjust_rating(review.place_id, 1, review.rating)
         return review
 
     def delete_review(self, review_id: str) -> bool:
-        return self.repo.delete(review_id, "Review")
+        review = self.get_review(review_id)
+        if not review:
+            return False
+        with self.repo.lock("Place"), self.repo.lock("Review"):
+            # Only the caller that actually removed it adjusts the place
+            if not self.repo.delete(review_id, "Review"):
+                return False
+            self._adjust_rating(review.place_id, -1, -review.rating)
+        return True
+
+    def _adjust_rating(self, place_id: str, count_delta: int, rating_delta: int) -> None:
+        """Keep a place's review_count/rating_sum in step with its reviews."""
+        with self.repo.lock("Place"):
+            place = self.get_place(place_id)
+            if not place:
+                return
+            place.review_count += count_delta
+            place.rating_sum += rating_delta
+            self.repo.update(place)
 
 
 facade = Facade()
@@ -0,0 +1,63 @@
+"""Time whole-bucket Place scans: entity objects vs the column store.
+
+Usage (from part2/): python -m benchmarks.column_scans [count]
+"""
+import random
+import sys
+import time
+
+from app.models import Place
+from app.persistence import repository as repository_module
+from app.persistence.repository import Repository
+from app.services.geo import haversine_km
+
+
+def timed(function, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(42)
+    repo = Repository()
+    repo.bulk_create(
+        Place(title=f"Place {i}", price=rng.uniform(10, 1000),
+              latitude=rng.uniform(-60, 70), longitude=rng.uniform(-180, 180), owner_id="o")
+        for i in range(count)
+    )
+    places = repo.get_all("Place")
+
+    def objects_range():
+        return [p for p in places
+                if 100 <= p.price <= 200 and 40 <= p.latitude <= 50 and -10 <= p.longitude <= 20]
+
+    def objects_histogram():
+        counts = [0] * 20
+        for p in places:
+            counts[min(int((p.price - 10) / 49.5), 19)] += 1
+        return counts
+
+    def objects_nearest():
+        return sorted(places, key=lambda p: haversine_km(48.85, 2.35, p.latitude, p.longitude))[:10]
+
+    cases = [
+        ("range", objects_range,
+         lambda: repo.select_range("Place", price=(100, 200), latitude=(40, 50),
+                                   longitude=(-10, 20))),
+        ("histogram", objects_histogram, lambda: repo.histogram("Place", "price", bins=20)),
+        ("nearest", objects_nearest, lambda: repo.nearest("Place", 48.85, 2.35, k=10)),
+    ]
+    engine = "numpy" if repository_module.numpy is not None else "array"
+    print(f"{count} places, column scans with {engine}")
+    print(f"{'query':<11}{'objects ms':>12}{'columns ms':>12}")
+    for name, objects, columns in cases:
+        print(f"{name:<11}{timed(objects):>12.1f}{timed(columns):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Measure the memory each stored entity costs, indexes included.
+
+Usage (from part2/): python -m benchmarks.entity_memory [count]
+"""
+import gc
+import sys
+import tracemalloc
+import uuid
+
+from app.models import Amenity, Place, Review, User
+from app.persistence.repository import Repository
+
+
+def build(kind: str, i: int, owner_ids, place_ids, amenity_ids):
+    if kind == "User":
+        return User(email=f"user{i}@example.com", password="secret123",
+                    first_name="First", last_name="Last")
+    if kind == "Amenity":
+        return Amenity(name=f"Amenity {i}")
+    if kind == "Place":
+        return Place(title=f"Place {i}", description="Quiet flat near the park",
+                     price=float(i % 500 + 1), latitude=(i % 170) - 85.0,
+                     longitude=(i % 350) - 175.0, owner_id=owner_ids[i % len(owner_ids)],
+                     amenity_ids=amenity_ids[: i % 4])
+    return Review(text="Lovely stay", rating=i % 5 + 1,
+                  user_id=owner_ids[i % len(owner_ids)], place_id=place_ids[i % len(place_ids)])
+
+
+def measure(kind: str, count: int, repository: bool):
+    owner_ids = [str(uuid.uuid4()) for _ in range(100)]
+    place_ids = [str(uuid.uuid4()) for _ in range(100)]
+    amenity_ids = [str(uuid.uuid4()) for _ in range(4)]
+    repo = Repository()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [build(kind, i, owner_ids, place_ids, amenity_ids) for i in range(count)]
+    if repository:
+        for entity in entities:
+            repo.add(entity)
+        # Text indexes are built lazily; force them so they are counted
+        for entity_type, attributes in repo.TEXT_INDEXES.items():
+            repo.search_text(entity_type, "x")
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / count
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{'entity':<10}{'object B':>12}{'stored B':>12}")
+    for kind in ("User", "Amenity", "Place", "Review"):
+        print(f"{kind:<10}{measure(kind, count, False):>12.0f}{measure(kind, count, True):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
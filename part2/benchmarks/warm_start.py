@@ -0,0 +1,82 @@
+"""Time a warm start: restoring a Repository from its journal directory.
+
+Builds ``count`` entities (1 user : 4 places : 5 reviews), snapshots them,
+then reopens the directory in a fresh Repository and reports how long
+``Journal.open`` took, how long the first lookups on each index took
+(each builds that index from the mapped columns) and how long the
+restored repository takes to snapshot again.
+
+Usage (from part2/): python -m benchmarks.warm_start [count]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+from app.models import Place, Review, User
+from app.persistence.journal import Journal
+from app.persistence.repository import Repository
+
+
+def populate(repo: Repository, count: int) -> None:
+    users = max(count // 10, 1)
+    places = count * 4 // 10
+    reviews = count - users - places
+    user_ids = [User(email=f"user{i}@example.com", password="secret123",
+                     first_name="First", last_name=f"Last{i}") for i in range(users)]
+    repo.bulk_create(user_ids)
+    user_ids = [user.id for user in user_ids]
+    place_list = [Place(title=f"Place {i}", description="Quiet flat near the park",
+                        price=float(i % 500 + 1), latitude=(i % 170) - 85.0,
+                        longitude=(i % 350) - 175.0, owner_id=user_ids[i % users])
+                  for i in range(places)]
+    repo.bulk_create(place_list)
+    place_ids = [place.id for place in place_list]
+    del place_list
+    repo.bulk_create(Review(text="Lovely stay, would come back", rating=i % 5 + 1,
+                            user_id=user_ids[i % users], place_id=place_ids[i % places])
+                     for i in range(reviews))
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as directory:
+        repo = Repository()
+        populate(repo, count)
+        journal = Journal(repo, directory)
+        journal.open()
+        start = time.perf_counter()
+        journal.close()
+        written = time.perf_counter() - start
+        size = os.path.getsize(os.path.join(directory, "snapshot.bin"))
+        probe_user = next(iter(repo.iter_all("User")))
+        probe_place = next(iter(repo.iter_all("Place")))
+        del repo, journal
+        gc.collect()
+
+        restored = Repository()
+        start = time.perf_counter()
+        journal = Journal(restored, directory)
+        loaded = journal.open()
+        opened = time.perf_counter() - start
+        print(f"{count} entities, snapshot {size / 1e6:.0f} MB written in {written:.2f}s")
+        print(f"open: {opened:.3f}s {loaded}")
+        for name, lookup in [
+            ("get", lambda: restored.get(probe_place.id, "Place")),
+            ("email", lambda: restored.get_by_attribute("User", "email", probe_user.email)),
+            ("owner", lambda: restored.find_all_by_attribute("Place", "owner_id",
+                                                              probe_place.owner_id)),
+            ("price", lambda: list(restored.iter_range("Place", "price", 10.0, 10.0))),
+            ("page", lambda: restored.get_all("Review", limit=20)),
+        ]:
+            start = time.perf_counter()
+            lookup()
+            print(f"first {name:<6}{(time.perf_counter() - start) * 1000:9.1f} ms")
+        start = time.perf_counter()
+        journal.close()
+        print(f"snapshot again: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
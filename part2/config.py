@@ -13,6 +13,12 @@ class Config:
     # Application settings
     HOST = '0.0.0.0'
     PORT = 5000
+    
+    # Persistence: when DATA_DIR is set the in-memory store is restored from
+    # there on startup and saved as snapshot + write-ahead log
+    DATA_DIR = os.getenv('HBNB_DATA_DIR')
+    SNAPSHOT_INTERVAL = float(os.getenv('HBNB_SNAPSHOT_INTERVAL', '300'))
+    WAL_FSYNC = os.getenv('HBNB_WAL_FSYNC', '').lower() in ('1', 'true', 'yes')
 
 class DevelopmentConfig(Config):
     """Development environment configuration"""
@@ -119,6 +119,33 @@ class TestAPIEndpoints(unittest.TestCase):
         data = json.loads(response.data)
         self.assertEqual(data['first_name'], 'Updated')
 
+    def test_list_users_paginated(self):
+        """Test GET /api/v1/users/ with limit and the next link"""
+        for i in range(3):
+            self.client.post(
+                '/api/v1/users/',
+                data=json.dumps({
+                    'email': f'page{i}@example.com',
+                    'password': 'password123'
+                }),
+                content_type='application/json'
+            )
+
+        response = self.client.get('/api/v1/users/?limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.data)), 2)
+        self.assertIn('rel="next"', response.headers['Link'])
+
+        next_url = response.headers['Link'].split('>')[0].lstrip('<')
+        response = self.client.get(next_url)
+        self.assertEqual(len(json.loads(response.data)), 1)
+        self.assertNotIn('Link', response.headers)
+
+    def test_list_users_invalid_limit(self):
+        """Test GET /api/v1/users/ rejects a bad limit"""
+        response = self.client.get('/api/v1/users/?limit=0')
+        self.assertEqual(response.status_code, 400)
+
     # Amenity endpoint tests
     def test_create_amenity(self):
         """Test POST /api/v1/amenities/"""
@@ -304,6 +331,162 @@ class TestAPIEndpoints(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
         self.assertGreaterEqual(len(data), 2)
+        for place in data:
+            self.assertEqual(place['owner']['id'], owner_id)
+
+    def test_list_places_filtered(self):
+        """Test GET /api/v1/places/ with price, text and sort parameters"""
+        user_response = self.client.post(
+            '/api/v1/users/',
+            data=json.dumps({
+                'email': 'owner@example.com',
+                'password': 'password123'
+            }),
+            content_type='application/json'
+        )
+        owner_id = json.loads(user_response.data)['id']
+        for title, price in [('Beach Hut', 80.0), ('Beach Villa', 300.0), ('Loft', 120.0)]:
+            self.client.post(
+                '/api/v1/places/',
+                data=json.dumps({
+                    'title': title,
+                    'price': price,
+                    'latitude': 0.0,
+                    'longitude': 0.0,
+                    'owner_id': owner_id
+                }),
+                content_type='application/json'
+            )
+
+        response = self.client.get('/api/v1/places/?max_price=200&sort=-price')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['title'] for p in json.loads(response.data)], ['Loft', 'Beach Hut'])
+
+        response = self.client.get('/api/v1/places/?q=beach&min_price=100')
+        self.assertEqual([p['title'] for p in json.loads(response.data)], ['Beach Villa'])
+
+        self.assertEqual(self.client.get('/api/v1/places/?max_price=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/?sort=title').status_code, 400)
+
+    def test_places_nearby(self):
+        """Test GET /api/v1/places/nearby"""
+        user_response = self.client.post(
+            '/api/v1/users/',
+            data=json.dumps({
+                'email': 'owner@example.com',
+                'password': 'password123'
+            }),
+            content_type='application/json'
+        )
+        owner_id = json.loads(user_response.data)['id']
+        for title, lat, lon in [('Louvre', 48.8606, 2.3376), ('London', 51.5074, -0.1278)]:
+            self.client.post(
+                '/api/v1/places/',
+                data=json.dumps({
+                    'title': title,
+                    'price': 100.0,
+                    'latitude': lat,
+                    'longitude': lon,
+                    'owner_id': owner_id
+                }),
+                content_type='application/json'
+            )
+
+        response = self.client.get('/api/v1/places/nearby?lat=48.8566&lon=2.3522&radius_km=10')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([p['title'] for p in data], ['Louvre'])
+        self.assertLess(data[0]['distance_km'], 2)
+
+        response = self.client.get('/api/v1/places/bbox?min_lat=50&min_lon=-1&max_lat=52&max_lon=1')
+        self.assertEqual([p['title'] for p in json.loads(response.data)], ['London'])
+
+        self.assertEqual(self.client.get('/api/v1/places/nearby?lat=95&lon=0&radius_km=1').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/nearby?lat=1').status_code, 400)
+
+    def test_place_price_histogram(self):
+        """Test GET /api/v1/places/price-histogram"""
+        user_response = self.client.post(
+            '/api/v1/users/',
+            data=json.dumps({
+                'email': 'owner@example.com',
+                'password': 'password123'
+            }),
+            content_type='application/json'
+        )
+        owner_id = json.loads(user_response.data)['id']
+        for title, price in [('Hut', 20.0), ('Flat', 60.0), ('Villa', 100.0)]:
+            self.client.post(
+                '/api/v1/places/',
+                data=json.dumps({
+                    'title': title,
+                    'price': price,
+                    'latitude': 0.0,
+                    'longitude': 0.0,
+                    'owner_id': owner_id
+                }),
+                content_type='application/json'
+            )
+
+        response = self.client.get('/api/v1/places/price-histogram?bins=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), [
+            {'low': 20.0, 'high': 60.0, 'count': 1},
+            {'low': 60.0, 'high': 100.0, 'count': 2},
+        ])
+        response = self.client.get('/api/v1/places/price-histogram?bins=1&max_price=50')
+        self.assertEqual([b['count'] for b in json.loads(response.data)], [1])
+
+        self.assertEqual(self.client.get('/api/v1/places/price-histogram?bins=0').status_code, 400)
+        self.assertEqual(self.client.get(
+            '/api/v1/places/price-histogram?min_price=80&max_price=40').status_code, 400)
+
+    def test_search_places_and_reviews(self):
+        """Test GET /api/v1/places/search and /api/v1/reviews/search"""
+        user_response = self.client.post(
+            '/api/v1/users/',
+            data=json.dumps({
+                'email': 'owner@example.com',
+                'password': 'password123'
+            }),
+            content_type='application/json'
+        )
+        owner_id = json.loads(user_response.data)['id']
+        place_ids = []
+        for title, description in [('Loft', 'Close to the beach'), ('Beach Hut', 'On the beach')]:
+            response = self.client.post(
+                '/api/v1/places/',
+                data=json.dumps({
+                    'title': title,
+                    'description': description,
+                    'price': 100.0,
+                    'latitude': 0.0,
+                    'longitude': 0.0,
+                    'owner_id': owner_id
+                }),
+                content_type='application/json'
+            )
+            place_ids.append(json.loads(response.data)['id'])
+        self.client.post(
+            '/api/v1/reviews/',
+            data=json.dumps({
+                'user_id': owner_id,
+                'place_id': place_ids[0],
+                'rating': 5,
+                'text': 'Spotless and quiet'
+            }),
+            content_type='application/json'
+        )
+
+        response = self.client.get('/api/v1/places/search?q=beach')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['title'] for p in json.loads(response.data)], ['Beach Hut', 'Loft'])
+
+        response = self.client.get('/api/v1/reviews/search?q=quiet')
+        self.assertEqual([r['text'] for r in json.loads(response.data)], ['Spotless and quiet'])
+
+        self.assertEqual(self.client.get('/api/v1/places/search').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/reviews/search?q=').status_code, 400)
 
     # Review endpoint tests
     def test_create_review(self):
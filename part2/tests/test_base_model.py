@@ -61,6 +61,36 @@ class TestBaseModel(unittest.TestCase):
         model2 = BaseModel()
         self.assertNotEqual(model1.id, model2.id)
 
+    def test_compact_state(self):
+        """Test models have no __dict__ and keep microsecond timestamps."""
+        from app.models import Place
+        stamp = datetime(2024, 5, 6, 7, 8, 9, 123456)
+        place = Place(title="Hut", price=10.0, owner_id="o", created_at=stamp,
+                      amenity_ids=["a1"])
+        self.assertFalse(hasattr(place, "__dict__"))
+        self.assertEqual(place.created_at, stamp)
+        self.assertIsInstance(place._created_at, float)
+        with self.assertRaises(AttributeError):
+            place.nickname = "x"
+
+    def test_pickle_round_trip(self):
+        """Test pickled models restore, including state saved before slots."""
+        import pickle
+        from app.models import Place
+        place = Place(title="Hut", price=10.0, owner_id="o", amenity_ids=["a1", "a2"])
+        copy = pickle.loads(pickle.dumps(place, protocol=5))
+        self.assertEqual(copy.to_dict(), place.to_dict())
+
+        legacy = Place.__new__(Place)
+        legacy.__setstate__({
+            "id": "p1", "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 2),
+            "title": "Old", "description": "", "price": 5.0, "latitude": 0.0,
+            "longitude": 0.0, "owner_id": "o", "amenity_ids": ["a1"],
+            "review_count": 0, "rating_sum": 0,
+        })
+        self.assertEqual((legacy.title, legacy.amenity_ids), ("Old", ("a1",)))
+        self.assertEqual(legacy.to_dict()["updated_at"], "2024-01-02T00:00:00")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,5 @@
 """Integration tests for Facade pattern."""
+import threading
 import unittest
 from app.services.facade import Facade
 from app.persistence.repository import Repository
@@ -69,6 +70,14 @@ class TestFacade(unittest.TestCase):
         self.assertEqual(updated_user.last_name, "Name")
         self.assertEqual(updated_user.email, "original@example.com")
 
+    def test_update_user_duplicate_email(self):
+        """Test updating a user to another user's email fails."""
+        self.facade.create_user(email="taken@example.com", password="password123")
+        user = self.facade.create_user(email="free@example.com", password="password123")
+        with self.assertRaises(ValueError):
+            self.facade.update_user(user.id, email="taken@example.com")
+        self.assertEqual(self.facade.get_user(user.id).email, "free@example.com")
+
     def test_update_nonexistent_user(self):
         """Test updating a user that doesn't exist."""
         result = self.facade.update_user(
@@ -217,6 +226,73 @@ class TestFacade(unittest.TestCase):
         places = self.facade.list_places()
         self.assertEqual(len(places), 2)
 
+    def test_list_places_for_owner(self):
+        """Test listing places owned by one user."""
+        owner = self.facade.create_user(email="owner@example.com", password="password123")
+        other = self.facade.create_user(email="other@example.com", password="password123")
+        place = self.facade.create_place(
+            title="Mine", description="", price=100.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id
+        )
+        self.facade.create_place(
+            title="Theirs", description="", price=100.0,
+            latitude=0.0, longitude=0.0, owner_id=other.id
+        )
+        self.assertEqual(self.facade.list_places_for_owner(owner.id), [place])
+
+        self.facade.update_place(place.id, owner_id=other.id)
+        self.assertEqual(self.facade.list_places_for_owner(owner.id), [])
+        self.assertEqual(len(self.facade.list_places_for_owner(other.id)), 2)
+
+    def test_search_places(self):
+        """Test filtering and sorting places."""
+        owner = self.facade.create_user(email="owner@example.com", password="password123")
+        wifi = self.facade.create_amenity(name="WiFi")
+        cheap = self.facade.create_place(
+            title="Cheap Room", description="Small", price=40.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id, amenity_ids=[wifi.id]
+        )
+        villa = self.facade.create_place(
+            title="Sea Villa", description="Big", price=400.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id
+        )
+        flat = self.facade.create_place(
+            title="City Flat", description="Near the sea", price=120.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id, amenity_ids=[wifi.id]
+        )
+
+        self.assertEqual(self.facade.search_places(max_price=150.0, sort="price"), [cheap, flat])
+        self.assertEqual(self.facade.search_places(sort="-price"), [villa, flat, cheap])
+        self.assertEqual(self.facade.search_places(q="SEA", sort="price"), [flat, villa])
+        self.assertEqual(self.facade.search_places(amenity=wifi.id), [cheap, flat])
+        self.assertEqual(self.facade.search_places(sort="-price", limit=1, after=villa.id), [flat])
+        with self.assertRaises(ValueError):
+            self.facade.search_places(sort="title")
+
+    def test_places_nearby(self):
+        """Test radius search returns the nearest places first."""
+        owner = self.facade.create_user(email="owner@example.com", password="password123")
+
+        def place(title, lat, lon):
+            return self.facade.create_place(
+                title=title, description="", price=100.0,
+                latitude=lat, longitude=lon, owner_id=owner.id
+            )
+
+        louvre = place("Louvre", 48.8606, 2.3376)
+        versailles = place("Versailles", 48.8049, 2.1204)
+        place("London", 51.5074, -0.1278)
+
+        self.assertEqual(self.facade.places_nearby(48.8566, 2.3522, 5), [louvre])
+        self.assertEqual(self.facade.places_nearby(48.8566, 2.3522, 30), [louvre, versailles])
+        self.assertEqual(
+            self.facade.places_nearby(48.8566, 2.3522, 30, limit=1, after=louvre.id), [versailles]
+        )
+        self.assertEqual(
+            self.facade.places_in_bbox(48.0, 2.0, 49.0, 3.0),
+            sorted([louvre, versailles], key=lambda p: p.id),
+        )
+
     def test_update_place(self):
         """Test updating a place."""
         user = self.facade.create_user(
@@ -350,6 +426,57 @@ class TestFacade(unittest.TestCase):
         self.assertIsNotNone(reviews)
         self.assertEqual(len(reviews), 2)
 
+    def test_review_aggregates_follow_reviews(self):
+        """Test review_count and avg_rating track create, update and delete."""
+        user = self.facade.create_user(email="user@example.com", password="password123")
+        owner = self.facade.create_user(email="owner@example.com", password="password123")
+        place = self.facade.create_place(
+            title="House", description="Nice", price=100.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id
+        )
+        other = self.facade.create_place(
+            title="Flat", description="Nice", price=80.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id
+        )
+        self.assertIsNone(place.avg_rating)
+
+        first = self.facade.create_review(user.id, place.id, 5, "Excellent place!")
+        self.facade.create_review(owner.id, place.id, 2, "Could be better")
+        self.assertEqual(place.review_count, 2)
+        self.assertEqual(place.avg_rating, 3.5)
+
+        self.facade.update_review(first.id, rating=4)
+        self.assertEqual(place.avg_rating, 3.0)
+
+        self.facade.update_review(first.id, place_id=other.id)
+        self.assertEqual((place.review_count, place.avg_rating), (1, 2.0))
+        self.assertEqual((other.review_count, other.avg_rating), (1, 4.0))
+
+        self.facade.delete_review(first.id)
+        self.assertEqual(other.review_count, 0)
+        self.assertIsNone(other.avg_rating)
+
+    def test_search_text(self):
+        """Test ranked full-text search over places and reviews."""
+        owner = self.facade.create_user(email="owner@example.com", password="password123")
+        hut = self.facade.create_place(
+            title="Beach hut", description="Sand, sea and beach", price=50.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id
+        )
+        loft = self.facade.create_place(
+            title="Loft", description="Ten minutes from the beach", price=90.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id
+        )
+        self.assertEqual(self.facade.search_place_text("beach"), [hut, loft])
+        self.assertEqual(self.facade.search_place_text("beach", limit=1, after=hut.id), [loft])
+        with self.assertRaises(ValueError):
+            self.facade.search_place_text("beach", after="nope")
+
+        review = self.facade.create_review(owner.id, loft.id, 4, "Quiet street")
+        self.assertEqual(self.facade.search_review_text("quiet"), [review])
+        self.facade.update_review(review.id, text="Noisy street")
+        self.assertEqual(self.facade.search_review_text("quiet"), [])
+
     def test_delete_review(self):
         """Test deleting a review."""
         user = self.facade.create_user(
@@ -382,6 +509,7 @@ class TestFacade(unittest.TestCase):
         # Verify it's deleted
         deleted_review = self.facade.get_review(review.id)
         self.assertIsNone(deleted_review)
+        self.assertEqual(self.facade.list_reviews_for_place(place.id), [])
 
     def test_delete_nonexistent_review(self):
         """Test deleting a review that doesn't exist."""
@@ -389,5 +517,64 @@ class TestFacade(unittest.TestCase):
         self.assertFalse(result)
 
 
+class TestFacadeThreads(unittest.TestCase):
+    """Test cases for facade writes racing on one repository."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.facade = Facade()
+        self.facade.repo._storage = {}
+
+    def tearDown(self):
+        """Clean up after each test."""
+        self.facade.repo._storage = {}
+
+    def _race(self, target, count=8):
+        barrier = threading.Barrier(count)
+        results = []
+
+        def worker(n):
+            barrier.wait()
+            try:
+                results.append(target(n))
+            except ValueError as error:
+                results.append(error)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_signups_share_no_email(self):
+        """Test racing sign-ups with one email create a single user."""
+        results = self._race(
+            lambda n: self.facade.create_user(email="race@example.com", password="secret1")
+        )
+        self.assertEqual(sum(not isinstance(r, ValueError) for r in results), 1)
+        self.assertEqual(len(self.facade.list_users()), 1)
+
+    def test_concurrent_reviews_keep_aggregates(self):
+        """Test racing review writes leave the place aggregates exact."""
+        owner = self.facade.create_user(email="owner@example.com", password="secret1")
+        place = self.facade.create_place(
+            title="Busy", description=None, price=10.0,
+            latitude=0.0, longitude=0.0, owner_id=owner.id,
+        )
+        guests = [self.facade.create_user(email=f"g{n}@example.com", password="secret1")
+                  for n in range(8)]
+
+        def review_twice(n):
+            for _ in range(20):
+                review = self.facade.create_review(guests[n].id, place.id, 4)
+                self.facade.update_review(review.id, rating=5)
+                self.facade.delete_review(review.id)
+            return self.facade.create_review(guests[n].id, place.id, 3)
+
+        self._race(review_twice)
+        self.assertEqual((place.review_count, place.rating_sum), (8, 24))
+
+
 if __name__ == "__main__":
     unittest.main()
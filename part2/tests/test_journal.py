@@ -0,0 +1,151 @@
+"""Unit tests for snapshot + write-ahead log persistence."""
+import os
+import shutil
+import tempfile
+import unittest
+from app.models import Place, Review, User
+from app.persistence.journal import Journal
+from app.persistence.repository import Repository
+
+
+class TestJournal(unittest.TestCase):
+    """Test cases for restoring the repository after a restart."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.directory = tempfile.mkdtemp()
+        self.repo = Repository()
+        self.journal = Journal(self.repo, self.directory)
+        self.journal.open()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        if self.repo.journal is not None:
+            self.journal.close()
+        shutil.rmtree(self.directory)
+
+    def _restart(self):
+        """Open the same directory the way a new process would."""
+        repo = Repository()
+        counts = Journal(repo, self.directory).open()
+        return repo, counts
+
+    def test_log_is_replayed_without_snapshot(self):
+        """Test a crash before any snapshot loses nothing."""
+        user = User(email="a@example.com", password="secret1")
+        place = Place(title="Hut", price=10.0, owner_id=user.id)
+        self.repo.add(user)
+        self.repo.add(place)
+        place.price = 25.0
+        self.repo.update(place)
+        review = Review(text="Nice", rating=4, user_id=user.id, place_id=place.id)
+        self.repo.add(review)
+        self.repo.delete(review.id, "Review")
+
+        repo, counts = self._restart()
+        self.assertEqual(counts, {"snapshot": 0, "log": 5})
+        self.assertEqual(repo.get(place.id, "Place").price, 25.0)
+        self.assertIsNone(repo.get(review.id, "Review"))
+        self.assertEqual(repo.get_by_attribute("User", "email", "a@example.com").id, user.id)
+
+    def test_snapshot_then_tail(self):
+        """Test a snapshot plus the writes after it restore everything in order."""
+        places = [Place(title=f"P{i}", price=float(i), owner_id="o") for i in range(5)]
+        for place in places:
+            self.repo.add(place)
+        self.assertEqual(self.journal.snapshot(), 5)
+        self.repo.delete(places[0].id, "Place")
+        self.repo.add(Place(title="Late", price=99.0, owner_id="o"))
+
+        repo, counts = self._restart()
+        self.assertEqual(counts, {"snapshot": 5, "log": 2})
+        self.assertEqual([p.title for p in repo.get_all("Place")],
+                         ["P1", "P2", "P3", "P4", "Late"])
+        self.assertEqual([p.title for p in repo.iter_range("Place", "price", 4, None)],
+                         ["P4", "Late"])
+        self.assertEqual(len(repo.find_all_by_attribute("Place", "owner_id", "o")), 5)
+        self.assertEqual([p.title for p, _ in repo.search_text("Place", "p3")], ["P3"])
+
+    def test_snapshot_drops_covered_logs(self):
+        """Test only the log written after the last snapshot is kept."""
+        self.repo.add(User(email="a@example.com", password="secret1"))
+        self.journal.snapshot()
+        self.journal.snapshot()
+        logs = sorted(name for name in os.listdir(self.directory) if name.endswith(".log"))
+        self.assertEqual(logs, ["wal.2.log"])
+
+    def test_torn_tail_is_dropped(self):
+        """Test a half-written last record is ignored and cut off."""
+        self.repo.add(User(email="a@example.com", password="secret1"))
+        self.journal.close()
+        self.repo.add(User(email="b@example.com", password="secret1"))  # not journaled
+        log = os.path.join(self.directory, "wal.1.log")
+        with open(log, "ab") as stream:
+            stream.write(b"\x80\x05\x95garbage")
+        size = os.path.getsize(log)
+
+        repo, counts = self._restart()
+        self.assertEqual(counts, {"snapshot": 1, "log": 0})
+        self.assertIsNone(repo.get_by_attribute("User", "email", "b@example.com"))
+        self.assertLess(os.path.getsize(log), size)
+
+    def test_every_type_and_column_kind_round_trips(self):
+        """Test a snapshot of several types restores every attribute as it was."""
+        user = User(email="a@example.com", password="secret1", first_name="Zoë", is_admin=True)
+        place = Place(title="Hut\0 by the lake", price=10.5, latitude=48.1, longitude=-1.5,
+                      owner_id=user.id, amenity_ids=["a1", "a2"], review_count=3, rating_sum=12)
+        review = Review(text="Nice", rating=4, user_id=user.id, place_id=place.id)
+        for entity in (user, place, review):
+            self.repo.add(entity)
+        self.journal.snapshot()
+
+        repo, counts = self._restart()
+        self.assertEqual(counts, {"snapshot": 3, "log": 0})
+        for entity in (user, place, review):
+            restored = repo.get(entity.id, type(entity).__name__)
+            self.assertIs(type(restored), type(entity))
+            self.assertEqual(restored.__getstate__(), entity.__getstate__())
+            self.assertIs(repo.get(entity.id, type(entity).__name__), restored)
+        self.assertEqual(repo.get(place.id, "Place").amenity_ids, ("a1", "a2"))
+        self.assertIsNone(repo.get("missing", "Place"))
+        self.assertEqual([p.id for p in repo.find_all_by_attribute("Place", "owner_id", user.id)],
+                         [place.id])
+        self.assertEqual([p.id for p in repo.iter_bbox("Place", 48, -2, 49, -1)], [place.id])
+        self.assertEqual([p.id for p, _ in repo.nearest("Place", 48.1, -1.5, k=1)], [place.id])
+        with self.assertRaises(ValueError):
+            repo.add(User(email="a@example.com", password="secret1"))
+
+    def test_writes_after_restart_are_kept_by_the_next_snapshot(self):
+        """Test updates, deletes and re-adds over a restored snapshot."""
+        places = [Place(title=f"P{i}", price=float(i + 1), owner_id="o") for i in range(4)]
+        for place in places:
+            self.repo.add(place)
+        self.journal.close()
+
+        repo = Repository()
+        journal = Journal(repo, self.directory)
+        journal.open()
+        moved = repo.get(places[1].id, "Place")
+        moved.price = 50.0
+        repo.update(moved)
+        repo.delete(places[2].id, "Place")
+        repo.delete(places[3].id, "Place")
+        repo.add(places[3])
+        repo.add(Place(title="New", price=7.0, owner_id="o"))
+        expected = ["P0", "P1", "P3", "New"]
+        self.assertEqual([p.title for p in repo.get_all("Place")], expected)
+        self.assertEqual([p.title for p in repo.get_all("Place", limit=2, after=places[1].id)],
+                         ["P3", "New"])
+        self.assertEqual([p.title for p in repo.iter_range("Place", "price", 40, None)], ["P1"])
+        self.assertFalse(repo.exists(places[2].id, "Place"))
+        journal.close()
+
+        restored, counts = self._restart()
+        self.assertEqual(counts, {"snapshot": 4, "log": 0})
+        self.assertEqual([p.title for p in restored.get_all("Place")], expected)
+        self.assertEqual(restored.get(places[1].id, "Place").price, 50.0)
+        self.assertEqual(len(restored.find_all_by_attribute("Place", "owner_id", "o")), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Unit tests for NDJSON export and import."""
+import io
+import json
+import unittest
+from app.models import Amenity, Place, Review, User
+from app.persistence.ndjson import dump, load
+from app.persistence.repository import Repository
+
+
+class TestNdjson(unittest.TestCase):
+    """Test cases for moving the store through NDJSON."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+        owner = User(email="owner@example.com", password="secret1", first_name="O")
+        guest = User(email="guest@example.com", password="secret1", first_name="G")
+        pool = Amenity(name="Pool")
+        self.place = Place(title="Villa", price=100.0, owner_id=owner.id,
+                           amenity_ids=[pool.id], review_count=1, rating_sum=5)
+        review = Review(text="Great", rating=5, user_id=guest.id, place_id=self.place.id)
+        for entity in (owner, guest, pool, self.place, review):
+            self.repo.add(entity)
+
+    def _export(self):
+        stream = io.StringIO()
+        dump(self.repo, stream)
+        stream.seek(0)
+        return stream
+
+    def test_round_trip(self):
+        """Test a dump loads into an empty repository unchanged."""
+        stream = self._export()
+        types = [json.loads(line)["type"] for line in stream.getvalue().splitlines()]
+        self.assertEqual(types, ["user", "user", "amenity", "place", "place_amenity", "review"])
+
+        copy = Repository()
+        progress = []
+        counts = load(copy, stream, chunk_size=1, progress=lambda t, n: progress.append((t, n)))
+        self.assertEqual(counts, {"user": 2, "amenity": 1, "place": 1,
+                                  "place_amenity": 1, "review": 1})
+        self.assertIn(("user", 2), progress)
+        place = copy.get(self.place.id, "Place")
+        self.assertEqual(place.to_dict(), self.place.to_dict())
+        self.assertEqual(copy.get_by_attribute("User", "email", "guest@example.com").password,
+                         "secret1")
+
+    def test_existing_ids_are_rejected(self):
+        """Test loading a dump twice fails instead of duplicating."""
+        with self.assertRaises(ValueError):
+            load(self.repo, self._export())
+
+    def test_part3_records(self):
+        """Test records from the SQL store load, extra columns ignored."""
+        lines = [
+            {"type": "user", "id": "u1", "email": "a@example.com",
+             "password": "$2b$12$hash", "is_admin": True,
+             "created_at": "2024-01-02T03:04:05"},
+            {"type": "place", "id": "p1", "title": "Hut", "price": 10.0,
+             "owner_id": "u1", "review_count": 9, "rating_sum": 40},
+            {"type": "place_amenity", "place_id": "p1", "amenity_id": "a1"},
+        ]
+        copy = Repository()
+        load(copy, io.StringIO("\n".join(json.dumps(line) for line in lines)))
+        self.assertEqual(copy.get("u1", "User").created_at.year, 2024)
+        place = copy.get("p1", "Place")
+        self.assertEqual((place.amenity_ids, place.review_count), (("a1",), 0))
+        with self.assertRaises(ValueError):
+            load(copy, io.StringIO(json.dumps({"type": "booking"})))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,7 +23,7 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(place.latitude, 40.7128)
         self.assertEqual(place.longitude, -74.0060)
         self.assertEqual(place.owner_id, "user-123")
-        self.assertEqual(place.amenity_ids, ["amenity-1", "amenity-2"])
+        self.assertEqual(place.amenity_ids, ("amenity-1", "amenity-2"))
 
     def test_place_default_values(self):
         """Test place initialization with default values."""
@@ -35,7 +35,7 @@ class TestPlace(unittest.TestCase):
             owner_id="owner-1"
         )
         self.assertEqual(place.description, "")
-        self.assertEqual(place.amenity_ids, [])
+        self.assertEqual(place.amenity_ids, ())
 
     def test_place_validation_valid(self):
         """Test validation with valid place data."""
@@ -210,6 +210,21 @@ class TestPlace(unittest.TestCase):
         place.add_amenity("amenity-1")
         self.assertEqual(place.amenity_ids.count("amenity-1"), 1)
 
+    def test_place_amenity_ids_are_read_only(self):
+        """Test amenity_ids cannot be changed in place, only through the methods."""
+        place = Place(
+            title="House",
+            price=100.0,
+            latitude=0.0,
+            longitude=0.0,
+            owner_id="owner-1",
+            amenity_ids=["amenity-1"]
+        )
+        with self.assertRaises(AttributeError):
+            place.amenity_ids.append("amenity-2")
+        place.add_amenity("amenity-2")
+        self.assertEqual(place.amenity_ids, ("amenity-1", "amenity-2"))
+
     def test_place_remove_amenity(self):
         """Test removing amenities from a place."""
         place = Place(
@@ -242,7 +257,7 @@ class TestPlace(unittest.TestCase):
         self.assertIn("latitude", place_dict)
         self.assertIn("longitude", place_dict)
         self.assertIn("owner_id", place_dict)
-        self.assertIn("amenity_ids", place_dict)
+        self.assertEqual(place_dict["amenity_ids"], ["amenity-1"])
 
     def test_place_strip_whitespace(self):
         """Test that whitespace is stripped from string fields."""
@@ -0,0 +1,489 @@
+"""Unit tests for the in-memory Repository."""
+import sys
+import threading
+import unittest
+from unittest import mock
+from app.models import Place, Review, User
+from app.persistence import repository as repository_module
+from app.persistence.repository import Repository
+
+
+class TestRepositoryIndexes(unittest.TestCase):
+    """Test cases for Repository secondary indexes."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+
+    def test_get_by_indexed_attribute(self):
+        """Test lookup through the unique email index."""
+        user = User(email="a@example.com", password="secret1")
+        self.repo.add(user)
+        self.assertIs(self.repo.get_by_attribute("User", "email", "a@example.com"), user)
+        self.assertIsNone(self.repo.get_by_attribute("User", "email", "b@example.com"))
+
+    def test_unique_index_rejects_duplicates(self):
+        """Test a second entity with the same unique value is rejected."""
+        self.repo.add(User(email="a@example.com", password="secret1"))
+        with self.assertRaises(ValueError):
+            self.repo.add(User(email="a@example.com", password="secret2"))
+        self.assertEqual(len(self.repo.get_all("User")), 1)
+
+    def test_update_moves_index_entry(self):
+        """Test update re-keys the index after an in-place change."""
+        user = User(email="old@example.com", password="secret1")
+        self.repo.add(user)
+        user.update(email="new@example.com")
+        self.repo.update(user)
+        self.assertIsNone(self.repo.get_by_attribute("User", "email", "old@example.com"))
+        self.assertIs(self.repo.get_by_attribute("User", "email", "new@example.com"), user)
+
+    def test_update_to_taken_value_is_rejected(self):
+        """Test update cannot steal another entity's unique value."""
+        self.repo.add(User(email="a@example.com", password="secret1"))
+        other = User(email="b@example.com", password="secret2")
+        self.repo.add(other)
+        other.email = "a@example.com"
+        with self.assertRaises(ValueError):
+            self.repo.update(other)
+
+    def test_delete_removes_index_entry(self):
+        """Test delete drops the entity from its indexes."""
+        user = User(email="a@example.com", password="secret1")
+        self.repo.add(user)
+        self.repo.delete(user.id, "User")
+        self.assertIsNone(self.repo.get_by_attribute("User", "email", "a@example.com"))
+        self.repo.add(User(email="a@example.com", password="secret2"))
+
+    def test_find_all_by_non_unique_index(self):
+        """Test a non-unique index returns every match in insertion order."""
+        self.repo.register_index("Review", "rating")
+        first = Review(text="Lovely stay here", rating=5, user_id="u1", place_id="p1")
+        second = Review(text="Lovely stay again", rating=5, user_id="u2", place_id="p1")
+        other = Review(text="Not so great", rating=2, user_id="u3", place_id="p1")
+        for review in (first, second, other):
+            self.repo.add(review)
+        self.assertEqual(self.repo.find_all_by_attribute("Review", "rating", 5), [first, second])
+        self.assertEqual(self.repo.find_all_by_attribute("Review", "rating", 3), [])
+
+    def test_find_all_without_index_scans(self):
+        """Test find_all_by_attribute falls back to a scan."""
+        user = User(email="a@example.com", password="secret1", first_name="Ann")
+        self.repo.add(user)
+        self.assertEqual(self.repo.find_all_by_attribute("User", "first_name", "Ann"), [user])
+
+    def test_get_many(self):
+        """Test bulk lookup returns found entities keyed by id."""
+        first = User(email="a@example.com", password="secret1")
+        second = User(email="b@example.com", password="secret2")
+        self.repo.add(first)
+        self.repo.add(second)
+        found = self.repo.get_many([first.id, "missing", second.id], "User")
+        self.assertEqual(found, {first.id: first, second.id: second})
+
+    def test_resetting_storage_clears_indexes(self):
+        """Test replacing _storage keeps indexes consistent."""
+        self.repo.add(User(email="a@example.com", password="secret1"))
+        self.repo._storage = {}
+        self.assertIsNone(self.repo.get_by_attribute("User", "email", "a@example.com"))
+        self.repo.add(User(email="a@example.com", password="secret2"))
+
+
+class TestRepositoryPagination(unittest.TestCase):
+    """Test cases for keyset pagination in get_all."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+        self.users = []
+        for i in range(5):
+            user = User(email=f"user{i}@example.com", password="secret1")
+            self.repo.add(user)
+            self.users.append(user)
+
+    def test_pages_follow_insertion_order(self):
+        """Test walking every page with the after cursor."""
+        first = self.repo.get_all("User", limit=2)
+        second = self.repo.get_all("User", limit=2, after=first[-1].id)
+        third = self.repo.get_all("User", limit=2, after=second[-1].id)
+        self.assertEqual(first + second + third, self.users)
+        self.assertEqual(self.repo.get_all("User", limit=2, after=third[-1].id), [])
+
+    def test_cursor_survives_delete_of_last_seen(self):
+        """Test a page can follow an entity that was deleted meanwhile."""
+        first = self.repo.get_all("User", limit=2)
+        self.repo.delete(first[-1].id, "User")
+        rest = self.repo.get_all("User", limit=10, after=first[-1].id)
+        self.assertEqual(rest, self.users[2:])
+
+    def test_deleted_entities_are_skipped(self):
+        """Test deleted entities never appear in a page."""
+        for user in self.users[:4]:
+            self.repo.delete(user.id, "User")
+        self.assertEqual(self.repo.get_all("User", limit=10), [self.users[4]])
+
+    def test_unknown_cursor(self):
+        """Test an unknown cursor raises ValueError."""
+        with self.assertRaises(ValueError):
+            self.repo.get_all("User", limit=2, after="nope")
+
+
+class TestRepositorySortedIndex(unittest.TestCase):
+    """Test cases for the sorted Place.price index."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+        self.places = {}
+        for title, price in [("a", 50.0), ("b", 10.0), ("c", 30.0), ("d", 30.0), ("e", 90.0)]:
+            place = Place(title=title, price=price, owner_id="owner")
+            self.repo.add(place)
+            self.places[title] = place
+
+    def _titles(self, places):
+        return [p.title for p in places]
+
+    def test_range_in_price_order(self):
+        """Test a bounded range comes back sorted by price."""
+        prices = [p.price for p in self.repo.iter_range("Place", "price", low=20, high=60)]
+        self.assertEqual(prices, [30.0, 30.0, 50.0])
+
+    def test_reverse_range(self):
+        """Test descending scans honour both bounds."""
+        prices = [p.price for p in self.repo.iter_range("Place", "price", high=50, reverse=True)]
+        self.assertEqual(prices, [50.0, 30.0, 30.0, 10.0])
+
+    def test_resume_after_cursor(self):
+        """Test after resumes right behind the cursor entity, ties included."""
+        first = list(self.repo.iter_range("Place", "price"))[:3]
+        rest = list(self.repo.iter_range("Place", "price", after=first[-1].id))
+        self.assertEqual(len(first) + len(rest), 5)
+        self.assertEqual(set(self._titles(first + rest)), set(self.places))
+
+    def test_update_and_delete_move_entries(self):
+        """Test price changes and deletes keep the index sorted."""
+        place = self.places["e"]
+        place.update(price=5.0)
+        self.repo.update(place)
+        self.repo.delete(self.places["b"].id, "Place")
+        found = list(self.repo.iter_range("Place", "price", high=30))
+        self.assertEqual([p.price for p in found], [5.0, 30.0, 30.0])
+        self.assertEqual(found[0].title, "e")
+
+
+class TestRepositoryGridIndex(unittest.TestCase):
+    """Test cases for the Place latitude/longitude grid."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+        self.places = {}
+        for title, lat, lon in [
+            ("paris", 48.8566, 2.3522),
+            ("versailles", 48.8049, 2.1204),
+            ("london", 51.5074, -0.1278),
+            ("fiji", -17.7134, 178.065),
+            ("samoa", -13.759, -172.1046),
+        ]:
+            place = Place(title=title, price=10.0, latitude=lat, longitude=lon, owner_id="o")
+            self.repo.add(place)
+            self.places[title] = place
+
+    def _titles(self, *box):
+        return sorted(p.title for p in self.repo.iter_bbox("Place", *box))
+
+    def test_bbox(self):
+        """Test only places inside the box are returned."""
+        self.assertEqual(self._titles(48.0, 2.0, 49.0, 3.0), ["paris", "versailles"])
+        self.assertEqual(self._titles(-90.0, -180.0, 90.0, 180.0), sorted(self.places))
+
+    def test_bbox_across_antimeridian(self):
+        """Test min_lon > max_lon wraps around 180 degrees."""
+        self.assertEqual(self._titles(-20.0, 170.0, -10.0, -170.0), ["fiji", "samoa"])
+
+    def test_moves_and_deletes(self):
+        """Test coordinate updates and deletes keep the grid current."""
+        paris = self.places["paris"]
+        paris.update(latitude=51.5, longitude=-0.12)
+        self.repo.update(paris)
+        self.repo.delete(self.places["versailles"].id, "Place")
+        self.assertEqual(self._titles(48.0, 2.0, 49.0, 3.0), [])
+        self.assertEqual(self._titles(51.0, -1.0, 52.0, 0.0), ["london", "paris"])
+
+
+class TestRepositoryColumnStore(unittest.TestCase):
+    """Test cases for the Place price/latitude/longitude columns."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+        self.places = {}
+        for title, price, lat, lon in [
+            ("paris", 120.0, 48.8566, 2.3522),
+            ("versailles", 80.0, 48.8049, 2.1204),
+            ("london", 150.0, 51.5074, -0.1278),
+            ("fiji", 40.0, -17.7134, 178.065),
+            ("samoa", 60.0, -13.759, -172.1046),
+        ]:
+            place = Place(title=title, price=price, latitude=lat, longitude=lon, owner_id="o")
+            self.repo.add(place)
+            self.places[title] = place
+
+    def _titles(self, **bounds):
+        return sorted(p.title for p in self.repo.select_range("Place", **bounds))
+
+    def test_select_range(self):
+        """Test every bound must hold, open bounds and wrapped longitudes."""
+        self.assertEqual(self._titles(price=(60.0, 120.0)), ["paris", "samoa", "versailles"])
+        self.assertEqual(self._titles(price=(100.0, None), latitude=(50.0, 60.0)), ["london"])
+        self.assertEqual(self._titles(longitude=(170.0, -170.0)), ["fiji", "samoa"])
+        self.assertEqual(self._titles(), sorted(self.places))
+
+    def test_histogram(self):
+        """Test equal-width bins over the stored prices, last bin inclusive."""
+        self.assertEqual(self.repo.histogram("Place", "price", bins=2),
+                         [(40.0, 95.0, 3), (95.0, 150.0, 2)])
+        self.assertEqual(self.repo.histogram("Place", "price", bins=1, low=50.0, high=100.0),
+                         [(50.0, 100.0, 2)])
+        self.assertEqual(Repository().histogram("Place", "price"), [])
+        self.assertEqual(self.repo.histogram("Place", "price", bins=2, low=500.0),
+                         [(500.0, 500.0, 0), (500.0, 500.0, 0)])
+        with self.assertRaises(ValueError):
+            self.repo.histogram("Place", "price", bins=0)
+        with self.assertRaises(ValueError):
+            self.repo.histogram("Place", "price", bins=2, low=100.0, high=50.0)
+
+    def test_nearest(self):
+        """Test the k closest places come back nearest first, within the radius."""
+        found = self.repo.nearest("Place", 48.8566, 2.3522, k=2)
+        self.assertEqual([p.title for p, _ in found], ["paris", "versailles"])
+        self.assertAlmostEqual(found[0][1], 0.0)
+        self.assertLess(found[1][1], 20)
+        self.assertEqual(
+            [p.title for p, _ in self.repo.nearest("Place", -15.0, 179.9, k=5, radius_km=1000)],
+            ["fiji", "samoa"],
+        )
+
+    def test_updates_and_deletes(self):
+        """Test writes keep the columns current and freed rows are reused."""
+        paris = self.places["paris"]
+        paris.update(price=10.0)
+        self.repo.update(paris)
+        self.repo.delete(self.places["london"].id, "Place")
+        self.assertEqual(self._titles(price=(None, 50.0)), ["fiji", "paris"])
+        self.assertEqual(self._titles(latitude=(50.0, 60.0)), [])
+        self.repo.add(Place(title="oslo", price=90.0, latitude=59.91, longitude=10.75,
+                            owner_id="o"))
+        self.assertEqual(self._titles(latitude=(50.0, 60.0)), ["oslo"])
+        self.assertEqual(len(self.repo._columns["Place"]._ids), 5)
+
+    def test_optional(self):
+        """Test the store can be left out, and is rebuilt with the storage."""
+        with self.assertRaises(ValueError):
+            Repository(columns={}).select_range("Place", price=(0, 1))
+        self.repo._storage = {}
+        self.assertEqual(self._titles(), [])
+
+
+class TestColumnStoreBackends(unittest.TestCase):
+    """Test the NumPy and pure-Python column scans give the same answers."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+        for i in range(40):
+            self.repo.add(Place(title=f"p{i}", price=float(i * 7 % 50),
+                                latitude=-60.0 + i * 3.1, longitude=-179.0 + i * 9.2,
+                                owner_id="o"))
+        # Leave a NaN row behind
+        self.repo.delete(self.repo.get_all("Place")[3].id, "Place")
+
+    def _scan(self):
+        titles = lambda places: sorted(p.title for p in places)
+        return (
+            titles(self.repo.select_range("Place", price=(10.0, 30.0))),
+            titles(self.repo.select_range("Place", price=(None, 20.0), latitude=(0.0, None))),
+            titles(self.repo.select_range("Place", longitude=(150.0, -150.0))),
+            self.repo.histogram("Place", "price", bins=7),
+            self.repo.histogram("Place", "price", bins=3, low=5.0, high=35.0),
+            [(p.title, round(km, 6)) for p, km in self.repo.nearest("Place", 10.0, 20.0, k=5)],
+            [p.title for p, _ in self.repo.nearest("Place", -40.0, -120.0, k=3, radius_km=3000)],
+        )
+
+    def test_pure_python(self):
+        """Test the fallback path runs when NumPy is missing."""
+        with mock.patch.object(repository_module, "numpy", None):
+            found = self._scan()
+        self.assertEqual(found[3][0][0], 0.0)
+        self.assertEqual(sum(count for _, _, count in found[3]), 39)
+        self.assertEqual(len(found[5]), 5)
+
+    @unittest.skipUnless(repository_module.numpy, "NumPy is not installed")
+    def test_numpy_matches_pure_python(self):
+        """Test the vectorized path agrees with the fallback."""
+        with mock.patch.object(repository_module, "numpy", None):
+            expected = self._scan()
+        self.assertEqual(self._scan(), expected)
+
+
+class TestRepositoryTextIndex(unittest.TestCase):
+    """Test cases for the full-text inverted index."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+        self.places = {}
+        for title, description in [
+            ("Beach hut", "Small hut right on the beach, beach towels included"),
+            ("Beach villa", "Large villa with a pool"),
+            ("City loft", "Bright loft near the beach promenade and the old town"),
+            ("Mountain cabin", None),
+        ]:
+            place = Place(title=title, description=description, price=10.0, owner_id="o")
+            self.repo.add(place)
+            self.places[title] = place
+
+    def _titles(self, query, limit=None):
+        return [p.title for p, _ in self.repo.search_text("Place", query, limit)]
+
+    def test_ranked_by_relevance(self):
+        """Test every match is returned, denser matches first."""
+        self.assertEqual(self._titles("beach"), ["Beach hut", "Beach villa", "City loft"])
+        self.assertEqual(self._titles("BEACH", limit=1), ["Beach hut"])
+
+    def test_all_terms_must_match(self):
+        """Test multi-word queries are conjunctive and case-insensitive."""
+        self.assertEqual(self._titles("beach Pool"), ["Beach villa"])
+        self.assertEqual(self._titles("beach igloo"), [])
+        self.assertEqual(self._titles("  "), [])
+
+    def test_update_and_delete_reindex(self):
+        """Test text changes and deletes are reflected in results."""
+        cabin = self.places["Mountain cabin"]
+        cabin.update(description="Ski-in cabin, far from any beach")
+        self.repo.update(cabin)
+        self.repo.delete(self.places["Beach villa"].id, "Place")
+        self.assertEqual(set(self._titles("beach")), {"Beach hut", "City loft", "Mountain cabin"})
+        self.assertEqual(self._titles("ski"), ["Mountain cabin"])
+        self.assertEqual(self._titles("pool"), [])
+
+    def test_reviews_are_indexed(self):
+        """Test review text has its own index."""
+        review = Review(text="Lovely host, spotless room", rating=5, user_id="u", place_id="p")
+        self.repo.add(review)
+        self.assertEqual([r for r, _ in self.repo.search_text("Review", "spotless")], [review])
+        self.assertEqual(self.repo.search_text("Place", "spotless"), [])
+
+
+class TestRepositoryBulk(unittest.TestCase):
+    """Test cases for chunked bulk_create and bulk_upsert."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+
+    def test_bulk_create_is_indexed(self):
+        """Test bulk-created entities are stored, ordered and indexed."""
+        places = (Place(title=f"P{i}", price=float(i), owner_id="o") for i in range(5))
+        self.assertEqual(self.repo.bulk_create(places, chunk_size=2), 5)
+        self.assertEqual([p.title for p in self.repo.get_all("Place")],
+                         ["P0", "P1", "P2", "P3", "P4"])
+        self.assertEqual(len(self.repo.find_all_by_attribute("Place", "owner_id", "o")), 5)
+        self.assertEqual([p.title for p in self.repo.iter_range("Place", "price", 3, None)],
+                         ["P3", "P4"])
+
+    def test_failing_chunk_is_not_applied(self):
+        """Test a conflict rejects its whole chunk but keeps earlier ones."""
+        self.repo.add(User(email="taken@example.com", password="secret1"))
+        users = [User(email=f"u{i}@example.com", password="secret1") for i in range(3)]
+        users.append(User(email="taken@example.com", password="secret1"))
+        with self.assertRaises(ValueError):
+            self.repo.bulk_create(users, chunk_size=2)
+        self.assertEqual(len(self.repo.get_all("User")), 3)
+        self.assertIsNone(self.repo.get_by_attribute("User", "email", "u2@example.com"))
+
+        same = [User(email="twin@example.com", password="secret1") for _ in range(2)]
+        with self.assertRaises(ValueError):
+            self.repo.bulk_create(same)
+        with self.assertRaises(ValueError):
+            self.repo.bulk_create([users[0]])
+
+    def test_bulk_upsert(self):
+        """Test upserts replace stored ids and add the rest."""
+        place = Place(title="Old", price=10.0, owner_id="o")
+        self.repo.add(place)
+        replacement = Place(title="New", price=50.0, owner_id="o")
+        replacement.id = place.id
+        added = Place(title="Added", price=20.0, owner_id="o")
+        self.assertEqual(self.repo.bulk_upsert([replacement, added]), 2)
+        self.assertEqual(self.repo.get(place.id, "Place").title, "New")
+        self.assertEqual([p.title for p in self.repo.iter_range("Place", "price")],
+                         ["Added", "New"])
+
+
+class TestRepositoryThreads(unittest.TestCase):
+    """Test cases for sharing one Repository between threads."""
+
+    def setUp(self):
+        """Set up test fixtures before each test."""
+        self.repo = Repository()
+        # Switch threads far more often than usual to provoke interleavings
+        self.interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        sys.setswitchinterval(self.interval)
+
+    def _run(self, target, count=8):
+        barrier = threading.Barrier(count)
+        errors = []
+
+        def worker(n):
+            barrier.wait()
+            try:
+                target(n)
+            except Exception as error:  # surfaced below, not lost in the thread
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_add_if_absent_claims_once(self):
+        """Test only one of many racing threads gets a unique value."""
+        winners = []
+
+        def claim(n):
+            user = User(email="same@example.com", password="secret1")
+            if self.repo.add_if_absent(user, "email") is user:
+                winners.append(n)
+
+        self._run(claim)
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(len(self.repo.get_all("User")), 1)
+
+    def test_reads_during_writes(self):
+        """Test paging and range scans stay consistent while others write."""
+        def work(n):
+            for i in range(200):
+                place = Place(title=f"T{n}-{i}", price=float(i + 1), owner_id=str(n))
+                self.repo.add(place)
+                if i % 3 == 0:
+                    self.repo.delete(place.id, "Place")
+                list(self.repo.iter_range("Place", "price", 50, 100))
+                self.repo.get_all("Place", limit=10)
+                list(self.repo.iter_bbox("Place", -1, -1, 1, 1))
+
+        self._run(work)
+        places = self.repo.get_all("Place")
+        self.assertEqual(len(places), 8 * 133)
+        self.assertEqual(len(list(self.repo.iter_all("Place"))), len(places))
+        self.assertEqual(len(list(self.repo.iter_range("Place", "price"))), len(places))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,48 +1,95 @@
-# Flask app factory and extensions initialization
-
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager
-from flask_restx import Api
-from flask_cors import CORS
-
-db = SQLAlchemy()
-bcrypt = Bcrypt()
-jwt = JWTManager()
-
-
-def create_app(config_class="config.DevelopmentConfig"):
-    """Application factory pattern for Flask app"""
-    app = Flask(__name__)
-    app.config.from_object(config_class)
-    app.config.setdefault("JWT_SECRET_KEY", app.config.get("SECRET_KEY"))
-    
-    # Initialize extensions
-    db.init_app(app)
-    bcrypt.init_app(app)
-    jwt.init_app(app)
-    CORS(app, supports_credentials=True)
-    
-    # Create API and register namespaces
-    api = Api(app, doc="/api/v1/docs", title="HBnB API", version="1.0",
-              description="HBnB Application REST API")
-    
-    # Import and register namespaces inside function to avoid circular imports
-    from app.api.v1.users import api as users_ns
-    from app.api.v1.auth import api as auth_ns
-    from app.api.v1.places import api as places_ns
-    from app.api.v1.reviews import api as reviews_ns
-    from app.api.v1.amenities import api as amenities_ns
-    
-    api.add_namespace(users_ns, path='/api/v1/users')
-    api.add_namespace(auth_ns, path='/api/v1/auth')
-    api.add_namespace(places_ns, path='/api/v1/places')
-    api.add_namespace(reviews_ns, path='/api/v1/reviews')
-    api.add_namespace(amenities_ns, path='/api/v1/amenities')
-    
-    # Create tables within app context
-    with app.app_context():
-        db.create_all()
-    
-    return app
+# Flask app factory and extensions initialization
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from flask_bcrypt import Bcrypt
+from flask_jwt_extended import JWTManager
+from flask_restx import Api
+from flask_cors import CORS
+from sqlalchemy import event
+from app.persistence.replicas import RoutingSession, init_replicas
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+bcrypt = Bcrypt()
+jwt = JWTManager()
+
+
+def create_app(config_class="config.DevelopmentConfig"):
+    """Application factory pattern for Flask app"""
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    app.config.setdefault("JWT_SECRET_KEY", app.config.get("SECRET_KEY"))
+    
+    # Initialize extensions
+    db.init_app(app)
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+    CORS(app, supports_credentials=True, expose_headers=["Link"])
+    
+    # Services shared by every request, built once
+    from app.services.container import ServiceContainer
+    ServiceContainer().init_app(app)
+    from app.services.passwords import PasswordHasher, PasswordHasherBusy
+    PasswordHasher(
+        bcrypt,
+        rounds=app.config.get("BCRYPT_LOG_ROUNDS", 12),
+        workers=app.config.get("BCRYPT_WORKERS", 1),
+        max_pending=app.config.get("BCRYPT_MAX_PENDING"),
+    ).init_app(app)
+    from app.services.principals import init_principals
+    init_principals(jwt)
+    
+    # Create API and register namespaces
+    api = Api(app, doc="/api/v1/docs", title="HBnB API", version="1.0",
+              description="HBnB Application REST API")
+
+    @api.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(error):
+        """Too many logins or sign-ups at once: shed load instead of queueing"""
+        return {"error": str(error)}, 429, {"Retry-After": "1"}
+    
+    # Import and register namespaces inside function to avoid circular imports
+    from app.api.v1.users import api as users_ns
+    from app.api.v1.auth import api as auth_ns
+    from app.api.v1.places import api as places_ns
+    from app.api.v1.reviews import api as reviews_ns
+    from app.api.v1.amenities import api as amenities_ns
+    
+    api.add_namespace(users_ns, path='/api/v1/users')
+    api.add_namespace(auth_ns, path='/api/v1/auth')
+    api.add_namespace(places_ns, path='/api/v1/places')
+    api.add_namespace(reviews_ns, path='/api/v1/reviews')
+    api.add_namespace(amenities_ns, path='/api/v1/amenities')
+    
+    from app.commands import hbnb_cli
+    app.cli.add_command(hbnb_cli)
+    
+    # Create tables within app context
+    with app.app_context():
+        from app.persistence.cache import entity_cache, track_invalidations
+        from app.persistence.versions import track_writes
+        track_writes(db.session)
+        backend = None
+        if app.config.get("CACHE_SOCKET_PATH"):
+            from app.persistence.cache_server import SocketCacheBackend
+            backend = SocketCacheBackend(app.config["CACHE_SOCKET_PATH"])
+        entity_cache.configure(maxsize=app.config.get("ENTITY_CACHE_SIZE"),
+                               ttl=app.config.get("ENTITY_CACHE_TTL"), backend=backend)
+        track_invalidations(db.session)
+        if db.engine.dialect.name == "sqlite":
+            from app.persistence.sqlite import (
+                install_fts, pragma_hook, register_fts, register_sqlite_functions)
+            if app.config.get("SQLITE_PRAGMAS"):
+                event.listen(db.engine, "connect", pragma_hook(app.config["SQLITE_PRAGMAS"]))
+            event.listen(db.engine, "connect", register_sqlite_functions)
+            register_fts(db.metadata)
+        db.create_all()
+        from app.persistence.migrations import upgrade_columns, upgrade_indexes
+        with db.engine.begin() as connection:
+            upgrade_columns(connection, db.metadata)
+            upgrade_indexes(connection, db.metadata)
+            if db.engine.dialect.name == "sqlite":
+                install_fts(connection)
+        init_replicas(app, db)
+    
+    return app
@@ -0,0 +1,51 @@
+# Conditional GET support: strong ETags built from table write counters
+#
+# A response's ETag hashes the request URL with the versions of every table
+# its body is read from, so a matching If-None-Match is answered with 304
+# before the database is touched.
+
+import hashlib
+from functools import wraps
+from flask import current_app, request
+from flask_restx.utils import unpack
+from werkzeug.http import quote_etag
+from app import db
+from app.persistence import versions
+from app.persistence.replicas import read_behind_primary
+
+
+def etag_for(*tables):
+    """ETag for the current URL while the given tables stay unchanged"""
+    epoch, counts = versions.current(*tables)
+    key = f"{epoch}:{counts}:{request.full_path}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def cache_control():
+    """Cache-Control value; clients revalidate unless HTTP_CACHE_MAX_AGE is set"""
+    max_age = current_app.config.get("HTTP_CACHE_MAX_AGE", 0)
+    if max_age:
+        return f"public, max-age={max_age}, must-revalidate"
+    return "no-cache"
+
+
+def conditional(*tables):
+    """Serve 304 Not Modified while none of the tables has changed"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                tag = etag_for(*tables)
+            except OSError:
+                # Without the shared versions a tag could be stale; skip it
+                return view(*args, **kwargs)
+            headers = {"ETag": quote_etag(tag), "Cache-Control": cache_control()}
+            if request.if_none_match.contains_weak(tag):
+                return current_app.response_class(status=304, headers=headers)
+            data, code, extra = unpack(view(*args, **kwargs))
+            # A body read from a lagging replica must not carry the current tag
+            if code == 200 and not read_behind_primary(db.session):
+                extra = dict(extra or {}, **headers)
+            return data, code, extra
+        return wrapper
+    return decorator
@@ -0,0 +1,42 @@
+# Cursor pagination shared by the collection endpoints
+#
+# List endpoints accept ``limit`` and ``after`` (the id of the last item of
+# the previous page). The body stays a plain JSON array; when more items
+# exist a ``Link: <...>; rel="next"`` header points at the next page.
+
+from urllib.parse import urlencode
+from flask import request
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def page_args():
+    """Read (limit, after) from the query string, raising ValueError if invalid"""
+    raw_limit = request.args.get("limit")
+    if raw_limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValueError("limit must be an integer") from None
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit, request.args.get("after") or None
+
+
+def paginate(fetch):
+    """Fetch one page through fetch(limit, after) plus one lookahead row.
+
+    Returns the page and the response headers to send with it.
+    """
+    limit, after = page_args()
+    items = fetch(limit + 1, after)
+    headers = {}
+    if len(items) > limit:
+        items = items[:limit]
+        args = request.args.to_dict()
+        args.update(limit=limit, after=str(items[-1].id))
+        headers["Link"] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return items, headers
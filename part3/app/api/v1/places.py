@@ -1,198 +1,388 @@
-# Place API endpoints
-
-from flask import request
-from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.services.facade import HBnBFacade
-
-facade = HBnBFacade()
-
-api = Namespace('places', description='Place operations')
-
-# API models for documentation
-place_model = api.model('Place', {
-    'title': fields.String(required=True, description='Place title'),
-    'description': fields.String(description='Place description'),
-    'price': fields.Float(required=True, description='Price per night'),
-    'latitude': fields.Float(required=True, description='Latitude'),
-    'longitude': fields.Float(required=True, description='Longitude'),
-    'amenities': fields.List(fields.String, description='List of amenity IDs')
-})
-
-
-@api.route('/')
-class PlaceList(Resource):
-    @api.doc('list_places')
-    def get(self):
-        """List all places (public endpoint)"""
-        places = facade.get_all_places()
-        result = []
-        for place in places:
-            place_data = {
-                'id': str(place.id),
-                'title': place.title,
-                'description': place.description,
-                'price': place.price,
-                'latitude': place.latitude,
-                'longitude': place.longitude,
-                'owner_id': place.owner_id
-            }
-            # Include owner info if available
-            if place.owner:
-                place_data['owner'] = {
-                    'id': str(place.owner.id),
-                    'first_name': place.owner.first_name,
-                    'last_name': place.owner.last_name,
-                    'email': place.owner.email
-                }
-            result.append(place_data)
-        return result, 200
-
-    @jwt_required()
-    @api.expect(place_model)
-    @api.doc('create_place')
-    def post(self):
-        """Create a new place (authenticated users)"""
-        data = request.get_json()
-        required_fields = ["title", "description", "price", "latitude", "longitude"]
-        if not data or not all(f in data for f in required_fields):
-            return {"error": "Missing required fields"}, 400
-        
-        # Validate price
-        if data['price'] <= 0:
-            return {"error": "Price must be positive"}, 400
-        
-        # Validate latitude/longitude
-        if not (-90 <= data['latitude'] <= 90):
-            return {"error": "Latitude must be between -90 and 90"}, 400
-        if not (-180 <= data['longitude'] <= 180):
-            return {"error": "Longitude must be between -180 and 180"}, 400
-        
-        owner_id = get_jwt_identity()
-        place_data = {
-            "title": data["title"],
-            "description": data["description"],
-            "price": data["price"],
-            "latitude": data["latitude"],
-            "longitude": data["longitude"],
-            "owner_id": owner_id
-        }
-        place = facade.create_place(place_data)
-        
-        # Handle amenities if provided
-        if "amenities" in data and data["amenities"]:
-            for amenity_id in data["amenities"]:
-                amenity = facade.get_amenity(amenity_id)
-                if amenity:
-                    place.amenities.append(amenity)
-        
-        return {"id": str(place.id), "message": "Place created successfully"}, 201
-
-
-@api.route('/<string:place_id>')
-class PlaceResource(Resource):
-    @api.doc('get_place')
-    def get(self, place_id):
-        """Get a place by ID (public endpoint)"""
-        place = facade.get_place(place_id)
-        if not place:
-            return {"error": "Place not found"}, 404
-        
-        result = {
-            "id": str(place.id),
-            "title": place.title,
-            "description": place.description,
-            "price": place.price,
-            "latitude": place.latitude,
-            "longitude": place.longitude,
-            "owner_id": place.owner_id,
-            "created_at": place.created_at.isoformat() if place.created_at else None,
-            "updated_at": place.updated_at.isoformat() if place.updated_at else None
-        }
-        
-        # Include owner info
-        if place.owner:
-            result['owner'] = {
-                'id': str(place.owner.id),
-                'first_name': place.owner.first_name,
-                'last_name': place.owner.last_name,
-                'email': place.owner.email
-            }
-        
-        # Include amenities
-        result['amenities'] = [{
-            'id': str(a.id),
-            'name': a.name
-        } for a in place.amenities] if place.amenities else []
-        
-        # Include reviews
-        result['reviews'] = [{
-            'id': str(r.id),
-            'text': r.text,
-            'rating': r.rating,
-            'user_id': r.user_id,
-            'user_name': f"{r.user.first_name} {r.user.last_name}" if r.user else 'Anonymous'
-        } for r in place.reviews] if place.reviews else []
-        
-        return result, 200
-
-    @jwt_required()
-    @api.doc('update_place')
-    def put(self, place_id):
-        """Update a place (owner or admin only)"""
-        claims = get_jwt()
-        is_admin = claims.get("is_admin", False)
-        current_user_id = get_jwt_identity()
-        
-        place = facade.get_place(place_id)
-        if not place:
-            return {"error": "Place not found"}, 404
-        
-        # Check ownership or admin
-        if not is_admin and place.owner_id != current_user_id:
-            return {"error": "Unauthorized action"}, 403
-        
-        data = request.get_json() or {}
-        allowed_fields = ["title", "description", "price", "latitude", "longitude"]
-        update_data = {k: v for k, v in data.items() if k in allowed_fields}
-        
-        if update_data:
-            facade.update_place(place_id, update_data)
-        return {"message": "Place updated successfully"}, 200
-
-    @jwt_required()
-    @api.doc('delete_place')
-    def delete(self, place_id):
-        """Delete a place (owner or admin only)"""
-        claims = get_jwt()
-        is_admin = claims.get("is_admin", False)
-        current_user_id = get_jwt_identity()
-        
-        place = facade.get_place(place_id)
-        if not place:
-            return {"error": "Place not found"}, 404
-        
-        if not is_admin and place.owner_id != current_user_id:
-            return {"error": "Unauthorized action"}, 403
-        
-        facade.delete_place(place_id)
-        return {"message": "Place deleted successfully"}, 200
-
-
-@api.route('/<string:place_id>/reviews')
-class PlaceReviews(Resource):
-    @api.doc('get_place_reviews')
-    def get(self, place_id):
-        """Get all reviews for a place (public endpoint)"""
-        place = facade.get_place(place_id)
-        if not place:
-            return {"error": "Place not found"}, 404
-        
-        reviews = facade.get_reviews_by_place(place_id)
-        return [{
-            'id': str(r.id),
-            'text': r.text,
-            'rating': r.rating,
-            'user_id': r.user_id,
-            'created_at': r.created_at.isoformat() if r.created_at else None
-        } for r in reviews], 200
+# Place API endpoints
+
+import json
+from flask import request
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from app.services.container import facade
+from app.api.v1.pagination import paginate
+from app.api.v1.caching import conditional
+from app.services.geo import haversine_km
+
+api = Namespace('places', description='Place operations')
+
+# API models for documentation
+place_model = api.model('Place', {
+    'title': fields.String(required=True, description='Place title'),
+    'description': fields.String(description='Place description'),
+    'price': fields.Float(required=True, description='Price per night'),
+    'latitude': fields.Float(required=True, description='Latitude'),
+    'longitude': fields.Float(required=True, description='Longitude'),
+    'amenities': fields.List(fields.String, description='List of amenity IDs')
+})
+
+
+MAX_RADIUS_KM = 1000
+
+
+def _float_arg(name, required=False, low=None, high=None):
+    """Read a numeric query parameter, optionally required and bounded"""
+    raw = request.args.get(name)
+    if raw is None:
+        if required:
+            raise ValueError(f"{name} is required")
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number") from None
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def _place_summary(place):
+    """Serialize a place for list responses"""
+    place_data = {
+        'id': str(place.id),
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'owner_id': place.owner_id,
+        'review_count': place.review_count,
+        'avg_rating': place.avg_rating
+    }
+    # Include owner info if available
+    if place.owner:
+        place_data['owner'] = {
+            'id': str(place.owner.id),
+            'first_name': place.owner.first_name,
+            'last_name': place.owner.last_name,
+            'email': place.owner.email
+        }
+    return place_data
+
+
+def _place_error(data):
+    """Validation message for a place payload, or None if it is valid"""
+    required_fields = ["title", "description", "price", "latitude", "longitude"]
+    if not data or not all(f in data for f in required_fields):
+        return "Missing required fields"
+    
+    # Validate price
+    if data['price'] <= 0:
+        return "Price must be positive"
+    
+    # Validate latitude/longitude
+    if not (-90 <= data['latitude'] <= 90):
+        return "Latitude must be between -90 and 90"
+    if not (-180 <= data['longitude'] <= 180):
+        return "Longitude must be between -180 and 180"
+    return None
+
+
+def _batch_places():
+    """Places from a JSON array body, or streamed line by line from NDJSON"""
+    if request.mimetype == "application/x-ndjson":
+        for line in request.stream:
+            if line.strip():
+                yield json.loads(line)
+        return
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of places")
+    yield from data
+
+
+def _validated_places(places):
+    for index, data in enumerate(places):
+        try:
+            error = _place_error(data)
+        except TypeError:
+            error = "Invalid field types"
+        if error:
+            raise ValueError(f"Place {index}: {error}")
+        yield data
+
+
+def _search_places(limit, after):
+    return facade.search_places(
+        min_price=_float_arg("min_price"),
+        max_price=_float_arg("max_price"),
+        q=request.args.get("q"),
+        amenity=request.args.get("amenity"),
+        sort=request.args.get("sort"),
+        limit=limit,
+        after=after,
+        profile="list"
+    )
+
+
+@api.route('/')
+class PlaceList(Resource):
+    @api.doc('list_places', params={
+        'min_price': 'Lowest price to include',
+        'max_price': 'Highest price to include',
+        'q': 'Words the title or description must contain, or start words with',
+        'amenity': 'Only places offering this amenity ID',
+        'sort': 'price, -price, rating or -rating'
+    })
+    @conditional("places", "users")
+    def get(self):
+        """List places, optionally filtered and sorted (public endpoint)"""
+        try:
+            places, headers = paginate(_search_places)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return [_place_summary(p) for p in places], 200, headers
+
+    @jwt_required()
+    @api.expect(place_model)
+    @api.doc('create_place')
+    def post(self):
+        """Create a new place (authenticated users)"""
+        data = request.get_json()
+        error = _place_error(data)
+        if error:
+            return {"error": error}, 400
+        
+        owner_id = get_jwt_identity()
+        place_data = {
+            "title": data["title"],
+            "description": data["description"],
+            "price": data["price"],
+            "latitude": data["latitude"],
+            "longitude": data["longitude"],
+            "owner_id": owner_id
+        }
+        # Place and amenity links are committed together
+        with facade.transaction():
+            place = facade.create_place(place_data)
+            
+            # Handle amenities if provided
+            if "amenities" in data and data["amenities"]:
+                for amenity_id in data["amenities"]:
+                    amenity = facade.get_amenity(amenity_id)
+                    if amenity:
+                        place.amenities.append(amenity)
+        
+        return {"id": str(place.id), "message": "Place created successfully"}, 201
+
+
+@api.route(':batch')
+class PlaceBatch(Resource):
+    @jwt_required()
+    @api.doc('import_places', params={
+        'upsert': 'Update places whose id already exists instead of failing'
+    })
+    def post(self):
+        """Create many places at once (admin only)
+
+        The body is a JSON array of places, or one place per line with
+        Content-Type application/x-ndjson. Each place may also carry id,
+        owner_id (defaults to the caller) and amenities. Places are written
+        in chunks; if one is invalid the earlier chunks are kept and the
+        response reports how many were imported.
+        """
+        if not current_user.is_admin:
+            return {"error": "Admin privileges required"}, 403
+        
+        upsert = request.args.get("upsert", "").lower() in ("1", "true", "yes")
+        progress = {"imported": 0}
+        try:
+            count = facade.import_places(
+                _validated_places(_batch_places()),
+                default_owner_id=get_jwt_identity(),
+                upsert=upsert,
+                on_chunk=lambda count: progress.update(imported=count)
+            )
+        except ValueError as e:
+            return {"error": str(e), "imported": progress["imported"]}, 400
+        return {"imported": count, "message": "Places imported successfully"}, 201
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc('search_places', params={
+        'q': 'Words that must all appear in the title or description'
+    })
+    @conditional("places", "users")
+    def get(self):
+        """Full-text search over places, best match first (public endpoint)"""
+        q = (request.args.get("q") or "").strip()
+        if not q:
+            return {"error": "q is required"}, 400
+        try:
+            places, headers = paginate(
+                lambda limit, after: facade.search_place_text(q, limit, after, profile="list")
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return [_place_summary(p) for p in places], 200, headers
+
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc('places_nearby', params={
+        'lat': 'Latitude of the centre point',
+        'lon': 'Longitude of the centre point',
+        'radius_km': f'Search radius in kilometres (max {MAX_RADIUS_KM})'
+    })
+    @conditional("places", "users")
+    def get(self):
+        """List places within a radius, nearest first (public endpoint)"""
+        try:
+            lat = _float_arg("lat", required=True, low=-90, high=90)
+            lon = _float_arg("lon", required=True, low=-180, high=180)
+            radius_km = _float_arg("radius_km", required=True, low=0, high=MAX_RADIUS_KM)
+            places, headers = paginate(
+                lambda limit, after: facade.get_places_nearby(lat, lon, radius_km, limit, after,
+                                                              profile="list"))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        result = []
+        for place in places:
+            place_data = _place_summary(place)
+            place_data['distance_km'] = round(
+                haversine_km(lat, lon, place.latitude, place.longitude), 3)
+            result.append(place_data)
+        return result, 200, headers
+
+
+@api.route('/bbox')
+class PlaceBoundingBox(Resource):
+    @api.doc('places_in_bbox', params={
+        'min_lat': 'Southern edge',
+        'min_lon': 'Western edge (greater than max_lon to cross the antimeridian)',
+        'max_lat': 'Northern edge',
+        'max_lon': 'Eastern edge'
+    })
+    @conditional("places", "users")
+    def get(self):
+        """List places inside a bounding box (public endpoint)"""
+        try:
+            box = [
+                _float_arg("min_lat", required=True, low=-90, high=90),
+                _float_arg("min_lon", required=True, low=-180, high=180),
+                _float_arg("max_lat", required=True, low=-90, high=90),
+                _float_arg("max_lon", required=True, low=-180, high=180),
+            ]
+            places, headers = paginate(
+                lambda limit, after: facade.get_places_in_bbox(*box, limit=limit, after=after,
+                                                               profile="list"))
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return [_place_summary(p) for p in places], 200, headers
+
+
+@api.route('/<string:place_id>')
+class PlaceResource(Resource):
+    @api.doc('get_place')
+    @conditional("places", "users", "amenities", "reviews")
+    def get(self, place_id):
+        """Get a place by ID (public endpoint)"""
+        place = facade.get_place(place_id, profile="detail")
+        if not place:
+            return {"error": "Place not found"}, 404
+        
+        result = {
+            "id": str(place.id),
+            "title": place.title,
+            "description": place.description,
+            "price": place.price,
+            "latitude": place.latitude,
+            "longitude": place.longitude,
+            "owner_id": place.owner_id,
+            "review_count": place.review_count,
+            "avg_rating": place.avg_rating,
+            "created_at": place.created_at.isoformat() if place.created_at else None,
+            "updated_at": place.updated_at.isoformat() if place.updated_at else None
+        }
+        
+        # Include owner info
+        if place.owner:
+            result['owner'] = {
+                'id': str(place.owner.id),
+                'first_name': place.owner.first_name,
+                'last_name': place.owner.last_name,
+                'email': place.owner.email
+            }
+        
+        # Include amenities
+        result['amenities'] = [{
+            'id': str(a.id),
+            'name': a.name
+        } for a in place.amenities] if place.amenities else []
+        
+        # Include reviews
+        result['reviews'] = [{
+            'id': str(r.id),
+            'text': r.text,
+            'rating': r.rating,
+            'user_id': r.user_id,
+            'user_name': f"{r.user.first_name} {r.user.last_name}" if r.user else 'Anonymous'
+        } for r in place.reviews] if place.reviews else []
+        
+        return result, 200
+
+    @jwt_required()
+    @api.doc('update_place')
+    def put(self, place_id):
+        """Update a place (owner or admin only)"""
+        is_admin = current_user.is_admin
+        current_user_id = get_jwt_identity()
+        
+        place = facade.get_place(place_id)
+        if not place:
+            return {"error": "Place not found"}, 404
+        
+        # Check ownership or admin
+        if not is_admin and place.owner_id != current_user_id:
+            return {"error": "Unauthorized action"}, 403
+        
+        data = request.get_json() or {}
+        allowed_fields = ["title", "description", "price", "latitude", "longitude"]
+        update_data = {k: v for k, v in data.items() if k in allowed_fields}
+        
+        if update_data:
+            facade.update_place(place_id, update_data)
+        return {"message": "Place updated successfully"}, 200
+
+    @jwt_required()
+    @api.doc('delete_place')
+    def delete(self, place_id):
+        """Delete a place (owner or admin only)"""
+        is_admin = current_user.is_admin
+        current_user_id = get_jwt_identity()
+        
+        place = facade.get_place(place_id)
+        if not place:
+            return {"error": "Place not found"}, 404
+        
+        if not is_admin and place.owner_id != current_user_id:
+            return {"error": "Unauthorized action"}, 403
+        
+        facade.delete_place(place_id)
+        return {"message": "Place deleted successfully"}, 200
+
+
+@api.route('/<string:place_id>/reviews')
+class PlaceReviews(Resource):
+    @api.doc('get_place_reviews')
+    @conditional("places", "reviews")
+    def get(self, place_id):
+        """Get all reviews for a place (public endpoint)"""
+        place = facade.get_place(place_id)
+        if not place:
+            return {"error": "Place not found"}, 404
+        
+        reviews = facade.get_reviews_by_place(place_id)
+        return [{
+            'id': str(r.id),
+            'text': r.text,
+            'rating': r.rating,
+            'user_id': r.user_id,
+            'created_at': r.created_at.isoformat() if r.created_at else None
+        } for r in reviews], 200
@@ -0,0 +1,104 @@
+# Flask CLI commands, available as `flask hbnb <command>`
+
+import json
+import os
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app import db
+
+hbnb_cli = AppGroup("hbnb", help="HBnB maintenance commands")
+
+
+def backfill_place_ratings():
+    """Recompute review_count/rating_sum on every place from its reviews.
+
+    The columns themselves are added by ``upgrade_columns`` when the app
+    starts. Returns the number of places updated.
+    """
+    result = db.session.execute(text(
+        "UPDATE places SET "
+        "review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id), "
+        "rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews "
+        "WHERE reviews.place_id = places.id)"
+    ))
+    db.session.commit()
+    return result.rowcount
+
+
+@hbnb_cli.command("backfill-ratings")
+def backfill_ratings_command():
+    """Rebuild the per-place review aggregates"""
+    count = backfill_place_ratings()
+    click.echo(f"Recomputed ratings for {count} places")
+
+
+@hbnb_cli.command("rebuild-search")
+def rebuild_search_command():
+    """Create or rebuild the full-text search indexes (SQLite only)"""
+    if db.engine.dialect.name != "sqlite":
+        raise click.ClickException("Full-text search indexes are only kept on SQLite")
+    from app.persistence.sqlite import install_fts
+    with db.engine.begin() as connection:
+        install_fts(connection, rebuild=True)
+    click.echo("Rebuilt full-text search indexes")
+
+
+def _report(record_type, count):
+    click.echo(f"{record_type}: {count}", err=True)
+
+
+@hbnb_cli.command("purge-tokens")
+def purge_tokens_command():
+    """Drop blocklist entries for tokens that have expired"""
+    from app.services.container import get_services
+    count = get_services().facade.purge_revoked_tokens()
+    click.echo(f"Purged {count} expired revoked tokens")
+
+
+@hbnb_cli.command("export")
+@click.argument("output", type=click.File("w"), default="-")
+@click.option("--chunk-size", default=1000, show_default=True, help="Rows fetched at a time")
+def export_command(output, chunk_size):
+    """Write every user, amenity, place, amenity link and review as NDJSON"""
+    from app.persistence.ndjson import export_records
+    for record in export_records(chunk_size, progress=_report):
+        output.write(json.dumps(record) + "\n")
+
+
+@hbnb_cli.command("import")
+@click.argument("source", type=click.File("r"), default="-")
+@click.option("--chunk-size", default=1000, show_default=True, help="Rows per INSERT and commit")
+def import_command(source, chunk_size):
+    """Load an NDJSON export (from this app or the part 2 store)"""
+    from app.persistence.ndjson import import_records
+    records = (json.loads(line) for line in source if line.strip())
+    try:
+        counts = import_records(records, chunk_size, progress=_report)
+    except (ValueError, IntegrityError) as e:
+        db.session.rollback()
+        raise click.ClickException(f"Import stopped, earlier chunks were kept: {e}")
+    backfill_place_ratings()
+    click.echo("Imported " + ", ".join(f"{count} {record_type}"
+                                       for record_type, count in counts.items()))
+
+
+@hbnb_cli.command("cache-server")
+@click.option("--socket", "path", default=lambda: os.getenv("CACHE_SOCKET_PATH"),
+              required=True, help="Unix socket path (defaults to CACHE_SOCKET_PATH)")
+@click.option("--size", default=10000, show_default=True, help="Maximum cached entries")
+def cache_server_command(path, size):
+    """Run the cache shared by worker processes"""
+    from app.persistence.cache_server import CacheServer
+    try:
+        server = CacheServer(path, maxsize=size)
+    except FileExistsError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Serving shared cache on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
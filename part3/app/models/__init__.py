@@ -1 +1 @@
-# ...existing code...
+# ...existing code...
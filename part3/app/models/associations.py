@@ -1,7 +1,9 @@
-from app import db
-
-place_amenity = db.Table(
-    'place_amenity',
-    db.Column('place_id', db.String(36), db.ForeignKey('places.id'), primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True)
-)
+from app import db
+
+place_amenity = db.Table(
+    'place_amenity',
+    db.Column('place_id', db.String(36), db.ForeignKey('places.id'), primary_key=True),
+    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True),
+    # The primary key serves lookups by place; this one, places offering an amenity
+    db.Index('ix_place_amenity_amenity_id_place_id', 'amenity_id', 'place_id'),
+)
@@ -0,0 +1,12 @@
+# Revoked JWT SQLAlchemy model
+from app import db
+from .base_model import BaseModel
+
+
+class RevokedToken(BaseModel):
+    """A token on the blocklist: id is its jti, created_at when it was revoked"""
+    __tablename__ = 'revoked_tokens'
+    user_id = db.Column(db.String(36), nullable=False)
+    # Past this the token is refused as expired anyway, and the row can go;
+    # NULL for tokens that never expire
+    expires_at = db.Column(db.DateTime, index=True)
@@ -0,0 +1,217 @@
+# Read-through entity cache shared by every SQLAlchemyRepository
+
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCacheBackend:
+    """LRU store with per-entry expiry, living in this process
+
+    Besides entries it keeps named counters, which are never evicted.
+    ``generation`` moves on every delete so callers can tell whether an
+    invalidation happened while they were loading a value. ``epoch``
+    identifies this store's counters, which restart from zero with it.
+    """
+
+    def __init__(self, maxsize=1024, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.epoch = uuid.uuid4().hex[:8]
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return (value, generation); value is None when absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > self._clock():
+                    self._entries.move_to_end(key)
+                    return value, self._generation
+                del self._entries[key]
+            return None, self._generation
+
+    def set(self, key, value, ttl, generation=None):
+        """Store value unless an invalidation happened since generation"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def incr(self, *names):
+        """Add one to each named counter"""
+        with self._lock:
+            for name in names:
+                self._counters[name] = self._counters.get(name, 0) + 1
+
+    def counters(self, *names):
+        """Return (epoch, values of the named counters in order)"""
+        with self._lock:
+            return self.epoch, tuple(self._counters.get(name, 0) for name in names)
+
+    def stats(self):
+        with self._lock:
+            return {"evictions": self.evictions, "size": len(self._entries)}
+
+
+class EntityCache:
+    """Read-through cache in front of a backend, with hit/miss counters
+
+    The backend is a LocalCacheBackend by default; with several worker
+    processes a shared one (see app.persistence.cache_server) keeps every
+    worker's reads coherent with the others' writes. ``load`` fills the
+    cache on a miss, and a value loaded while an invalidation happened is
+    not stored, so a reader racing a writer cannot put the old row back.
+    Backend failures degrade to a miss rather than an error.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic, backend=None):
+        self.ttl = ttl
+        self.backend = backend or LocalCacheBackend(maxsize, clock)
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, maxsize=None, ttl=None, backend=None):
+        """Switch to backend, or a fresh local store of maxsize entries"""
+        if ttl is not None:
+            self.ttl = ttl
+        if backend is not None:
+            self.backend = backend
+        elif maxsize is not None:
+            self.backend = LocalCacheBackend(maxsize)
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and getattr(self.backend, "maxsize", None) != 0
+
+    def _lookup(self, key):
+        try:
+            value, generation = self.backend.get(key)
+        except OSError:
+            logger.warning("Cache backend unavailable, reading through", exc_info=True)
+            return None, None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value, generation
+
+    def get(self, key):
+        """Cached value for key, or None when absent or expired"""
+        return self._lookup(key)[0]
+
+    def set(self, key, value, generation=None, ttl=None):
+        """Store value unless an invalidation happened since generation
+
+        ``ttl`` overrides the cache-wide expiry for this entry.
+        """
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, value, self.ttl if ttl is None else ttl, generation)
+        except OSError:
+            logger.warning("Cache backend unavailable, value not stored", exc_info=True)
+
+    def get_or_load(self, key, load, ttl=None):
+        """Return the cached value for key, calling load() on a miss.
+
+        None results are not cached.
+        """
+        if not self.enabled:
+            return load()
+        value, generation = self._lookup(key)
+        if value is not None:
+            return value
+        value = load()
+        if value is not None and generation is not None:
+            self.set(key, value, generation, ttl)
+        return value
+
+    def invalidate(self, *keys):
+        try:
+            self.backend.delete(*keys)
+        except OSError:
+            logger.error("Cache backend unavailable, %d keys not invalidated", len(keys),
+                         exc_info=True)
+
+    def clear(self):
+        try:
+            self.backend.clear()
+        except OSError:
+            logger.error("Cache backend unavailable, not cleared", exc_info=True)
+
+    def stats(self):
+        """Counters for monitoring: hits, misses and, when the backend
+        answers, its evictions and current size"""
+        stats = {"hits": self.hits, "misses": self.misses}
+        try:
+            stats.update(self.backend.stats())
+        except OSError:
+            logger.warning("Cache backend unavailable, stats are local only", exc_info=True)
+        return stats
+
+
+entity_cache = EntityCache()
+
+
+def cache_key(obj):
+    return obj.__table__.name, obj.id
+
+
+def mark_stale(session, *keys):
+    """Evict keys from entity_cache when session next commits"""
+    session.info.setdefault("stale_cache_keys", set()).update(keys)
+
+
+def _collect_flush(session, flush_context):
+    mark_stale(session, *(cache_key(obj)
+                          for obj in itertools.chain(session.dirty, session.deleted)))
+
+
+def _invalidate(session):
+    keys = session.info.pop("stale_cache_keys", ())
+    if keys:
+        entity_cache.invalidate(*keys)
+
+
+def _discard(session):
+    # A rolled-back SAVEPOINT leaves the outer transaction, and what it
+    # changed, to be committed
+    if not session.in_nested_transaction():
+        session.info.pop("stale_cache_keys", None)
+
+
+def track_invalidations(session):
+    """Evict rows changed through session from entity_cache once committed"""
+    if event.contains(session, "after_commit", _invalidate):
+        return
+    event.listen(session, "after_flush", _collect_flush)
+    event.listen(session, "after_commit", _invalidate)
+    event.listen(session, "after_rollback", _discard)
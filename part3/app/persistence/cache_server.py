@@ -0,0 +1,162 @@
+# Shared cache served over a Unix-domain socket
+#
+# One CacheServer process holds the cache; every WSGI worker talks to it
+# through a SocketCacheBackend, so an invalidation made by one worker is
+# seen by all of them. Messages are length-prefixed pickles, which is only
+# safe because the socket is local and readable by its owner alone.
+
+import os
+import pickle
+import socket
+import socketserver
+import stat
+import struct
+import threading
+from app.persistence.cache import LocalCacheBackend
+
+_HEADER = struct.Struct("!I")
+
+# Backend methods a client may call
+OPERATIONS = frozenset({"get", "set", "delete", "clear", "incr", "counters", "stats"})
+
+
+def _send(stream, message):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def _receive(stream):
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise EOFError("Connection closed")
+    (size,) = _HEADER.unpack(header)
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError("Connection closed")
+    return pickle.loads(data)
+
+
+class CacheServerError(ConnectionError):
+    """The cache server reported a failed call; callers treat it as a miss"""
+
+
+class _CacheRequestHandler(socketserver.StreamRequestHandler):
+    """Answers (operation, args) requests until the client disconnects"""
+
+    def handle(self):
+        backend = self.server.backend
+        while True:
+            try:
+                operation, args = _receive(self.rfile)
+            except EOFError:
+                return
+            if operation not in OPERATIONS:
+                _send(self.wfile, (False, f"Unknown operation {operation!r}"))
+                continue
+            try:
+                _send(self.wfile, (True, getattr(backend, operation)(*args)))
+            except Exception as e:  # report to the client, keep serving
+                _send(self.wfile, (False, repr(e)))
+
+
+class CacheServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves one LocalCacheBackend to every client connected to path"""
+
+    daemon_threads = True
+
+    def __init__(self, path, maxsize=1024):
+        try:
+            mode = os.lstat(path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            # A stale socket from an earlier run is replaced; anything else is kept
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{path} exists and is not a socket")
+            os.unlink(path)
+        self.backend = LocalCacheBackend(maxsize)
+        # Create the socket owner-only, so no other user can connect between
+        # bind() and the chmod below
+        umask = os.umask(0o077)
+        try:
+            super().__init__(path, _CacheRequestHandler)
+        finally:
+            os.umask(umask)
+        os.chmod(path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class SocketCacheBackend:
+    """Backend forwarding every call to a CacheServer
+
+    Each thread keeps its own connection and reconnects once after an
+    error. Failures surface as OSError, which EntityCache treats as a miss.
+    """
+
+    maxsize = None
+
+    def __init__(self, path, timeout=0.5):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        stream = getattr(self._local, "stream", None)
+        if stream is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            stream = self._local.stream = sock.makefile("rwb")
+            self._local.sock = sock
+        return stream
+
+    def _disconnect(self):
+        stream = getattr(self._local, "stream", None)
+        if stream is not None:
+            try:
+                stream.close()
+                self._local.sock.close()
+            except OSError:
+                pass
+        self._local.stream = self._local.sock = None
+
+    def _call(self, operation, *args):
+        for attempt in (1, 2):
+            try:
+                stream = self._connection()
+                _send(stream, (operation, args))
+                ok, result = _receive(stream)
+                break
+            except (OSError, EOFError) as e:
+                self._disconnect()
+                if attempt == 2:
+                    raise ConnectionError(f"Cache server at {self.path} unavailable") from e
+        if not ok:
+            raise CacheServerError(f"Cache server error: {result}")
+        return result
+
+    def get(self, key):
+        return self._call("get", key)
+
+    def set(self, key, value, ttl, generation=None):
+        return self._call("set", key, value, ttl, generation)
+
+    def delete(self, *keys):
+        self._call("delete", *keys)
+
+    def clear(self):
+        self._call("clear")
+
+    def incr(self, *names):
+        self._call("incr", *names)
+
+    def counters(self, *names):
+        return self._call("counters", *names)
+
+    def stats(self):
+        return self._call("stats")
@@ -0,0 +1,50 @@
+# Schema upgrades for databases created by older versions of the models
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
+
+def upgrade_columns(connection, metadata):
+    """Add the model columns missing from existing tables.
+
+    Covers columns a database can add in place: nullable ones, ones with a
+    server default, and generated ones (SQLite adds them as VIRTUAL).
+    Run before ``upgrade_indexes``, whose indexes may cover them. Returns
+    the added columns as "table.column".
+    """
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    quote = connection.dialect.identifier_preparer.quote
+    added = []
+    for table in metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {quote(table.name)} ADD COLUMN {definition}")
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def upgrade_indexes(connection, metadata):
+    """Create the model indexes missing from existing tables.
+
+    ``create_all`` only creates indexes along with a new table, so a
+    database made before an index was declared needs this. Returns the
+    names of the indexes created.
+    """
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    created = []
+    for table in metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                index.create(connection)
+                created.append(index.name)
+    return created
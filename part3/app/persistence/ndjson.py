@@ -0,0 +1,109 @@
+# Streaming NDJSON export and import of the whole dataset
+#
+# One JSON object per line: {"type": "<record type>", <column>: <value>, ...}
+# with datetimes as ISO 8601 strings. Records come in RECORD_TYPES order, so
+# parents always precede the rows that reference them. Part 2's in-memory
+# store reads and writes the same format (app/persistence/ndjson.py there).
+
+from datetime import datetime
+from itertools import groupby
+from sqlalchemy import DateTime, select
+from app import db
+from app.models.associations import place_amenity
+from app.persistence.sqlalchemy_repository import chunked
+from app.services.container import get_services
+from app.services.passwords import is_hash, passwords
+
+# Record type -> table, parents first
+RECORD_TYPES = (
+    ("user", "users"),
+    ("amenity", "amenities"),
+    ("place", "places"),
+    ("place_amenity", "place_amenity"),
+    ("review", "reviews"),
+)
+
+# Derived columns, recomputed from the reviews after an import
+DERIVED = {"places": ("review_count", "rating_sum")}
+
+
+def stored_columns(table):
+    """Columns of table that hold data, leaving out ones the database computes"""
+    return [column for column in table.c if column.computed is None]
+
+
+def _tables():
+    return {record_type: db.metadata.tables[name] for record_type, name in RECORD_TYPES}
+
+
+def export_records(chunk_size=1000, progress=None):
+    """Yield every row as a record, streaming each table chunk_size rows at a time
+
+    ``progress(record_type, count)`` is called after each chunk and once
+    per table with its total.
+    """
+    for record_type, table in _tables().items():
+        result = db.session.execute(
+            select(*stored_columns(table)).execution_options(yield_per=chunk_size))
+        count = 0
+        for row in result.mappings():
+            record = {"type": record_type}
+            for name, value in row.items():
+                record[name] = value.isoformat() if isinstance(value, datetime) else value
+            yield record
+            count += 1
+            if progress and count % chunk_size == 0:
+                progress(record_type, count)
+        if progress and count % chunk_size:
+            progress(record_type, count)
+    db.session.rollback()
+
+
+def _row(table, record):
+    """Column values for table from a record, dropping what it does not store"""
+    row = {}
+    for column in stored_columns(table):
+        value = record.get(column.name)
+        if value is None or column.name in DERIVED.get(table.name, ()):
+            continue
+        if isinstance(column.type, DateTime) and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        row[column.name] = value
+    # Part 2 keeps plain-text passwords; never store one unhashed
+    if table.name == "users" and not is_hash(row.get("password")):
+        row["password"] = passwords.hash(row.get("password", ""))
+    return row
+
+
+def import_records(records, chunk_size=1000, progress=None):
+    """Insert records as written by export_records, one commit per chunk
+
+    ``records`` is consumed lazily, so memory stays bounded by chunk_size.
+    Rows must be new; review_count/rating_sum are left for the caller to
+    recompute. ``progress(record_type, count)`` is called after each chunk.
+    Returns {record type: rows inserted}.
+    """
+    services = get_services()
+    repositories = {
+        "user": services.user_repo,
+        "amenity": services.amenity_repo,
+        "place": services.place_repo,
+        "review": services.review_repo,
+    }
+    tables = _tables()
+    counts = {}
+    for record_type, group in groupby(records, key=lambda record: record.get("type")):
+        if record_type not in tables:
+            raise ValueError(f"Unknown record type: {record_type!r}")
+        rows = (_row(tables[record_type], record) for record in group)
+        if record_type == "place_amenity":
+            write = lambda chunk: services.place_repo.replace_links(place_amenity, chunk)
+        else:
+            write = lambda chunk, repo=repositories[record_type]: repo.bulk_create(chunk)
+        for chunk in chunked(rows, chunk_size):
+            write(chunk)
+            counts[record_type] = counts.get(record_type, 0) + len(chunk)
+            if progress:
+                progress(record_type, counts[record_type])
+    return counts
+
@@ -0,0 +1,219 @@
+# Read-replica routing: GET requests may read from copies of the primary
+#
+# SQLALCHEMY_READ_REPLICAS lists database URIs holding read-only copies of
+# the primary (kept in step by whatever replicates it, e.g. litestream or
+# periodic SQLite backups). Each gets an engine named replica_<n>, built
+# with SQLALCHEMY_ENGINE_OPTIONS. They are not Flask-SQLAlchemy binds, so
+# create_all/drop_all never touch them. Every commit that writes stamps the
+# time into the primary's replica_heartbeat row; a replica's copy of that
+# row tells how far behind the primary's last write it is.
+
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import (
+    Column, Float, Integer, MetaData, Table, create_engine, event, make_url, select)
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# Kept apart from the models' metadata: only databases with replicas need it
+heartbeat = Table(
+    "replica_heartbeat", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("beat", Float, nullable=False),
+)
+
+# Requests that may read from a replica; anything else may be about to write
+READ_METHODS = ("GET", "HEAD")
+
+
+class RoutingSession(Session):
+    """Session that sends reads to ``info["read_bind"]`` while it is set"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        read_bind = self.info.get("read_bind")
+        if (read_bind is not None and bind is None and not self._flushing
+                and getattr(clause, "is_select", False)):
+            return read_bind
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_engines(app):
+    """Name -> engine for each entry of SQLALCHEMY_READ_REPLICAS
+
+    Relative SQLite paths are taken from the instance folder, as
+    Flask-SQLAlchemy does for the primary, and SQLite connections get the
+    primary's SQLITE_PRAGMAS and SQL functions.
+    """
+    from app.persistence.sqlite import pragma_hook, register_sqlite_functions
+    pragmas = app.config.get("SQLITE_PRAGMAS")
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    engines = {}
+    for n, uri in enumerate(app.config.get("SQLALCHEMY_READ_REPLICAS") or ()):
+        url = make_url(uri)
+        if url.get_backend_name() == "sqlite":
+            path = url.database
+            if path and path != ":memory:" and not path.startswith("file:") \
+                    and not os.path.isabs(path):
+                url = url.set(database=os.path.join(app.instance_path, path))
+        engine = create_engine(url, **options)
+        if engine.dialect.name == "sqlite":
+            if pragmas:
+                event.listen(engine, "connect", pragma_hook(pragmas))
+            event.listen(engine, "connect", register_sqlite_functions)
+        engines[f"replica_{n}"] = engine
+    return engines
+
+
+class ReplicaRouter:
+    """Pick a replica fresh enough to read from, or None for the primary
+
+    Replicas are checked at most every ``check_interval`` seconds. One
+    whose heartbeat trails the primary's by more than ``max_lag`` seconds,
+    or that cannot be read, is skipped until a later check finds it caught
+    up. Fresh replicas take turns.
+    """
+
+    def __init__(self, primary, replicas, max_lag=5.0, check_interval=1.0, clock=time.time):
+        self.primary = primary
+        self.replicas = dict(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._lags = {}
+        self._fresh = []
+        self._turn = itertools.count()
+
+    @staticmethod
+    def _beat(engine):
+        with engine.connect() as connection:
+            return connection.execute(
+                select(heartbeat.c.beat).where(heartbeat.c.id == 1)).scalar() or 0.0
+
+    def check(self):
+        """Measure every replica's lag now; returns {name: seconds or None}"""
+        primary_beat = self._beat(self.primary)
+        lags = {}
+        for name, engine in self.replicas.items():
+            try:
+                lags[name] = max(0.0, primary_beat - self._beat(engine))
+            except SQLAlchemyError:
+                logger.warning("Read replica %s is unreachable", name, exc_info=True)
+                lags[name] = None
+            if lags[name] is not None and lags[name] > self.max_lag:
+                logger.warning("Read replica %s is %.1fs behind, reading from the primary",
+                               name, lags[name])
+        self._lags = lags
+        self._fresh = [(name, self.replicas[name]) for name, lag in lags.items()
+                       if lag is not None and lag <= self.max_lag]
+        self._checked_at = self._clock()
+        return lags
+
+    def pick(self):
+        """(name, engine, lag at the last check) of a fresh replica, or None"""
+        due = self._checked_at is None or self._clock() - self._checked_at >= self.check_interval
+        # One thread re-checks; the others keep using the last result meanwhile
+        if due and self._lock.acquire(blocking=False):
+            try:
+                self.check()
+            except SQLAlchemyError:
+                logger.error("Could not read the primary heartbeat", exc_info=True)
+                self._fresh = []
+                self._checked_at = self._clock()
+            finally:
+                self._lock.release()
+        fresh = self._fresh
+        if not fresh:
+            return None
+        name, engine = fresh[next(self._turn) % len(fresh)]
+        return name, engine, self._lags.get(name)
+
+    def status(self):
+        """Lag in seconds of each replica at the last check (None: unreachable)"""
+        return dict(self._lags)
+
+    def dispose(self):
+        """Close the replicas' pooled connections"""
+        for engine in self.replicas.values():
+            engine.dispose()
+
+
+def _stamp(session):
+    # The listener is shared by every app; only those with replicas keep a heartbeat
+    if "replicas" not in current_app.extensions:
+        return
+    if session.new or session.dirty or session.deleted or session.info.get("changed_tables"):
+        session.execute(heartbeat.update().where(heartbeat.c.id == 1)
+                        .values(beat=time.time()))
+
+
+def _pin(session, flush_context):
+    # Read your writes: once this session has written, it reads the primary
+    session.info["pinned"] = True
+
+
+def init_replicas(app, db):
+    """Route GET reads through replicas when SQLALCHEMY_READ_REPLICAS is set
+
+    Call inside an app context after ``db.init_app``. Creates the primary's
+    heartbeat row and registers the router as ``app.extensions["replicas"]``.
+    """
+    engines = replica_engines(app)
+    if not engines:
+        return None
+    primary = db.engine
+    with primary.begin() as connection:
+        heartbeat.create(connection, checkfirst=True)
+        if connection.execute(select(heartbeat.c.id)).first() is None:
+            connection.execute(heartbeat.insert().values(id=1, beat=time.time()))
+    router = ReplicaRouter(
+        primary, engines,
+        max_lag=app.config.get("REPLICA_MAX_LAG", 5.0),
+        check_interval=app.config.get("REPLICA_CHECK_INTERVAL", 1.0),
+    )
+    if not event.contains(db.session, "before_commit", _stamp):
+        event.listen(db.session, "before_commit", _stamp)
+        event.listen(db.session, "after_flush", _pin)
+    app.extensions["replicas"] = router
+    return router
+
+
+@contextmanager
+def replica_reads(session):
+    """Send the block's SELECTs to a fresh replica when it is safe to
+
+    Only during GET/HEAD requests, and only until the session writes;
+    otherwise, or when no replica is fresh, the primary answers.
+    """
+    router = current_app.extensions.get("replicas")
+    if (router is None or session.info.get("read_bind") is not None
+            or session.info.get("pinned")
+            or not has_request_context() or request.method not in READ_METHODS):
+        yield
+        return
+    picked = router.pick()
+    if picked is None:
+        yield
+        return
+    name, engine, lag = picked
+    if lag:
+        # The data may predate the table versions that ETags are built from
+        session.info["behind_primary"] = True
+    session.info["read_bind"] = engine
+    try:
+        yield
+    finally:
+        session.info.pop("read_bind", None)
+
+
+def read_behind_primary(session):
+    """Whether this session has read from a replica that trailed the primary"""
+    return bool(session.info.get("behind_primary"))
@@ -1,51 +1,426 @@
-# SQLAlchemyRepository for generic CRUD operations
-from app import db
-
-
-class SQLAlchemyRepository:
-    """Generic SQLAlchemy repository for CRUD operations"""
-    
-    def __init__(self, model):
-        self.model = model
-
-    def add(self, obj):
-        """Add a new object to the database"""
-        db.session.add(obj)
-        db.session.commit()
-        return obj
-
-    def get(self, obj_id):
-        """Get object by ID"""
-        return self.model.query.get(obj_id)
-
-    def get_all(self):
-        """Get all objects of this type"""
-        return self.model.query.all()
-
-    def update(self, obj_id, data):
-        """Update an object by ID"""
-        obj = self.get(obj_id)
-        if obj:
-            for key, value in data.items():
-                setattr(obj, key, value)
-            db.session.commit()
-        return obj
-
-    def delete(self, obj_id):
-        """Delete an object by ID"""
-        obj = self.get(obj_id)
-        if obj:
-            db.session.delete(obj)
-            db.session.commit()
-            return True
-        return False
-
-    def get_by_attribute(self, attr_name, attr_value):
-        """Get object by a single attribute"""
-        return self.model.query.filter(
-            getattr(self.model, attr_name) == attr_value
-        ).first()
-
-    def get_by_attributes(self, **kwargs):
-        """Get object by multiple attributes"""
-        return self.model.query.filter_by(**kwargs).first()
+# SQLAlchemyRepository for generic CRUD operations
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import column, func, insert, literal_column, select, table, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+from app.persistence.cache import entity_cache, mark_stale
+from app.persistence.replicas import replica_reads
+from app.persistence.versions import mark_changed
+
+
+@contextmanager
+def transaction():
+    """Unit of work: repository writes inside the block share one commit.
+
+    Writes are flushed as they happen, so ids, constraints and later
+    queries behave as before, and committed together when the outermost
+    block exits. An exception rolls the whole unit back.
+    """
+    session = db.session
+    depth = session.info.get("unit_of_work", 0)
+    session.info["unit_of_work"] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except BaseException:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info["unit_of_work"] = depth
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items, consuming iterable lazily"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class SQLAlchemyRepository:
+    """Generic SQLAlchemy repository for CRUD operations
+
+    Lookups (``get``, ``get_all``, ``find``, ``search`` and the attribute
+    getters) read from a fresh read replica during GET requests when
+    replicas are configured; see app.persistence.replicas.
+    """
+
+    # Rows per executemany batch in bulk_create/bulk_upsert
+    BULK_CHUNK_SIZE = 1000
+    
+    def __init__(self, model, cache=entity_cache):
+        self.model = model
+        self.cache = cache
+
+    @staticmethod
+    def _commit():
+        """Commit, or only flush while a unit of work is open"""
+        if db.session.info.get("unit_of_work"):
+            db.session.flush()
+        else:
+            db.session.commit()
+
+    def add(self, obj):
+        """Add a new object to the database"""
+        db.session.add(obj)
+        self._commit()
+        return obj
+
+    def get(self, obj_id, options=None):
+        """Get object by ID, applying optional loader options.
+
+        Plain lookups read through the entity cache: a hit is attached to
+        the current session without a query. Misses load from the primary,
+        so a lagging replica never refills the cache with an old row. An
+        instance the session already holds wins over the cache, which would
+        otherwise overwrite its pending changes. Inside a unit of work, or
+        once the row has been written and not yet committed, the cache still
+        holds the row as it was, so the lookup skips it.
+        """
+        if options:
+            with replica_reads(db.session):
+                return db.session.get(self.model, obj_id, options=options)
+        if self.cache is None:
+            with replica_reads(db.session):
+                return self.model.query.get(obj_id)
+        obj = db.session.identity_map.get(identity_key(self.model, obj_id))
+        if obj is not None:
+            return obj
+        key = (self.model.__tablename__, obj_id)
+        if db.session.info.get("unit_of_work") \
+                or key in db.session.info.get("stale_cache_keys", ()):
+            return self.model.query.get(obj_id)
+        row = self.cache.get_or_load(key, lambda: self._snapshot(self.model.query.get(obj_id)))
+        return self._restore(row) if row is not None else None
+
+    def _snapshot(self, obj):
+        """Column values of obj, safe to keep beyond its session"""
+        if obj is None:
+            return None
+        return {attr.key: getattr(obj, attr.key) for attr in self.model.__mapper__.column_attrs}
+
+    def _restore(self, row):
+        """Session-bound instance for a cached row, loading nothing"""
+        obj = self.model.__mapper__.class_manager.new_instance()
+        for key, value in row.items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
+
+    def get_all(self, limit=None, after=None, options=None):
+        """Get all objects of this type, or one page of them.
+
+        Pages are keyed on the primary key: ``after`` is the id of the last
+        row already seen, so the database seeks straight to the next page.
+        """
+        query = self.model.query
+        if options:
+            query = query.options(*options)
+        if limit is not None or after is not None:
+            query = query.order_by(self.model.id)
+            if after is not None:
+                query = query.filter(self.model.id > after)
+            if limit is not None:
+                query = query.limit(limit)
+        with replica_reads(db.session):
+            return query.all()
+
+    def find(self, *criteria, order_by=None, descending=False, limit=None, after=None,
+             options=None):
+        """Get objects matching SQL criteria, keyset-paginated on (order_by, id).
+
+        ``after`` is the id of the last row already seen; its sort key is
+        looked up so the next page continues right behind it.
+        """
+        pk = self.model.id
+        query = self.model.query.filter(*criteria)
+        if options:
+            query = query.options(*options)
+        with replica_reads(db.session):
+            if after is not None:
+                query = self._seek(query, order_by, descending, after,
+                                   db.session.query(order_by) if order_by is not None else None)
+            keys = [pk] if order_by is None else [order_by, pk]
+            query = query.order_by(*[k.desc() for k in keys] if descending else keys)
+            if limit is not None:
+                query = query.limit(limit)
+            return query.all()
+
+    def search(self, match, limit=None, after=None, options=None):
+        """Get objects matching an FTS5 query, best match first.
+
+        Reads the ``<table>_fts`` index kept by app.persistence.sqlite and
+        ranks by bm25; pages are keyed on (rank, id) like ``find``.
+        """
+        name = self.model.__tablename__
+        fts = table(f"{name}_fts", column("rowid"))
+        join_on = fts.c.rowid == literal_column(f"{name}.rowid")
+        matches = literal_column(f"{name}_fts").match(match)
+        rank = func.bm25(literal_column(f"{name}_fts"))
+        query = self.model.query.join(fts, join_on).filter(matches)
+        if options:
+            query = query.options(*options)
+        with replica_reads(db.session):
+            if after is not None:
+                anchor = db.session.query(rank).select_from(self.model).join(fts, join_on)
+                query = self._seek(query, rank, False, after, anchor.filter(matches))
+            query = query.order_by(rank, self.model.id)
+            if limit is not None:
+                query = query.limit(limit)
+            return query.all()
+
+    def matching(self, match):
+        """SQL criterion for rows matching an FTS5 query, for use with ``find``.
+
+        Unlike ``search`` it leaves the order to the caller, so text can be
+        combined with other filters and sorts.
+        """
+        name = self.model.__tablename__
+        fts = table(f"{name}_fts", column("rowid"))
+        return literal_column(f"{name}.rowid").in_(
+            select(fts.c.rowid).where(literal_column(f"{name}_fts").match(match)))
+
+    def _seek(self, query, order_by, descending, after, anchor):
+        """Continue query right behind the row ``after`` in (order_by, id) order.
+
+        ``anchor`` selects the sort key and is used to look up the value
+        of that row; it is unused when ordering by id alone.
+        """
+        pk = self.model.id
+        if order_by is None:
+            return query.filter(pk < after if descending else pk > after)
+        row = anchor.filter(pk == after).first()
+        if row is None:
+            raise ValueError("Unknown cursor")
+        value = row[0]
+        # The redundant bound on order_by alone lets the database start the
+        # index range at the cursor instead of scanning up to it
+        if descending:
+            return query.filter(order_by <= value,
+                                db.or_(order_by < value,
+                                       db.and_(order_by == value, pk < after)))
+        return query.filter(order_by >= value,
+                            db.or_(order_by > value,
+                                   db.and_(order_by == value, pk > after)))
+
+    def bulk_create(self, rows, chunk_size=None):
+        """Insert many rows, given as dicts of column values.
+
+        Each chunk is one executemany INSERT and one commit (or joins the
+        open unit of work); column defaults such as id still apply. Rows are
+        read lazily, so a generator keeps memory bounded. Returns the number
+        of rows inserted.
+        """
+        return self._bulk(rows, chunk_size, lambda chunk: self._execute(lambda columns: insert(self.model), chunk))
+
+    def bulk_upsert(self, rows, chunk_size=None):
+        """Insert rows, or update the columns they give where the id exists.
+
+        Uses INSERT ... ON CONFLICT on SQLite and PostgreSQL. On other
+        databases each chunk looks up which ids exist, then inserts the new
+        rows and updates the others by primary key. Chunked like
+        ``bulk_create``; id and created_at are never overwritten.
+        """
+        dialect_insert = self._conflict_insert()
+        if dialect_insert is None:
+            write = self._insert_or_update
+        else:
+            write = lambda chunk: self._execute(
+                lambda columns: self._upsert_statement(dialect_insert, columns), chunk)
+        return self._bulk(rows, chunk_size, write, upsert=True)
+
+    def insert_if_absent(self, row):
+        """Insert one row, given as a dict of column values, unless its id exists.
+
+        Returns whether it was inserted. Uses ON CONFLICT DO NOTHING where the
+        database has it; elsewhere the INSERT runs in a SAVEPOINT, so a
+        duplicate key only rolls that back.
+        """
+        dialect_insert = self._conflict_insert()
+        if dialect_insert is not None:
+            statement = dialect_insert(self.model).values(row)
+            inserted = db.session.execute(
+                statement.on_conflict_do_nothing(index_elements=["id"])).rowcount == 1
+        else:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(self.model).values(row))
+                inserted = True
+            except IntegrityError:
+                if not self.existing_ids([row["id"]]):
+                    raise
+                inserted = False
+        self._commit()
+        return inserted
+
+    @staticmethod
+    def _conflict_insert():
+        """The dialect's INSERT construct with ON CONFLICT, or None"""
+        dialect = db.engine.dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            return None
+        return dialect_insert
+
+    def _upsert_statement(self, dialect_insert, columns):
+        statement = dialect_insert(self.model)
+        updates = {name: statement.excluded[name] for name in columns
+                   if name not in ("id", "created_at")}
+        if "updated_at" in self.model.__table__.c and "updated_at" not in columns:
+            updates["updated_at"] = datetime.utcnow()
+        if not updates:
+            return statement.on_conflict_do_nothing(index_elements=["id"])
+        return statement.on_conflict_do_update(index_elements=["id"], set_=updates)
+
+    def _insert_or_update(self, chunk):
+        """Portable upsert of one chunk: INSERT the new ids, UPDATE the rest"""
+        # Later rows for an id update the earlier ones, as ON CONFLICT does
+        rows, by_id = [], {}
+        for row in chunk:
+            if row.get("id") is None:
+                rows.append(row)
+            elif row["id"] in by_id:
+                by_id[row["id"]].update(row)
+            else:
+                by_id[row["id"]] = dict(row)
+        existing = self.existing_ids(by_id)
+        rows.extend(row for row_id, row in by_id.items() if row_id not in existing)
+        self._execute(lambda columns: insert(self.model), rows)
+        now = datetime.utcnow()
+        changes = []
+        for row_id in existing:
+            row = {name: value for name, value in by_id[row_id].items() if name != "created_at"}
+            if "updated_at" in self.model.__table__.c:
+                row.setdefault("updated_at", now)
+            if len(row) > 1:
+                changes.append(row)
+        self._execute(lambda columns: update(self.model), changes)
+
+    @staticmethod
+    def _execute(build_statement, rows):
+        """executemany over rows, one statement per set of columns they give"""
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        for columns, group in groups.items():
+            db.session.execute(build_statement(columns), group)
+
+    def _bulk(self, rows, chunk_size, write, upsert=False):
+        count = 0
+        for chunk in chunked(rows, chunk_size or self.BULK_CHUNK_SIZE):
+            write(chunk)
+            if upsert and self.cache is not None:
+                mark_stale(db.session, *((self.model.__tablename__, row["id"])
+                                         for row in chunk if row.get("id")))
+            self._commit()
+            count += len(chunk)
+        return count
+
+    def existing_ids(self, ids):
+        """The subset of ids that have a row"""
+        ids = list(set(ids))
+        found = set()
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            found.update(row[0] for row in
+                         db.session.query(self.model.id).filter(self.model.id.in_(batch)))
+        return found
+
+    def replace_links(self, association, links, owner_ids=()):
+        """Insert association rows, first dropping the links of owner_ids.
+
+        ``association`` is a many-to-many table with a foreign key to this
+        model; ``links`` are dicts of its column values.
+        """
+        owner_column = next(c for c in association.c
+                            if c.references(self.model.__table__.c.id))
+        owner_ids = list(owner_ids)
+        for start in range(0, len(owner_ids), 500):
+            db.session.execute(association.delete().where(
+                owner_column.in_(owner_ids[start:start + 500])))
+        if links:
+            db.session.execute(association.insert(), links)
+        mark_changed(db.session, association.name, self.model.__tablename__)
+        self._commit()
+
+    def update(self, obj_id, data):
+        """Update an object by ID"""
+        obj = self.get(obj_id)
+        if obj:
+            for key, value in data.items():
+                setattr(obj, key, value)
+            self._commit()
+        return obj
+
+    def increment(self, obj_id, **deltas):
+        """Atomically add deltas to numeric columns of one row"""
+        self.model.query.filter_by(id=obj_id).update(
+            {getattr(self.model, k): getattr(self.model, k) + v for k, v in deltas.items()}
+        )
+        if self.cache is not None:
+            # Bulk UPDATEs bypass the session's flush tracking
+            mark_stale(db.session, (self.model.__tablename__, obj_id))
+        self._commit()
+
+    def delete(self, obj_id):
+        """Delete an object by ID"""
+        obj = self.get(obj_id)
+        if obj:
+            db.session.delete(obj)
+            self._commit()
+            return True
+        return False
+
+    def delete_if_present(self, obj_id):
+        """Delete one row with a single DELETE; returns whether this call removed it.
+
+        Of two racing callers only one gets True, so it is safe to adjust
+        counters on. Skips ORM cascades: only use it for rows nothing else
+        refers to.
+        """
+        deleted = self.model.query.filter_by(id=obj_id).delete() == 1
+        if deleted and self.cache is not None:
+            # Bulk DELETEs bypass the session's flush tracking
+            mark_stale(db.session, (self.model.__tablename__, obj_id))
+        self._commit()
+        return deleted
+
+    def delete_where(self, *criteria):
+        """Delete every row matching SQL criteria; returns how many went.
+
+        Bypasses the session, so cached copies of the rows live on until
+        they expire: only use it for rows nothing will look up again.
+        """
+        count = self.model.query.filter(*criteria).delete(synchronize_session=False)
+        self._commit()
+        return count
+
+    def get_by_attribute(self, attr_name, attr_value):
+        """Get object by a single attribute"""
+        with replica_reads(db.session):
+            return self.model.query.filter(
+                getattr(self.model, attr_name) == attr_value
+            ).first()
+
+    def get_by_attributes(self, **kwargs):
+        """Get object by multiple attributes"""
+        with replica_reads(db.session):
+            return self.model.query.filter_by(**kwargs).first()
+
+    def filter_by(self, **kwargs):
+        """Get all objects matching the given attributes"""
+        with replica_reads(db.session):
+            return self.model.query.filter_by(**kwargs).all()
@@ -0,0 +1,88 @@
+# SQLite connection setup
+
+from sqlalchemy import event
+from app.services.geo import haversine_km
+
+
+def register_sqlite_functions(dbapi_connection, connection_record):
+    """Make Python helpers callable from SQL on every new SQLite connection"""
+    dbapi_connection.create_function("haversine_km", 4, haversine_km, deterministic=True)
+
+
+def pragma_hook(pragmas):
+    """Connect hook running ``PRAGMA name = value`` for each pair, in order"""
+    statements = [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return apply_pragmas
+
+
+# Full-text search: table -> columns indexed together in <table>_fts
+FTS_TABLES = {
+    "places": ("title", "description"),
+    "reviews": ("text",),
+}
+
+
+def fts_statements(table, columns):
+    """DDL for an external-content FTS5 index over table and its sync triggers"""
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    remove = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='rowid')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} "
+        f"BEGIN {remove} {insert} END",
+    ]
+
+
+def install_fts(connection, rebuild=False):
+    """Create missing FTS indexes and fill them from their tables.
+
+    Existing indexes are only rebuilt when asked, e.g. after a VACUUM,
+    which may renumber the rowids they point at.
+    """
+    for table, columns in FTS_TABLES.items():
+        fts = f"{table}_fts"
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+        ).first()
+        for statement in fts_statements(table, columns):
+            connection.exec_driver_sql(statement)
+        if rebuild or not exists:
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _create_fts(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in fts_statements(target.name, FTS_TABLES[target.name]):
+        connection.exec_driver_sql(statement)
+
+
+def _drop_fts(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {target.name}_fts")
+
+
+def register_fts(metadata):
+    """Create and drop the FTS indexes along with their tables"""
+    for name in FTS_TABLES:
+        table = metadata.tables[name]
+        if not event.contains(table, "after_create", _create_fts):
+            event.listen(table, "after_create", _create_fts)
+            event.listen(table, "before_drop", _drop_fts)
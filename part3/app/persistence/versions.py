@@ -0,0 +1,70 @@
+# Per-table write counters, used to validate cached HTTP responses
+#
+# The counters live in the entity cache's backend, so with a shared backend
+# every worker sees the versions bumped by the others.
+
+import itertools
+import logging
+from sqlalchemy import event
+from app.persistence.cache import entity_cache
+
+logger = logging.getLogger(__name__)
+
+
+def bump(*tables):
+    """Record that rows of the given tables changed"""
+    try:
+        entity_cache.backend.incr(*tables)
+    except OSError:
+        logger.error("Cache backend unavailable, versions of %s not bumped", tables,
+                     exc_info=True)
+
+
+def current(*tables):
+    """(epoch, version of each table in the order given); epoch changes when
+    the counters restart. Raises OSError if the backend is unreachable."""
+    return entity_cache.backend.counters(*tables)
+
+
+def mark_changed(session, *tables):
+    """Bump the tables' versions when session next commits, for writes
+    the session cannot attribute to a mapped class"""
+    session.info.setdefault("changed_tables", set()).update(tables)
+
+
+def _collect_flush(session, flush_context):
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        mark_changed(session, obj.__table__.name)
+
+
+def _collect_bulk(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update \
+            or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            mark_changed(orm_execute_state.session, mapper.local_table.name)
+
+
+def _publish(session):
+    # Only bump once the data is visible, so a reader never pairs the new
+    # version with rows from before the commit
+    tables = session.info.pop("changed_tables", ())
+    if tables:
+        bump(*tables)
+
+
+def _discard(session):
+    # A rolled-back SAVEPOINT leaves the outer transaction, and what it
+    # changed, to be committed
+    if not session.in_nested_transaction():
+        session.info.pop("changed_tables", None)
+
+
+def track_writes(session):
+    """Bump table versions whenever a commit on session changes their rows"""
+    if event.contains(session, "after_commit", _publish):
+        return
+    event.listen(session, "after_flush", _collect_flush)
+    event.listen(session, "do_orm_execute", _collect_bulk)
+    event.listen(session, "after_commit", _publish)
+    event.listen(session, "after_rollback", _discard)
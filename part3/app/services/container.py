@@ -0,0 +1,51 @@
+# Application-scoped service container
+
+from flask import current_app
+from werkzeug.local import LocalProxy
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+from app.persistence.cache import entity_cache
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+from app.services.facade import HBnBFacade
+
+
+class ServiceContainer:
+    """Repositories and facade built once per app and shared by all requests
+
+    ``create_app`` registers it as ``app.extensions["hbnb"]``; namespaces
+    reach it through the ``facade`` proxy below.
+    """
+
+    def __init__(self, cache=entity_cache):
+        self.cache = cache
+        self.user_repo = SQLAlchemyRepository(User, cache=cache)
+        self.place_repo = SQLAlchemyRepository(Place, cache=cache)
+        self.review_repo = SQLAlchemyRepository(Review, cache=cache)
+        self.amenity_repo = SQLAlchemyRepository(Amenity, cache=cache)
+        self.token_repo = SQLAlchemyRepository(RevokedToken, cache=cache)
+        self.facade = HBnBFacade(
+            user_repo=self.user_repo,
+            place_repo=self.place_repo,
+            review_repo=self.review_repo,
+            amenity_repo=self.amenity_repo,
+            token_repo=self.token_repo,
+        )
+
+    def init_app(self, app):
+        app.extensions["hbnb"] = self
+
+    def stats(self):
+        """Shared counters, for monitoring"""
+        return {"entity_cache": self.cache.stats()}
+
+
+def get_services():
+    """Container of the current app"""
+    return current_app.extensions["hbnb"]
+
+
+# Facade of the current app, for use at module level in namespaces
+facade = LocalProxy(lambda: get_services().facade)
@@ -1,141 +1,410 @@
-# Facade for business logic
-
-from app.models.user import User
-from app.models.place import Place
-from app.models.review import Review
-from app.models.amenity import Amenity
-from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
-
-
-class HBnBFacade:
-    """Facade pattern to simplify interaction with repositories"""
-    
-    def __init__(self):
-        self.user_repo = SQLAlchemyRepository(User)
-        self.place_repo = SQLAlchemyRepository(Place)
-        self.review_repo = SQLAlchemyRepository(Review)
-        self.amenity_repo = SQLAlchemyRepository(Amenity)
-
-    # ==================== USER OPERATIONS ====================
-    
-    def create_user(self, user_data):
-        """Create a new user with hashed password"""
-        user = User(
-            first_name=user_data["first_name"],
-            last_name=user_data["last_name"],
-            email=user_data["email"],
-            is_admin=user_data.get("is_admin", False)
-        )
-        user.hash_password(user_data["password"])
-        self.user_repo.add(user)
-        return user
-
-    def get_user(self, user_id):
-        """Get user by ID"""
-        return self.user_repo.get(user_id)
-
-    def get_user_by_email(self, email):
-        """Get user by email"""
-        return self.user_repo.get_by_attribute('email', email)
-
-    def get_all_users(self):
-        """Get all users"""
-        return self.user_repo.get_all()
-
-    def update_user(self, user_id, data):
-        """Update user (regular user - cannot change email/password)"""
-        self.user_repo.update(user_id, data)
-
-    def admin_update_user(self, user_id, data):
-        """Admin update user (can change email/password)"""
-        user = self.get_user(user_id)
-        if not user:
-            return None
-        if "password" in data:
-            user.hash_password(data["password"])
-            self.user_repo.update(user_id, {"password": user.password})
-            data = {k: v for k, v in data.items() if k != "password"}
-        if data:
-            self.user_repo.update(user_id, data)
-        return user
-
-    # ==================== PLACE OPERATIONS ====================
-    
-    def create_place(self, place_data):
-        """Create a new place"""
-        place = Place(**place_data)
-        self.place_repo.add(place)
-        return place
-
-    def get_place(self, place_id):
-        """Get place by ID"""
-        return self.place_repo.get(place_id)
-
-    def get_all_places(self):
-        """Get all places"""
-        return self.place_repo.get_all()
-
-    def update_place(self, place_id, data):
-        """Update place"""
-        self.place_repo.update(place_id, data)
-
-    def delete_place(self, place_id):
-        """Delete place"""
-        self.place_repo.delete(place_id)
-
-    # ==================== REVIEW OPERATIONS ====================
-    
-    def create_review(self, review_data):
-        """Create a new review"""
-        review = Review(**review_data)
-        self.review_repo.add(review)
-        return review
-
-    def get_review(self, review_id):
-        """Get review by ID"""
-        return self.review_repo.get(review_id)
-
-    def get_all_reviews(self):
-        """Get all reviews"""
-        return self.review_repo.get_all()
-
-    def get_reviews_by_place(self, place_id):
-        """Get all reviews for a specific place"""
-        all_reviews = self.review_repo.get_all()
-        return [r for r in all_reviews if r.place_id == place_id]
-
-    def get_review_by_user_and_place(self, user_id, place_id):
-        """Check if user already reviewed a place"""
-        return self.review_repo.get_by_attributes(user_id=user_id, place_id=place_id)
-
-    def update_review(self, review_id, data):
-        """Update review"""
-        self.review_repo.update(review_id, data)
-
-    def delete_review(self, review_id):
-        """Delete review"""
-        self.review_repo.delete(review_id)
-
-    # ==================== AMENITY OPERATIONS ====================
-    
-    def create_amenity(self, amenity_data):
-        """Create a new amenity"""
-        amenity = Amenity(**amenity_data)
-        self.amenity_repo.add(amenity)
-        return amenity
-
-    def get_amenity(self, amenity_id):
-        """Get amenity by ID"""
-        return self.amenity_repo.get(amenity_id)
-
-    def get_all_amenities(self):
-        """Get all amenities"""
-        return self.amenity_repo.get_all()
-
-    def get_amenity_by_name(self, name):
-        """Get amenity by name"""
-        return self.amenity_repo.get_by_attribute("name", name)
-
-    def update_amenity(self, amenity_id, data):
-        """Update amenity"""
-        self.amenity_repo.update(amenity_id, data)
+# Facade for business logic
+
+import re
+import uuid
+from datetime import datetime
+from sqlalchemy import false, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from app import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.models.associations import place_amenity
+from app.models.revoked_token import RevokedToken
+from app.persistence.cache import mark_stale
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository, chunked, transaction
+from app.services.geo import bounding_box
+from app.services.passwords import PasswordHasherBusy, passwords
+
+
+class HBnBFacade:
+    """Facade pattern to simplify interaction with repositories"""
+
+    # Loader options for place queries, keyed by the view they serve.
+    # "list" needs each owner; "detail" also walks amenities and reviews
+    # with their authors. Either way a page costs a fixed number of SELECTs.
+    PLACE_PROFILES = {
+        "list": (joinedload(Place.owner),),
+        "detail": (
+            joinedload(Place.owner),
+            selectinload(Place.amenities),
+            selectinload(Place.reviews).joinedload(Review.user),
+        ),
+    }
+    
+    # Sort orders accepted by search_places: name -> (SQL key, descending)
+    PLACE_SORTS = {
+        "price": (Place.price, False),
+        "-price": (Place.price, True),
+        "rating": (Place.rating_sort_key, False),
+        "-rating": (Place.rating_sort_key, True),
+    }
+    
+    # Place columns accepted by import_places
+    PLACE_COLUMNS = ("id", "title", "description", "price", "latitude", "longitude", "owner_id")
+
+    def __init__(self, user_repo=None, place_repo=None, review_repo=None, amenity_repo=None,
+                 token_repo=None):
+        """Use the given repositories, building any that are missing"""
+        self.user_repo = user_repo or SQLAlchemyRepository(User)
+        self.place_repo = place_repo or SQLAlchemyRepository(Place)
+        self.review_repo = review_repo or SQLAlchemyRepository(Review)
+        self.amenity_repo = amenity_repo or SQLAlchemyRepository(Amenity)
+        self.token_repo = token_repo or SQLAlchemyRepository(RevokedToken)
+
+    def transaction(self):
+        """Group several writes into one atomic commit.
+
+        Usage: ``with facade.transaction(): ...``. Facade methods that write
+        more than once already run inside one, and nest into the caller's.
+        """
+        return transaction()
+
+    # ==================== USER OPERATIONS ====================
+    
+    def create_user(self, user_data):
+        """Create a new user with hashed password"""
+        user = User(
+            first_name=user_data["first_name"],
+            last_name=user_data["last_name"],
+            email=user_data["email"],
+            is_admin=user_data.get("is_admin", False)
+        )
+        user.hash_password(user_data["password"])
+        self.user_repo.add(user)
+        return user
+
+    def get_user(self, user_id):
+        """Get user by ID"""
+        return self.user_repo.get(user_id)
+
+    def get_user_by_email(self, email):
+        """Get user by email"""
+        return self.user_repo.get_by_attribute('email', email)
+
+    def authenticate_user(self, email, password):
+        """User with this email and password, or None
+
+        A hash made at another cost than BCRYPT_LOG_ROUNDS is redone at
+        the current one while the plain password is at hand.
+        """
+        user = self.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        if user.password_needs_rehash():
+            try:
+                pw_hash = passwords.hash(password)
+            except PasswordHasherBusy:
+                # Not worth failing a login over; a later login redoes it
+                return user
+            self.user_repo.update(user.id, {"password": pw_hash})
+        return user
+
+    def get_all_users(self, limit=None, after=None):
+        """Get all users, or one page of them"""
+        return self.user_repo.get_all(limit=limit, after=after)
+
+    def update_user(self, user_id, data):
+        """Update user (regular user - cannot change email/password)"""
+        self.user_repo.update(user_id, data)
+
+    def admin_update_user(self, user_id, data):
+        """Admin update user (can change email/password)"""
+        user = self.get_user(user_id)
+        if not user:
+            return None
+        with self.transaction():
+            if "password" in data:
+                user.hash_password(data["password"])
+                self.user_repo.update(user_id, {"password": user.password})
+                data = {k: v for k, v in data.items() if k != "password"}
+            if data:
+                self.user_repo.update(user_id, data)
+        return user
+
+    # ==================== TOKEN OPERATIONS ====================
+
+    def is_token_revoked(self, jti, ttl=None):
+        """Whether the token with this jti is on the blocklist
+
+        The answer, for valid tokens too, is cached for ttl seconds
+        (default: the cache's), so a warm check costs no query. Misses ask
+        the primary: a lagging replica could still hold a revoked token as
+        valid.
+        """
+        load = lambda: bool(self.token_repo.existing_ids([jti]))
+        if self.token_repo.cache is None:
+            return load()
+        return self.token_repo.cache.get_or_load(self._verdict_key(jti), load, ttl)
+
+    @staticmethod
+    def _verdict_key(jti):
+        # Apart from the row's own cache key, under which get() keeps snapshots
+        return (f"{RevokedToken.__tablename__}:verdict", jti)
+
+    def revoke_token(self, jti, user_id, expires_at):
+        """Put a token on the blocklist, in every worker once committed.
+
+        Revoking a token that is already on the list, as two logouts racing
+        with the same token do, leaves the existing entry in place.
+        """
+        mark_stale(db.session, self._verdict_key(jti))
+        self.token_repo.insert_if_absent({"id": jti, "user_id": user_id, "expires_at": expires_at})
+
+    def purge_revoked_tokens(self, now=None):
+        """Drop blocklist entries for tokens that have expired; returns how many"""
+        return self.token_repo.delete_where(
+            RevokedToken.expires_at < (now or datetime.utcnow()))
+
+    # ==================== PLACE OPERATIONS ====================
+    
+    def create_place(self, place_data):
+        """Create a new place"""
+        place = Place(**place_data)
+        self.place_repo.add(place)
+        return place
+
+    def import_places(self, places, default_owner_id=None, upsert=False, chunk_size=None,
+                      on_chunk=None):
+        """Bulk-create (or upsert) places, one transaction per chunk.
+
+        ``places`` are dicts shaped like the API payload, optionally with
+        id, owner_id (else default_owner_id) and an amenities ID list, which
+        replaces the place's links on upsert. Each chunk's owners and
+        amenities must exist. A ValueError, naming the place's position when
+        the place itself is at fault, stops the import; earlier chunks
+        stay committed. ``on_chunk(count)`` is called after every commit.
+        Returns the number of places written.
+        """
+        count = 0
+        for chunk in chunked(enumerate(places), chunk_size or self.place_repo.BULK_CHUNK_SIZE):
+            # Keyed by id so a place repeated within a chunk ends as its last copy
+            rows, amenities = {}, {}
+            for index, item in chunk:
+                row = {k: item[k] for k in self.PLACE_COLUMNS if item.get(k) is not None}
+                row.setdefault("owner_id", default_owner_id)
+                row.setdefault("id", str(uuid.uuid4()))
+                rows[row["id"]] = row
+                if "amenities" in item:
+                    amenity_ids = item["amenities"] or []
+                    if not isinstance(amenity_ids, list) \
+                            or not all(isinstance(a, str) for a in amenity_ids):
+                        raise ValueError(f"Place {index}: amenities must be a list of IDs")
+                    amenities[row["id"]] = set(amenity_ids)
+                else:
+                    amenities.pop(row["id"], None)
+            rows = list(rows.values())
+            links = [{"place_id": place_id, "amenity_id": amenity_id}
+                     for place_id, amenity_ids in amenities.items()
+                     for amenity_id in amenity_ids]
+            owner_ids = {row["owner_id"] for row in rows}
+            missing = owner_ids - self.user_repo.existing_ids(owner_ids)
+            if missing:
+                raise ValueError(f"Unknown owner_id: {sorted(missing, key=str)[0]}")
+            amenity_ids = {link["amenity_id"] for link in links}
+            missing = amenity_ids - self.amenity_repo.existing_ids(amenity_ids)
+            if missing:
+                raise ValueError(f"Unknown amenity: {sorted(missing)[0]}")
+            try:
+                with self.transaction():
+                    if upsert:
+                        self.place_repo.bulk_upsert(rows, chunk_size=len(rows))
+                    else:
+                        self.place_repo.bulk_create(rows, chunk_size=len(rows))
+                    self.place_repo.replace_links(place_amenity, links,
+                                                  list(amenities) if upsert else ())
+            except IntegrityError:
+                raise ValueError("Place ids must be new unless upserting") from None
+            count += len(chunk)
+            if on_chunk:
+                on_chunk(count)
+        return count
+
+    def get_place(self, place_id, profile=None):
+        """Get place by ID, eager-loading what the given profile needs"""
+        return self.place_repo.get(place_id, options=self.PLACE_PROFILES.get(profile))
+
+    def get_all_places(self, limit=None, after=None, profile=None):
+        """Get all places, or one page of them"""
+        return self.place_repo.get_all(limit=limit, after=after,
+                                       options=self.PLACE_PROFILES.get(profile))
+
+    def search_places(self, min_price=None, max_price=None, q=None, amenity=None,
+                      sort=None, limit=None, after=None, profile=None):
+        """Filter and sort places in SQL, one page at a time"""
+        if sort is not None and sort not in self.PLACE_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(self.PLACE_SORTS)}")
+        criteria = []
+        if min_price is not None:
+            criteria.append(Place.price >= min_price)
+        if max_price is not None:
+            criteria.append(Place.price <= max_price)
+        if q:
+            criteria.append(self._place_text_criterion(q))
+        if amenity:
+            # Driven by the (amenity_id, place_id) index, not a probe per place
+            criteria.append(Place.id.in_(
+                select(place_amenity.c.place_id).where(place_amenity.c.amenity_id == amenity)))
+        order_by, descending = self.PLACE_SORTS.get(sort, (None, False))
+        return self.place_repo.find(*criteria, order_by=order_by, descending=descending,
+                                    limit=limit, after=after,
+                                    options=self.PLACE_PROFILES.get(profile))
+
+    @staticmethod
+    def _bbox_criteria(min_lat, min_lon, max_lat, max_lon):
+        """SQL predicates for a box; min_lon > max_lon wraps the antimeridian"""
+        criteria = [Place.latitude.between(min_lat, max_lat)]
+        if min_lon > max_lon:
+            criteria.append(or_(Place.longitude >= min_lon, Place.longitude <= max_lon))
+        else:
+            criteria.append(Place.longitude.between(min_lon, max_lon))
+        return criteria
+
+    def get_places_in_bbox(self, min_lat, min_lon, max_lat, max_lon,
+                           limit=None, after=None, profile=None):
+        """Get places inside a bounding box"""
+        return self.place_repo.find(*self._bbox_criteria(min_lat, min_lon, max_lat, max_lon),
+                                    limit=limit, after=after,
+                                    options=self.PLACE_PROFILES.get(profile))
+
+    def get_places_nearby(self, lat, lon, radius_km, limit=None, after=None, profile=None):
+        """Get places within radius_km of a point, nearest first.
+
+        The (latitude, longitude) index narrows rows to the circle's bounding
+        box; haversine_km then drops the corners and orders the rest.
+        """
+        distance = func.haversine_km(Place.latitude, Place.longitude, lat, lon)
+        criteria = self._bbox_criteria(*bounding_box(lat, lon, radius_km))
+        criteria.append(distance <= radius_km)
+        return self.place_repo.find(*criteria, order_by=distance, limit=limit, after=after,
+                                    options=self.PLACE_PROFILES.get(profile))
+
+    @staticmethod
+    def _fts_query(text, prefix=False):
+        """Quote every word so user input is matched literally, all words required.
+
+        With prefix, each word also matches longer words it starts.
+        """
+        star = "*" if prefix else ""
+        return " ".join(f'"{word}"{star}' for word in re.findall(r"\w+", text or ""))
+
+    def _place_text_criterion(self, q):
+        """Places whose title or description has words starting with each word of q.
+
+        On SQLite this reads the places_fts index; elsewhere it falls back
+        to a substring match, which scans the table.
+        """
+        if db.engine.dialect.name == "sqlite":
+            match = self._fts_query(q, prefix=True)
+            if not match:
+                return false()
+            return self.place_repo.matching(match)
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        return or_(Place.title.ilike(pattern, escape="\\"),
+                   Place.description.ilike(pattern, escape="\\"))
+
+    def search_place_text(self, q, limit=None, after=None, profile=None):
+        """Get places whose title or description contain every word of q, best first"""
+        match = self._fts_query(q)
+        if not match:
+            return []
+        return self.place_repo.search(match, limit=limit, after=after,
+                                      options=self.PLACE_PROFILES.get(profile))
+
+    def get_places_by_owner(self, owner_id):
+        """Get all places owned by a user"""
+        return self.place_repo.filter_by(owner_id=owner_id)
+
+    def update_place(self, place_id, data):
+        """Update place"""
+        self.place_repo.update(place_id, data)
+
+    def delete_place(self, place_id):
+        """Delete place"""
+        self.place_repo.delete(place_id)
+
+    # ==================== REVIEW OPERATIONS ====================
+    
+    def create_review(self, review_data):
+        """Create a new review"""
+        review = Review(**review_data)
+        with self.transaction():
+            self.review_repo.add(review)
+            self.place_repo.increment(review.place_id, review_count=1, rating_sum=review.rating)
+        return review
+
+    def get_review(self, review_id):
+        """Get review by ID"""
+        return self.review_repo.get(review_id)
+
+    def get_all_reviews(self, limit=None, after=None):
+        """Get all reviews, or one page of them"""
+        return self.review_repo.get_all(limit=limit, after=after)
+
+    def search_review_text(self, q, limit=None, after=None):
+        """Get reviews whose text contains every word of q, best first"""
+        match = self._fts_query(q)
+        if not match:
+            return []
+        return self.review_repo.search(match, limit=limit, after=after)
+
+    def get_reviews_by_place(self, place_id):
+        """Get all reviews for a specific place"""
+        return self.review_repo.filter_by(place_id=place_id)
+
+    def get_review_by_user_and_place(self, user_id, place_id):
+        """Check if user already reviewed a place"""
+        return self.review_repo.get_by_attributes(user_id=user_id, place_id=place_id)
+
+    def update_review(self, review_id, data):
+        """Update review, moving its rating between place aggregates"""
+        review = self.get_review(review_id)
+        if not review:
+            return
+        old_place_id, old_rating = review.place_id, review.rating
+        with self.transaction():
+            self.review_repo.update(review_id, data)
+            if old_place_id != review.place_id:
+                self.place_repo.increment(old_place_id, review_count=-1, rating_sum=-old_rating)
+                self.place_repo.increment(review.place_id, review_count=1,
+                                          rating_sum=review.rating)
+            elif old_rating != review.rating:
+                self.place_repo.increment(review.place_id, rating_sum=review.rating - old_rating)
+
+    def delete_review(self, review_id):
+        """Delete review"""
+        review = self.get_review(review_id)
+        if not review:
+            return
+        place_id, rating = review.place_id, review.rating
+        with self.transaction():
+            # Of racing deletes, only the one that removed the row moves the aggregates
+            if self.review_repo.delete_if_present(review_id):
+                self.place_repo.increment(place_id, review_count=-1, rating_sum=-rating)
+
+    # ==================== AMENITY OPERATIONS ====================
+    
+    def create_amenity(self, amenity_data):
+        """Create a new amenity"""
+        amenity = Amenity(**amenity_data)
+        self.amenity_repo.add(amenity)
+        return amenity
+
+    def get_amenity(self, amenity_id):
+        """Get amenity by ID"""
+        return self.amenity_repo.get(amenity_id)
+
+    def get_all_amenities(self, limit=None, after=None):
+        """Get all amenities, or one page of them"""
+        return self.amenity_repo.get_all(limit=limit, after=after)
+
+    def get_amenity_by_name(self, name):
+        """Get amenity by name"""
+        return self.amenity_repo.get_by_attribute("name", name)
+
+    def update_amenity(self, amenity_id, data):
+        """Update amenity"""
+        self.amenity_repo.update(amenity_id, data)
@@ -0,0 +1,35 @@
+# Great-circle helpers for location queries
+
+import math
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance in kilometres between two points on the Earth's surface."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Smallest (min_lat, min_lon, max_lat, max_lon) box holding the circle.
+
+    When the circle crosses the antimeridian min_lon is greater than max_lon.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    spread = math.sin(angular) / max(math.cos(math.radians(lat)), 1e-12)
+    if min_lat == -90.0 or max_lat == 90.0 or spread >= 1.0:
+        return min_lat, -180.0, max_lat, 180.0
+    dlon = math.degrees(math.asin(spread))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180.0:
+        min_lon += 360.0
+    if max_lon > 180.0:
+        max_lon -= 360.0
+    return min_lat, min_lon, max_lat, max_lon
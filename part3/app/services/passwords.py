@@ -0,0 +1,111 @@
+# Password hashing and checking in a pool of worker processes
+#
+# A bcrypt hash or check costs tens of milliseconds of CPU. Run on the
+# request thread, a burst of logins takes every server thread and the other
+# endpoints queue behind it. PasswordHasher hands Flask-Bcrypt's work to
+# BCRYPT_WORKERS processes instead, so logins spread over the cores while
+# request threads only wait on them. At most BCRYPT_MAX_PENDING jobs may be
+# running or queued; past that it raises PasswordHasherBusy at once, which
+# the API answers with 429 rather than letting the queue grow.
+
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+
+class PasswordHasherBusy(Exception):
+    """Every pending slot is taken; the client should retry shortly"""
+
+
+_BCRYPT_HASH = re.compile(r"\$2[abxy]\$\d\d\$[./A-Za-z0-9]{53}")
+
+
+def is_hash(value):
+    """Whether value is a whole bcrypt hash, as opposed to a password"""
+    return isinstance(value, str) and _BCRYPT_HASH.fullmatch(value) is not None
+
+
+def hash_cost(pw_hash):
+    """Log rounds a bcrypt hash was made with ("$2b$12$..." -> 12), or None"""
+    try:
+        return int(pw_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Hash and check passwords with a Flask-Bcrypt object in worker processes
+
+    ``create_app`` registers one per app as ``app.extensions["passwords"]``;
+    models reach it through the ``passwords`` proxy below. With ``workers``
+    0 the work runs on the calling thread, still bounded by ``max_pending``.
+    The pool starts on first use, so each server process gets its own.
+    """
+
+    def __init__(self, bcrypt, rounds=12, workers=1, max_pending=None):
+        self.bcrypt = bcrypt
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending or 4 * max(workers, 1)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def init_app(self, app):
+        app.extensions["passwords"] = self
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers)
+            return self._pool
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password checks in progress, try again shortly")
+        try:
+            if not self.workers:
+                return function(*args)
+            pool = self._executor()
+            try:
+                return pool.submit(function, *args).result()
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for the next job
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = None
+                raise
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """bcrypt hash of password at the configured cost, as text"""
+        return self._run(
+            self.bcrypt.generate_password_hash, password, self.rounds).decode("utf-8")
+
+    def check(self, pw_hash, password):
+        """Whether password matches pw_hash"""
+        return self._run(self.bcrypt.check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """Whether pw_hash was made at another cost than the configured one"""
+        return hash_cost(pw_hash) != self.rounds
+
+    def shutdown(self):
+        """Stop the worker processes; the next job starts new ones"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+def get_passwords():
+    """Password hasher of the current app"""
+    return current_app.extensions["passwords"]
+
+
+# Password hasher of the current app, for use at module level in models
+passwords = LocalProxy(get_passwords)
@@ -0,0 +1,43 @@
+# Resolving a request's JWT to its user, with revocation
+#
+# flask_jwt_extended asks two things of every protected request: whether
+# the token is revoked (token_in_blocklist_loader) and whose it is
+# (user_lookup_loader). Both are answered from the entity cache: the
+# revoked-or-not verdict under the token's jti, for PRINCIPAL_CACHE_TTL
+# seconds, and the user under its id, like any lookup by ID. A warm request
+# therefore authorizes without a query. Revoking a token, or changing or
+# deleting the user, evicts the entry on commit (in every worker, with a
+# shared cache), so a demoted admin loses admin rights on the next request
+# instead of when the token expires. Within a request, flask_jwt_extended
+# keeps the loaded user as ``current_user``.
+
+from datetime import datetime
+from flask import current_app
+from app.services.container import get_services
+
+
+def token_revoked(jwt_header, jwt_payload):
+    """token_in_blocklist_loader: whether the token's jti is on the blocklist"""
+    return get_services().facade.is_token_revoked(
+        jwt_payload["jti"], ttl=current_app.config.get("PRINCIPAL_CACHE_TTL"))
+
+
+def load_user(jwt_header, jwt_payload):
+    """user_lookup_loader: the token's user, or None once it is deleted"""
+    return get_services().facade.get_user(jwt_payload[current_app.config["JWT_IDENTITY_CLAIM"]])
+
+
+def revoke(jwt_payload):
+    """Put the token with these claims on the blocklist until it expires"""
+    expires = jwt_payload.get("exp")
+    get_services().facade.revoke_token(
+        jwt_payload["jti"],
+        jwt_payload[current_app.config["JWT_IDENTITY_CLAIM"]],
+        datetime.utcfromtimestamp(expires) if expires is not None else None,
+    )
+
+
+def init_principals(jwt):
+    """Register the loaders with a JWTManager"""
+    jwt.token_in_blocklist_loader(token_revoked)
+    jwt.user_lookup_loader(load_user)
@@ -1,10 +1,10 @@
-# UserRepository for user-specific queries
-from app.models.user import User
-from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
-
-class UserRepository(SQLAlchemyRepository):
-    def __init__(self):
-        super().__init__(User)
-
-    def get_user_by_email(self, email):
-        return self.model.query.filter_by(email=email).first()
+# UserRepository for user-specific queries
+from app.models.user import User
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+
+class UserRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(User)
+
+    def get_user_by_email(self, email):
+        return self.model.query.filter_by(email=email).first()
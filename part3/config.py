@@ -1,23 +1,83 @@
-import os
-
-class Config:
-    SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-key")
-
-    # JWT: we can reuse SECRET_KEY, but declare it clearly
-    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", SECRET_KEY)
-
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-
-
-class DevelopmentConfig(Config):
-    DEBUG = True
-    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///development.db")
-
-
-class TestingConfig(Config):
-    TESTING = True
-    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
-
-
-class ProductionConfig(Config):
-    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///production.db")
+import os
+
+class Config:
+    SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-key")
+
+    # JWT: we can reuse SECRET_KEY, but declare it clearly
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", SECRET_KEY)
+
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Seconds clients may reuse a GET response before revalidating its ETag
+    HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+    # Read-through cache for lookups by ID; a size or TTL of 0 disables it
+    ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "1024"))
+    ENTITY_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", "60"))
+
+    # Unix socket of a shared `flask hbnb cache-server`; required when running
+    # several worker processes, otherwise each keeps its own cache
+    CACHE_SOCKET_PATH = os.getenv("CACHE_SOCKET_PATH")
+
+    # Comma-separated URIs of read-only copies of the database; GET requests
+    # read from them (see app/persistence/replicas.py)
+    SQLALCHEMY_READ_REPLICAS = [
+        uri for uri in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if uri
+    ]
+    # Seconds a replica may trail the primary's last write before reads skip
+    # it, and how often that lag is measured
+    REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "5"))
+    REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "1"))
+
+    # bcrypt cost (log2 rounds). Safe to change: each user's hash is redone
+    # at the new cost on their next login
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    # Processes that hash and check passwords (0 runs them on the request
+    # thread), and how many jobs may run or wait before requests get 429
+    BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "0"))
+    BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", str(4 * BCRYPT_WORKERS or 4)))
+
+    # Seconds a token's revoked-or-valid verdict stays cached; revoking it
+    # evicts the entry at once, this only bounds a missed invalidation
+    PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///development.db")
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    # Cheapest cost bcrypt allows, hashed inline: tests need no worker processes
+    BCRYPT_LOG_ROUNDS = 4
+    BCRYPT_WORKERS = 0
+
+
+class ProductionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///production.db")
+
+    # One password worker per CPU, so logins spread over every core
+    BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 1)))
+    BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", str(4 * BCRYPT_WORKERS)))
+
+    # Run on every new SQLite connection, in this order. WAL lets reads go on
+    # while a write commits; NORMAL sync is safe in WAL (a power cut may lose
+    # the last commits, never corrupt the file). Negative cache_size is KiB.
+    SQLITE_PRAGMAS = {
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_KIB", "65536")),
+        "temp_store": "MEMORY",
+    }
+
+    # Enough pooled connections for every server thread to read at once;
+    # writers still take turns on SQLite's single write lock
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
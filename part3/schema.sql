@@ -25,12 +25,19 @@ CREATE TABLE places (
 	latitude FLOAT, 
 	longitude FLOAT, 
 	owner_id VARCHAR(36), 
+	review_count INTEGER DEFAULT '0' NOT NULL, 
+	rating_sum INTEGER DEFAULT '0' NOT NULL, 
+	rating_sort_key FLOAT GENERATED ALWAYS AS (CASE WHEN review_count > 0 THEN CAST(rating_sum AS FLOAT) / review_count ELSE 0 END), 
 	id VARCHAR(36) NOT NULL, 
 	created_at DATETIME, 
 	updated_at DATETIME, 
 	PRIMARY KEY (id), 
 	FOREIGN KEY(owner_id) REFERENCES users (id)
 );
+CREATE INDEX ix_places_owner_id ON places (owner_id);
+CREATE INDEX ix_places_lat_lon ON places (latitude, longitude);
+CREATE INDEX ix_places_price_id ON places (price, id);
+CREATE INDEX ix_places_rating_sort_key_id ON places (rating_sort_key, id);
 CREATE TABLE place_amenity (
 	place_id VARCHAR(36) NOT NULL, 
 	amenity_id VARCHAR(36) NOT NULL, 
@@ -38,6 +45,7 @@ CREATE TABLE place_amenity (
 	FOREIGN KEY(place_id) REFERENCES places (id), 
 	FOREIGN KEY(amenity_id) REFERENCES amenities (id)
 );
+CREATE INDEX ix_place_amenity_amenity_id_place_id ON place_amenity (amenity_id, place_id);
 CREATE TABLE reviews (
 	text TEXT NOT NULL, 
 	rating INTEGER NOT NULL, 
@@ -47,6 +55,25 @@ CREATE TABLE reviews (
 	created_at DATETIME, 
 	updated_at DATETIME, 
 	PRIMARY KEY (id), 
+	CONSTRAINT unique_user_place_review UNIQUE (user_id, place_id), 
 	FOREIGN KEY(user_id) REFERENCES users (id), 
 	FOREIGN KEY(place_id) REFERENCES places (id)
 );
+CREATE INDEX ix_reviews_place_id_created_at ON reviews (place_id, created_at);
+CREATE TABLE revoked_tokens (
+	user_id VARCHAR(36) NOT NULL, 
+	expires_at DATETIME, 
+	id VARCHAR(36) NOT NULL, 
+	created_at DATETIME, 
+	updated_at DATETIME, 
+	PRIMARY KEY (id)
+);
+CREATE INDEX ix_revoked_tokens_expires_at ON revoked_tokens (expires_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5(title, description, content='places', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS places_fts_ai AFTER INSERT ON places BEGIN INSERT INTO places_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description); END;
+CREATE TRIGGER IF NOT EXISTS places_fts_ad AFTER DELETE ON places BEGIN INSERT INTO places_fts(places_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description); END;
+CREATE TRIGGER IF NOT EXISTS places_fts_au AFTER UPDATE OF title, description ON places BEGIN INSERT INTO places_fts(places_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description); INSERT INTO places_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description); END;
+CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(text, content='reviews', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN INSERT INTO reviews_fts(rowid, text) VALUES (new.rowid, new.text); END;
+CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN INSERT INTO reviews_fts(reviews_fts, rowid, text) VALUES ('delete', old.rowid, old.text); END;
+CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE OF text ON reviews BEGIN INSERT INTO reviews_fts(reviews_fts, rowid, text) VALUES ('delete', old.rowid, old.text); INSERT INTO reviews_fts(rowid, text) VALUES (new.rowid, new.text); END;
@@ -29,3 +29,6 @@ INSERT INTO reviews (id, text, rating, user_id, place_id, created_at, updated_at
 ('c881770f-50df-4afd-a0f7-23666f0ce311', 'Great apartment! Very clean and well-located.', 4, '040cefc0-b72f-4f77-b669-90e7bd6f2266', '6407cf10-1b18-4a71-95af-084ea610293f', '2026-02-11 16:11:21.441424', '2026-02-11 16:11:21.441426'),
 ('ec8a8cac-05c1-4692-9ae9-78b7b1c5d086', 'its amazing ', 5, '040cefc0-b72f-4f77-b669-90e7bd6f2266', '743be1bf-f570-4c5d-a3b2-5421170e556a', '2026-02-11 16:18:16.780330', '2026-02-11 16:18:16.780336'),
 ('5c6fd911-3915-4d62-8fbc-2fd072d21519', 'LOVELY PLACE', 5, '040cefc0-b72f-4f77-b669-90e7bd6f2266', 'd36f154a-304d-4cbb-a494-665bf5f5d31b', '2026-02-14 19:37:20.043659', '2026-02-14 19:37:20.043664');
+UPDATE places SET
+review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id),
+rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.place_id = places.id);
@@ -1,9 +1,9 @@
-"""
-Tests package for HBnB Part 3
-
-Contains unit tests for:
-- User endpoints and model
-- Place endpoints and model
-- Review endpoints and model
-- Amenity endpoints and model
-"""
+"""
+Tests package for HBnB Part 3
+
+Contains unit tests for:
+- User endpoints and model
+- Place endpoints and model
+- Review endpoints and model
+- Amenity endpoints and model
+"""
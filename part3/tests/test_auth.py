@@ -0,0 +1,145 @@
+"""Tests for JWT principal resolution and revocation"""
+import unittest
+from unittest import mock
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token, decode_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+
+
+class TestPrincipals(unittest.TestCase):
+    """Test cases for the blocklist and user lookup behind @jwt_required"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        self.facade = self.app.extensions["hbnb"].facade
+        with self.app.app_context():
+            db.create_all()
+            admin = User(first_name="Ad", last_name="Min", email="principal-admin@test.com",
+                         password="x", is_admin=True)
+            db.session.add(admin)
+            db.session.commit()
+            self.admin_id = admin.id
+            self.headers = self._headers()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _headers(self):
+        with self.app.app_context():
+            token = create_access_token(identity=self.admin_id,
+                                        additional_claims={"is_admin": True})
+        return {"Authorization": "Bearer " + token}
+
+    def _create_amenity(self, headers=None):
+        # Admins get past the role check to the missing-name error
+        return self.client.post("/api/v1/amenities/", json={},
+                                headers=headers or self.headers).status_code
+
+    def _selects(self, action):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            action()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        return statements
+
+    def test_warm_requests_authorize_without_queries(self):
+        """Test the blocklist check and user lookup are served from the cache"""
+        self.assertTrue(self._selects(lambda: self.assertEqual(self._create_amenity(), 400)))
+        self.assertEqual(self._selects(lambda: self.assertEqual(self._create_amenity(), 400)), [])
+
+    def test_logout_revokes_only_that_token(self):
+        """Test a logged-out token is refused while the user's other tokens work"""
+        other = self._headers()
+        self.assertEqual(self._create_amenity(), 400)
+        response = self.client.post("/api/v1/auth/logout", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._create_amenity(), 401)
+        self.assertEqual(self.client.post("/api/v1/auth/logout",
+                                          headers=self.headers).status_code, 401)
+        self.assertEqual(self._create_amenity(other), 400)
+        with self.app.app_context():
+            token = RevokedToken.query.one()
+            self.assertEqual(token.user_id, self.admin_id)
+            self.assertGreater(token.expires_at, datetime.utcnow())
+
+    def test_racing_logouts_both_succeed(self):
+        """Test a logout whose token was revoked meanwhile still answers 200"""
+        self.assertEqual(self._create_amenity(), 400)
+        token = self.headers["Authorization"].split()[1]
+        with self.app.app_context():
+            jti = decode_token(token)["jti"]
+            # The other logout's row, committed after this request's blocklist check
+            db.session.execute(RevokedToken.__table__.insert().values(
+                id=jti, user_id=self.admin_id, created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()))
+            db.session.commit()
+        response = self.client.post("/api/v1/auth/logout", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            self.assertEqual(RevokedToken.query.filter_by(id=jti).count(), 1)
+            self.facade.revoke_token(jti, self.admin_id, None)
+            self.assertEqual(RevokedToken.query.count(), 1)
+            self.assertTrue(self.facade.is_token_revoked(jti))
+        self.assertEqual(self._create_amenity(), 401)
+
+    def test_racing_logouts_without_on_conflict(self):
+        """Test the SAVEPOINT fallback also takes a second revocation of a jti"""
+        from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+        with mock.patch.object(SQLAlchemyRepository, "_conflict_insert", return_value=None):
+            self.test_racing_logouts_both_succeed()
+
+    def test_verdict_is_cached_apart_from_the_row(self):
+        """Test a cached verdict is not mistaken for the row, nor the row for it"""
+        with self.app.app_context():
+            self.assertFalse(self.facade.is_token_revoked("kept-jti"))
+            self.assertIsNone(self.facade.token_repo.get("kept-jti"))
+            self.facade.revoke_token("kept-jti", self.admin_id, None)
+            self.assertTrue(self.facade.is_token_revoked("kept-jti"))
+            db.session.expunge_all()
+            self.assertEqual(self.facade.token_repo.get("kept-jti").user_id, self.admin_id)
+            self.assertTrue(self.facade.is_token_revoked("kept-jti"))
+
+    def test_demoted_admin_loses_rights_at_once(self):
+        """Test role checks follow the user row, not the token's is_admin claim"""
+        self.assertEqual(self._create_amenity(), 400)
+        with self.app.app_context():
+            self.facade.admin_update_user(self.admin_id, {"is_admin": False})
+        self.assertEqual(self._create_amenity(), 403)
+
+    def test_deleted_user_is_refused(self):
+        """Test a token outliving its user no longer authenticates"""
+        self.assertEqual(self._create_amenity(), 400)
+        with self.app.app_context():
+            self.facade.user_repo.delete(self.admin_id)
+        self.assertEqual(self._create_amenity(), 401)
+
+    def test_purge_drops_expired_entries(self):
+        """Test purging keeps the entries of tokens that have not expired"""
+        with self.app.app_context():
+            now = datetime.utcnow()
+            self.facade.revoke_token("expired-jti", self.admin_id, now - timedelta(minutes=1))
+            self.facade.revoke_token("live-jti", self.admin_id, now + timedelta(minutes=1))
+            self.assertEqual(self.facade.purge_revoked_tokens(), 1)
+            self.assertFalse(self.facade.is_token_revoked("expired-jti"))
+            self.assertTrue(self.facade.is_token_revoked("live-jti"))
+
+
+if __name__ == "__main__":
+    unittest.main()
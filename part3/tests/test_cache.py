@@ -0,0 +1,257 @@
+"""Tests for the read-through entity cache"""
+import os
+import tempfile
+import threading
+import unittest
+from sqlalchemy import event
+from app import create_app, db
+from app.persistence import versions
+from app.persistence.cache import EntityCache, entity_cache
+from app.persistence.cache_server import CacheServer, CacheServerError, SocketCacheBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEntityCache(unittest.TestCase):
+    """LRU, TTL and invalidation behaviour of EntityCache"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = EntityCache(maxsize=2, ttl=10, clock=self.clock)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the oldest untouched entry goes first when full"""
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual((self.cache.get("a"), self.cache.get("c")), (1, 3))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        """Test entries older than ttl are misses"""
+        self.cache.set("a", 1)
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "evictions": 0, "size": 0})
+
+    def test_load_racing_invalidation_is_not_stored(self):
+        """Test a value loaded across an invalidation is returned but not cached"""
+        def load():
+            self.cache.invalidate("a")
+            return "old"
+        self.assertEqual(self.cache.get_or_load("a", load), "old")
+        self.assertEqual(self.cache.get_or_load("a", lambda: "new"), "new")
+        self.assertEqual(self.cache.get_or_load("a", lambda: "unused"), "new")
+
+    def test_disabled_cache_always_loads(self):
+        """Test a zero size turns caching off"""
+        self.cache.configure(maxsize=0)
+        self.cache.get_or_load("a", lambda: 1)
+        self.assertEqual(self.cache.get_or_load("a", lambda: 2), 2)
+
+
+class TestRepositoryCache(unittest.TestCase):
+    """Repository lookups through the shared entity cache"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        from app.services.facade import HBnBFacade
+        self.facade = HBnBFacade()
+        owner = self.facade.create_user({"first_name": "Owner", "last_name": "One",
+                                         "email": "owner@test.com", "password": "pw123456"})
+        self.guest_id = self.facade.create_user({"first_name": "Guest", "last_name": "Two",
+                                                 "email": "guest@test.com",
+                                                 "password": "pw123456"}).id
+        self.place_id = self.facade.create_place({
+            "title": "Loft", "description": "", "price": 10.0,
+            "latitude": 1.0, "longitude": 1.0, "owner_id": owner.id}).id
+        entity_cache.clear()
+        db.session.remove()
+
+    def tearDown(self):
+        db.session.rollback()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _fresh_get(self, place_id):
+        """Fetch in a new session, counting SELECTs"""
+        db.session.remove()
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", count)
+        try:
+            place = self.facade.get_place(place_id)
+            title = place.title if place else None
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count)
+        return title, len(statements)
+
+    def test_hit_skips_the_database(self):
+        """Test the second lookup is served from the cache"""
+        before = entity_cache.stats()
+        self.assertEqual(self._fresh_get(self.place_id), ("Loft", 1))
+        self.assertEqual(self._fresh_get(self.place_id), ("Loft", 0))
+        after = entity_cache.stats()
+        self.assertEqual((after["hits"] - before["hits"], after["misses"] - before["misses"]),
+                         (1, 1))
+
+    def test_cached_instance_is_writable(self):
+        """Test updates through a cached instance persist and invalidate"""
+        self._fresh_get(self.place_id)
+        self.facade.update_place(self.place_id, {"title": "Attic"})
+        self.assertEqual(self._fresh_get(self.place_id), ("Attic", 1))
+
+    def test_pending_changes_survive_a_cached_get(self):
+        """Test a cache hit does not overwrite changes the session holds"""
+        self._fresh_get(self.place_id)
+        place = self.facade.get_place(self.place_id)
+        place.title = "Attic"
+        self.assertIs(self.facade.get_place(self.place_id), place)
+        db.session.commit()
+        self.assertEqual(self._fresh_get(self.place_id)[0], "Attic")
+
+    def test_aggregate_increment_invalidates(self):
+        """Test review writes refresh the cached place counters"""
+        self._fresh_get(self.place_id)
+        self.facade.create_review({"user_id": self.guest_id, "place_id": self.place_id,
+                                   "text": "Nice", "rating": 4})
+        db.session.remove()
+        self.assertEqual(self.facade.get_place(self.place_id).review_count, 1)
+
+    def test_reads_inside_a_transaction_see_its_writes(self):
+        """Test lookups in an open unit of work bypass the pre-transaction row"""
+        self._fresh_get(self.place_id)
+        db.session.remove()
+        with self.facade.transaction():
+            self.facade.create_review({"user_id": self.guest_id, "place_id": self.place_id,
+                                       "text": "Nice", "rating": 4})
+            self.assertEqual(self.facade.get_place(self.place_id).review_count, 1)
+            self.facade.update_place(self.place_id, {"title": "Attic"})
+            db.session.expunge_all()
+            self.assertEqual(self.facade.get_place(self.place_id).title, "Attic")
+        self.assertEqual(self._fresh_get(self.place_id), ("Attic", 1))
+
+    def test_delete_invalidates(self):
+        """Test a deleted row is not served from the cache"""
+        self._fresh_get(self.place_id)
+        self.facade.delete_place(self.place_id)
+        self.assertEqual(self._fresh_get(self.place_id), (None, 1))
+
+
+class TestSharedCache(unittest.TestCase):
+    """Workers sharing a CacheServer over a Unix socket"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start a cache server in a background thread"""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmpdir.name, "cache.sock")
+        cls.server = CacheServer(cls.path)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.app = create_app("config.TestingConfig")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmpdir.cleanup()
+        entity_cache.configure(maxsize=1024)
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        entity_cache.configure(backend=SocketCacheBackend(self.path))
+        # A second process would hold its own EntityCache on the same server
+        self.other_worker = EntityCache(ttl=60, backend=SocketCacheBackend(self.path))
+
+    def tearDown(self):
+        db.session.rollback()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_socket_backend_round_trip(self):
+        """Test values, generations and counters go through the server"""
+        backend = SocketCacheBackend(self.path)
+        value, generation = backend.get("k")
+        self.assertIsNone(value)
+        self.assertTrue(backend.set("k", {"a": 1}, 60, generation))
+        self.assertEqual(self.other_worker.get("k"), {"a": 1})
+        self.other_worker.invalidate("k")
+        self.assertFalse(backend.set("k", {"a": 2}, 60, generation))
+        self.assertIsNone(backend.get("k")[0])
+
+    def test_facade_writes_reach_other_workers(self):
+        """Test a write in one worker evicts the row and bumps versions for all"""
+        from app.services.facade import HBnBFacade
+        facade = HBnBFacade()
+        owner_id = facade.create_user({"first_name": "Owner", "last_name": "One",
+                                       "email": "owner@test.com", "password": "pw123456"}).id
+        place_id = facade.create_place({"title": "Loft", "description": "", "price": 10.0,
+                                        "latitude": 1.0, "longitude": 1.0,
+                                        "owner_id": owner_id}).id
+        facade.get_place(place_id)
+        key = ("places", place_id)
+        self.assertEqual(self.other_worker.get(key)["title"], "Loft")
+        before = self.other_worker.backend.counters("places")
+
+        facade.update_place(place_id, {"title": "Attic"})
+        self.assertIsNone(self.other_worker.get(key))
+        self.assertNotEqual(self.other_worker.backend.counters("places"), before)
+        self.assertEqual(versions.current("places"), self.other_worker.backend.counters("places"))
+
+    def test_socket_is_owner_only(self):
+        """Test the socket file is created readable by its owner alone"""
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_server_errors_read_through(self):
+        """Test a call the server fails on is a connection error, read as a miss"""
+        backend = SocketCacheBackend(self.path)
+        with self.assertRaises(CacheServerError) as raised:
+            backend.get(["unhashable"])
+        self.assertIsInstance(raised.exception, OSError)
+        cache = EntityCache(ttl=60, backend=backend)
+        self.assertEqual(cache.get_or_load(["unhashable"], lambda: "from db"), "from db")
+        self.assertEqual(backend.get("k")[0], None)
+
+    def test_unreachable_server_reads_through(self):
+        """Test a dead socket degrades to database reads"""
+        cache = EntityCache(ttl=60, backend=SocketCacheBackend(self.path + ".missing"))
+        self.assertEqual(cache.get_or_load("k", lambda: "from db"), "from db")
+        cache.invalidate("k")
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0})
+
+    def test_server_keeps_a_file_that_is_not_a_socket(self):
+        """Test the server refuses to replace a regular file at its path"""
+        path = os.path.join(self.tmpdir.name, "not-a-socket")
+        with open(path, "w") as f:
+            f.write("keep me")
+        with self.assertRaises(FileExistsError):
+            CacheServer(path)
+        with open(path) as f:
+            self.assertEqual(f.read(), "keep me")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Tests for the flask hbnb CLI commands"""
+import json
+import os
+import tempfile
+import unittest
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+
+class TestExportImport(unittest.TestCase):
+    """NDJSON round trips through `flask hbnb export` and `flask hbnb import`"""
+
+    def setUp(self):
+        self.source = create_app("config.TestingConfig")
+        self.target = create_app("config.TestingConfig")
+        for app in (self.source, self.target):
+            with app.app_context():
+                db.create_all()
+        with self.source.app_context():
+            owner = User(first_name="Owner", last_name="One", email="owner@test.com")
+            guest = User(first_name="Guest", last_name="Two", email="guest@test.com")
+            owner.hash_password("pw123456")
+            guest.hash_password("pw123456")
+            wifi = Amenity(name="WiFi")
+            place = Place(title="Loft", description="Bright", price=80.0, latitude=1.0,
+                          longitude=2.0, owner=owner, amenities=[wifi],
+                          review_count=1, rating_sum=4)
+            review = Review(text="Lovely", rating=4, user=guest, place=place)
+            db.session.add_all([owner, guest, wifi, place, review])
+            db.session.commit()
+            self.place_id = place.id
+
+    def tearDown(self):
+        for app in (self.source, self.target):
+            with app.app_context():
+                db.drop_all()
+
+    def _import(self, lines, *args):
+        return self.target.test_cli_runner().invoke(
+            args=["hbnb", "import", *args], input="\n".join(lines) + "\n")
+
+    def test_round_trip(self):
+        """Test every table survives export then import, in small chunks"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.ndjson")
+            exported = self.source.test_cli_runner().invoke(
+                args=["hbnb", "export", path, "--chunk-size", "1"])
+            with open(path) as export_file:
+                lines = export_file.read().splitlines()
+        self.assertEqual(exported.exit_code, 0, exported.output)
+        self.assertEqual([json.loads(line)["type"] for line in lines],
+                         ["user", "user", "amenity", "place", "place_amenity", "review"])
+        self.assertIn("user: 2", exported.output)
+
+        result = self._import(lines, "--chunk-size", "1")
+        self.assertEqual(result.exit_code, 0, result.output)
+        with self.target.app_context():
+            place = db.session.get(Place, self.place_id)
+            self.assertEqual([a.name for a in place.amenities], ["WiFi"])
+            self.assertEqual((place.review_count, place.avg_rating), (1, 4.0))
+            self.assertEqual(place.reviews[0].user.email, "guest@test.com")
+            self.assertTrue(place.owner.verify_password("pw123456"))
+            self.assertIsNotNone(place.created_at)
+
+        # Importing the same rows again is refused, not duplicated
+        result = self._import(lines)
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("earlier chunks were kept", result.output)
+
+    def test_part2_records(self):
+        """Test part 2 exports load: plain passwords hashed, extra fields dropped"""
+        result = self._import([
+            json.dumps({"type": "user", "id": "u1", "first_name": "A", "last_name": "B",
+                        "email": "a@test.com", "password": "secret1", "is_admin": False,
+                        "created_at": "2024-01-02T03:04:05"}),
+            json.dumps({"type": "user", "id": "u2", "first_name": "C", "last_name": "D",
+                        "email": "c@test.com", "password": "$2cool4u"}),
+            json.dumps({"type": "amenity", "id": "a1", "name": "Pool",
+                        "description": "Heated"}),
+            json.dumps({"type": "place", "id": "p1", "title": "Hut", "description": "",
+                        "price": 10.0, "latitude": 0.0, "longitude": 0.0,
+                        "owner_id": "u1", "review_count": 7, "rating_sum": 30}),
+            json.dumps({"type": "place_amenity", "place_id": "p1", "amenity_id": "a1"}),
+        ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("1 place", result.output)
+        with self.target.app_context():
+            user = db.session.get(User, "u1")
+            self.assertTrue(user.verify_password("secret1"))
+            self.assertEqual(user.created_at.year, 2024)
+            # Looks like a hash prefix, but is a password
+            self.assertTrue(db.session.get(User, "u2").verify_password("$2cool4u"))
+            place = db.session.get(Place, "p1")
+            self.assertEqual(place.review_count, 0)
+            self.assertEqual([a.id for a in place.amenities], ["a1"])
+
+    def test_unknown_record_type(self):
+        """Test an unknown record type stops the import"""
+        result = self._import([json.dumps({"type": "booking", "id": "b1"})])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("booking", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Tests for the production database profile"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from sqlalchemy import text
+from app import create_app, db
+from config import ProductionConfig
+
+
+class TestProductionSQLite(unittest.TestCase):
+    """Test cases for the SQLite pragmas and pool of ProductionConfig"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.directory = tempfile.mkdtemp()
+
+        class Config(ProductionConfig):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(cls.directory, "prod.db")
+
+        cls.app = create_app(Config)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(cls.directory)
+
+    def test_pragmas_on_every_connection(self):
+        """Test each pooled connection runs in WAL mode with the tuned settings"""
+        with self.app.app_context():
+            connections = [db.engine.connect() for _ in range(2)]
+            try:
+                for connection in connections:
+                    pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                    self.assertEqual(pragma("journal_mode"), "wal")
+                    self.assertEqual(pragma("synchronous"), 1)
+                    self.assertEqual(pragma("busy_timeout"), 5000)
+                    self.assertEqual(pragma("temp_store"), 2)
+                    self.assertEqual(pragma("cache_size"), -65536)
+                    self.assertEqual(pragma("mmap_size"), 256 * 1024 * 1024)
+            finally:
+                for connection in connections:
+                    connection.close()
+
+    def test_pool_size(self):
+        """Test the engine pool follows SQLALCHEMY_ENGINE_OPTIONS"""
+        with self.app.app_context():
+            self.assertEqual(db.engine.pool.size(), 10)
+
+    def test_reads_continue_during_a_write(self):
+        """Test a reader sees the last commit while a write is still open"""
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql("CREATE TABLE IF NOT EXISTS counter (n INTEGER)")
+                connection.exec_driver_sql("DELETE FROM counter")
+                connection.exec_driver_sql("INSERT INTO counter VALUES (1)")
+            writer = db.engine.connect()
+            # Without WAL an exclusive lock keeps every reader out until commit
+            writer.exec_driver_sql("BEGIN EXCLUSIVE")
+            writer.exec_driver_sql("UPDATE counter SET n = 2")
+            seen = []
+
+            def read():
+                with self.app.app_context(), db.engine.connect() as reader:
+                    seen.append(reader.execute(text("SELECT n FROM counter")).scalar())
+
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(timeout=2)
+            writer.commit()
+            writer.close()
+            self.assertEqual(seen, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""Tests for the application service container"""
+import unittest
+from app import create_app
+from app.persistence.cache import entity_cache
+
+
+class TestServiceContainer(unittest.TestCase):
+    """One object graph per app, shared by every namespace"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+
+    def test_namespaces_share_one_facade(self):
+        """Test every namespace resolves to the container's facade"""
+        from app.api.v1 import amenities, auth, places, reviews, users
+        services = self.app.extensions["hbnb"]
+        with self.app.app_context():
+            for module in (amenities, auth, places, reviews, users):
+                self.assertIs(module.facade._get_current_object(), services.facade)
+
+    def test_repositories_share_the_cache(self):
+        """Test repositories are registered once, on the shared cache"""
+        services = self.app.extensions["hbnb"]
+        self.assertIs(services.facade.place_repo, services.place_repo)
+        for repo in (services.user_repo, services.place_repo,
+                     services.review_repo, services.amenity_repo):
+            self.assertIs(repo.cache, entity_cache)
+        self.assertIn("hits", services.stats()["entity_cache"])
+
+    def test_each_app_gets_its_own_container(self):
+        """Test a second app does not reuse the first one's services"""
+        other = create_app("config.TestingConfig")
+        self.assertIsNot(other.extensions["hbnb"], self.app.extensions["hbnb"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""Tests that hot queries are served by indexes"""
+import unittest
+from sqlalchemy import create_engine, event, inspect
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.migrations import upgrade_columns, upgrade_indexes
+
+
+class TestQueryPlans(unittest.TestCase):
+    """EXPLAIN QUERY PLAN every SELECT the facade issues for a lookup path"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.ctx = cls.app.app_context()
+        cls.ctx.push()
+        db.create_all()
+        cls.facade = cls.app.extensions["hbnb"].facade
+        user = User(first_name="Plan", last_name="User", email="plan@example.com",
+                    password="secret")
+        amenity = Amenity(name="Plan Pool")
+        db.session.add_all([user, amenity])
+        db.session.flush()
+        place = Place(title="Plan Villa", price=100.0, latitude=1.0, longitude=1.0,
+                      owner_id=user.id, amenities=[amenity])
+        db.session.add(place)
+        db.session.flush()
+        db.session.add(Review(text="Fine", rating=4, user_id=user.id, place_id=place.id))
+        db.session.commit()
+        cls.user_id, cls.amenity_id, cls.place_id = user.id, amenity.id, place.id
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        cls.ctx.pop()
+
+    def _plans(self, action):
+        """Run action and return the query plan lines of each SELECT it sent"""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        db.session.expire_all()
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            action()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        self.assertTrue(statements)
+        with db.engine.connect() as connection:
+            return [
+                [row[3] for row in connection.exec_driver_sql(
+                    "EXPLAIN QUERY PLAN " + statement, parameters)]
+                for statement, parameters in statements
+            ]
+
+    def assertIndexed(self, action):
+        """Every table a query reads must be searched through an index"""
+        for plan in self._plans(action):
+            for line in plan:
+                if line.startswith("SCAN") or "TEMP B-TREE" in line:
+                    self.fail(f"Query plan does not use an index: {plan}")
+
+    def test_places_by_owner(self):
+        """Test places of an owner use the owner_id index"""
+        self.assertIndexed(lambda: self.facade.get_places_by_owner(self.user_id))
+
+    def test_reviews_by_place(self):
+        """Test reviews of a place use the (place_id, created_at) index"""
+        self.assertIndexed(lambda: self.facade.get_reviews_by_place(self.place_id))
+        self.assertIndexed(lambda: list(db.session.get(Place, self.place_id).reviews))
+
+    def test_reviews_by_user(self):
+        """Test a user's reviews and the duplicate-review check are indexed"""
+        self.assertIndexed(lambda: list(db.session.get(User, self.user_id).reviews))
+        self.assertIndexed(
+            lambda: self.facade.get_review_by_user_and_place(self.user_id, self.place_id))
+
+    def test_places_with_amenity(self):
+        """Test the amenity filter walks the (amenity_id, place_id) index"""
+        self.assertIndexed(lambda: self.facade.search_places(amenity=self.amenity_id, limit=10))
+        self.assertIndexed(lambda: list(db.session.get(Amenity, self.amenity_id).places))
+        self.assertIndexed(lambda: list(db.session.get(Place, self.place_id).amenities))
+
+    def test_price_range_pages(self):
+        """Test price filters and price-ordered pages need no sort step"""
+        self.assertIndexed(lambda: self.facade.search_places(
+            min_price=50, max_price=150, sort="price", limit=10, after=self.place_id))
+        self.assertIndexed(lambda: self.facade.search_places(
+            min_price=50, sort="-price", limit=10))
+
+    def test_rating_pages(self):
+        """Test rating-ordered pages walk the rating index and seek into it"""
+        for sort in ("rating", "-rating"):
+            self.assertEqual(
+                self._plans(lambda: self.facade.search_places(sort=sort, limit=10)),
+                [["SCAN places USING INDEX ix_places_rating_sort_key_id"]])
+            self.assertIndexed(lambda: self.facade.search_places(
+                sort=sort, limit=10, after=self.place_id))
+
+    def test_text_filter_reads_fts_index(self):
+        """Test q finds places through places_fts instead of scanning places"""
+        for plan in self._plans(lambda: self.facade.search_places(q="vil", limit=10)):
+            self.assertIn("SEARCH places USING INTEGER PRIMARY KEY (rowid=?)", plan)
+            self.assertTrue(any(line.startswith("SCAN places_fts VIRTUAL TABLE INDEX 0:M")
+                                for line in plan), plan)
+        self.assertEqual(self.facade.search_places(q="vil", limit=10)[0].id, self.place_id)
+
+    def test_lookups_by_key(self):
+        """Test id pages, email and amenity name lookups are indexed"""
+        self.assertIndexed(lambda: self.facade.get_all_places(limit=10, after=self.place_id))
+        self.assertIndexed(lambda: self.facade.get_user_by_email("plan@example.com"))
+        self.assertIndexed(lambda: self.facade.get_amenity_by_name("Plan Pool"))
+
+
+class TestUpgradeIndexes(unittest.TestCase):
+    """Test cases for adding indexes to an existing database"""
+
+    def test_upgrade_adds_indexes(self):
+        """Test missing indexes are created and reruns are no-ops"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            db.metadata.create_all(connection)
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.drop(connection)
+
+            created = upgrade_indexes(connection, db.metadata)
+            self.assertIn("ix_place_amenity_amenity_id_place_id", created)
+            self.assertIn("ix_reviews_place_id_created_at", created)
+            names = {index["name"] for index in inspect(connection).get_indexes("places")}
+            self.assertEqual(names, {"ix_places_lat_lon", "ix_places_owner_id",
+                                     "ix_places_price_id", "ix_places_rating_sort_key_id"})
+            self.assertEqual(upgrade_indexes(connection, db.metadata), [])
+
+    def test_upgrade_adds_missing_columns(self):
+        """Test a places table from before the rating sort key gets the column"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            db.metadata.create_all(connection)
+            connection.exec_driver_sql("DROP INDEX ix_places_rating_sort_key_id")
+            connection.exec_driver_sql("ALTER TABLE places DROP COLUMN rating_sort_key")
+
+            self.assertEqual(upgrade_columns(connection, db.metadata),
+                             ["places.rating_sort_key"])
+            self.assertEqual(upgrade_columns(connection, db.metadata), [])
+            self.assertEqual(upgrade_indexes(connection, db.metadata),
+                             ["ix_places_rating_sort_key_id"])
+
+    def test_upgrade_adds_rating_aggregates(self):
+        """Test a places table from before the review aggregates gets them, zeroed"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            db.metadata.create_all(connection)
+            connection.exec_driver_sql("DROP INDEX ix_places_rating_sort_key_id")
+            for column in ("rating_sort_key", "review_count", "rating_sum"):
+                connection.exec_driver_sql(f"ALTER TABLE places DROP COLUMN {column}")
+            connection.exec_driver_sql(
+                "INSERT INTO places (id, title, price, latitude, longitude) "
+                "VALUES ('p1', 'Hut', 10, 0, 0)")
+
+            self.assertEqual(upgrade_columns(connection, db.metadata),
+                             ["places.review_count", "places.rating_sum",
+                              "places.rating_sort_key"])
+            self.assertEqual(connection.exec_driver_sql(
+                "SELECT review_count, rating_sum FROM places").all(), [(0, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
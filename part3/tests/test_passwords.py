@@ -0,0 +1,125 @@
+"""Tests for password hashing in worker processes"""
+import threading
+import time
+import unittest
+from flask_bcrypt import Bcrypt
+from app import create_app, db
+from app.models.user import User
+from app.services.passwords import PasswordHasher, PasswordHasherBusy, hash_cost, is_hash
+
+
+class GatedBcrypt(Bcrypt):
+    """Bcrypt whose checks wait until the test opens the gate"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+
+    def check_password_hash(self, pw_hash, password):
+        self.entered.set()
+        self.gate.wait(5)
+        return super().check_password_hash(pw_hash, password)
+
+
+class TestPasswordHasher(unittest.TestCase):
+    """Test cases for the bounded hashing pool"""
+
+    def test_pool_hashes_and_checks(self):
+        """Test hashes made by a worker process check out at the configured cost"""
+        hasher = PasswordHasher(Bcrypt(), rounds=5, workers=1)
+        try:
+            pw_hash = hasher.hash("secret")
+            self.assertEqual(hash_cost(pw_hash), 5)
+            self.assertTrue(is_hash(pw_hash))
+            self.assertFalse(is_hash("$2cool$05$" + pw_hash[7:]))
+            self.assertFalse(is_hash(pw_hash[:-1]))
+            self.assertTrue(hasher.check(pw_hash, "secret"))
+            self.assertFalse(hasher.check(pw_hash, "wrong"))
+            self.assertFalse(hasher.needs_rehash(pw_hash))
+            self.assertTrue(PasswordHasher(Bcrypt(), rounds=6).needs_rehash(pw_hash))
+        finally:
+            hasher.shutdown()
+
+    def test_full_queue_is_refused_at_once(self):
+        """Test a job beyond max_pending raises instead of waiting"""
+        bcrypt = GatedBcrypt()
+        hasher = PasswordHasher(bcrypt, rounds=4, workers=0, max_pending=1)
+        pw_hash = Bcrypt().generate_password_hash("secret", 4).decode("utf-8")
+        waiting = threading.Thread(target=hasher.check, args=(pw_hash, "secret"))
+        waiting.start()
+        self.assertTrue(bcrypt.entered.wait(5))
+        start = time.perf_counter()
+        with self.assertRaises(PasswordHasherBusy):
+            hasher.check(pw_hash, "secret")
+        self.assertLess(time.perf_counter() - start, 0.1)
+        bcrypt.gate.set()
+        waiting.join()
+        self.assertTrue(hasher.check(pw_hash, "secret"))
+
+
+class TestLogin(unittest.TestCase):
+    """Test cases for POST /api/v1/auth/login"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.app = create_app("config.TestingConfig")
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            # Hashed at an older cost than the app's BCRYPT_LOG_ROUNDS of 4
+            user = User(first_name="Log", last_name="In", email="login@test.com",
+                        password=Bcrypt().generate_password_hash("secret", 5).decode("utf-8"))
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _login(self, password="secret"):
+        return self.client.post("/api/v1/auth/login",
+                                json={"email": "login@test.com", "password": password})
+
+    def _stored_hash(self):
+        with self.app.app_context():
+            return db.session.get(User, self.user_id).password
+
+    def test_login_rehashes_at_the_current_cost(self):
+        """Test a successful login re-hashes an old-cost password, a failed one does not"""
+        self.assertEqual(self._login("wrong").status_code, 401)
+        self.assertEqual(hash_cost(self._stored_hash()), 5)
+
+        response = self._login()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.json)
+        self.assertEqual(hash_cost(self._stored_hash()), 4)
+        self.assertEqual(self._login().status_code, 200)
+
+    def test_overloaded_login_returns_429(self):
+        """Test logins beyond the pending limit are turned away with Retry-After"""
+        bcrypt = GatedBcrypt()
+        PasswordHasher(bcrypt, rounds=5, workers=0, max_pending=1).init_app(self.app)
+        statuses = []
+        waiting = threading.Thread(
+            target=lambda: statuses.append(self.app.test_client().post(
+                "/api/v1/auth/login",
+                json={"email": "login@test.com", "password": "secret"}).status_code))
+        waiting.start()
+        self.assertTrue(bcrypt.entered.wait(5))
+
+        response = self._login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "1")
+        self.assertIn("error", response.json)
+
+        bcrypt.gate.set()
+        waiting.join()
+        self.assertEqual(statuses, [200])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,93 +1,580 @@
-"""Tests for Place API endpoints"""
-import unittest
-from app import create_app, db
-from app.models.place import Place
-from app.models.user import User
-
-
-class TestPlaceEndpoints(unittest.TestCase):
-    """Test cases for Place API"""
-    
-    @classmethod
-    def setUpClass(cls):
-        """Set up test fixtures"""
-        cls.app = create_app("config.TestingConfig")
-        cls.client = cls.app.test_client()
-        
-        with cls.app.app_context():
-            db.create_all()
-    
-    @classmethod
-    def tearDownClass(cls):
-        """Clean up after tests"""
-        with cls.app.app_context():
-            db.drop_all()
-    
-    def test_get_places_returns_200(self):
-        """Test GET /api/v1/places/ returns 200"""
-        response = self.client.get('/api/v1/places/')
-        self.assertEqual(response.status_code, 200)
-        self.assertIsInstance(response.json, list)
-    
-    def test_get_nonexistent_place_returns_404(self):
-        """Test GET /api/v1/places/<id> returns 404 for invalid ID"""
-        response = self.client.get('/api/v1/places/nonexistent-id')
-        self.assertEqual(response.status_code, 404)
-    
-    def test_create_place_requires_auth(self):
-        """Test POST /api/v1/places/ requires authentication"""
-        response = self.client.post('/api/v1/places/',
-            json={
-                "title": "Test Place",
-                "description": "A test place",
-                "price": 100.00,
-                "latitude": 25.0,
-                "longitude": 45.0
-            },
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 401)
-    
-    def test_update_place_requires_auth(self):
-        """Test PUT /api/v1/places/<id> requires authentication"""
-        response = self.client.put('/api/v1/places/some-id',
-            json={"title": "Updated Title"},
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 401)
-    
-    def test_delete_place_requires_auth(self):
-        """Test DELETE /api/v1/places/<id> requires authentication"""
-        response = self.client.delete('/api/v1/places/some-id')
-        self.assertEqual(response.status_code, 401)
-
-
-class TestPlaceModel(unittest.TestCase):
-    """Test cases for Place model"""
-    
-    @classmethod
-    def setUpClass(cls):
-        """Set up test fixtures"""
-        cls.app = create_app("config.TestingConfig")
-    
-    def test_place_creation(self):
-        """Test Place model can be instantiated"""
-        with self.app.app_context():
-            place = Place(
-                title="Beach House",
-                description="Beautiful beach house",
-                price=150.00,
-                latitude=25.5,
-                longitude=45.5,
-                owner_id="test-owner-id"
-            )
-            self.assertEqual(place.title, "Beach House")
-            self.assertEqual(place.price, 150.00)
-            db.session.add(place)
-            db.session.flush()
-            self.assertIsNotNone(place.id)
-            db.session.rollback()
-
-
-if __name__ == '__main__':
-    unittest.main()
+"""Tests for Place API endpoints"""
+import unittest
+from unittest import mock
+from sqlalchemy import event
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+
+class PlaceListMixin:
+    """Read the titles of a place listing, for tests with a ``client``"""
+
+    def _titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [p['title'] for p in response.json]
+
+
+class TestPlaceEndpoints(unittest.TestCase):
+    """Test cases for Place API"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        
+        with cls.app.app_context():
+            db.create_all()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+    
+    def test_get_places_returns_200(self):
+        """Test GET /api/v1/places/ returns 200"""
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json, list)
+    
+    def test_get_nonexistent_place_returns_404(self):
+        """Test GET /api/v1/places/<id> returns 404 for invalid ID"""
+        response = self.client.get('/api/v1/places/nonexistent-id')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_create_place_requires_auth(self):
+        """Test POST /api/v1/places/ requires authentication"""
+        response = self.client.post('/api/v1/places/',
+            json={
+                "title": "Test Place",
+                "description": "A test place",
+                "price": 100.00,
+                "latitude": 25.0,
+                "longitude": 45.0
+            },
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+    
+    def test_update_place_requires_auth(self):
+        """Test PUT /api/v1/places/<id> requires authentication"""
+        response = self.client.put('/api/v1/places/some-id',
+            json={"title": "Updated Title"},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+    
+    def test_delete_place_requires_auth(self):
+        """Test DELETE /api/v1/places/<id> requires authentication"""
+        response = self.client.delete('/api/v1/places/some-id')
+        self.assertEqual(response.status_code, 401)
+
+
+class TestPlaceModel(unittest.TestCase):
+    """Test cases for Place model"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+    
+    def test_place_creation(self):
+        """Test Place model can be instantiated"""
+        with self.app.app_context():
+            place = Place(
+                title="Beach House",
+                description="Beautiful beach house",
+                price=150.00,
+                latitude=25.5,
+                longitude=45.5,
+                owner_id="test-owner-id"
+            )
+            self.assertEqual(place.title, "Beach House")
+            self.assertEqual(place.price, 150.00)
+            db.session.add(place)
+            db.session.flush()
+            self.assertIsNotNone(place.id)
+            db.session.rollback()
+
+
+class TestPlaceQueryCount(unittest.TestCase):
+    """Place endpoints issue a bounded number of queries"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+
+    def setUp(self):
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _seed(self, n_places):
+        """Create n places, each with two amenities and two reviews"""
+        with self.app.app_context():
+            amenities = [Amenity(name=f"Amenity {i}") for i in range(2)]
+            guests = [User(first_name="Guest", last_name=str(i),
+                           email=f"guest{i}@test.com", password="x") for i in range(2)]
+            db.session.add_all(amenities + guests)
+            ids = []
+            for i in range(n_places):
+                owner = User(first_name="Owner", last_name=str(i),
+                             email=f"owner{i}@test.com", password="x")
+                place = Place(title=f"Place {i}", price=10.0, latitude=0.0,
+                              longitude=0.0, owner=owner, amenities=amenities)
+                place.reviews = [Review(text="Nice", rating=5, user=g) for g in guests]
+                db.session.add(place)
+                db.session.flush()
+                ids.append(place.id)
+            db.session.commit()
+            return ids
+
+    def _count_queries(self, url):
+        with self.app.app_context():
+            engine = db.engine
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(response.status_code, 200)
+        return len(statements)
+
+    def test_list_query_count_is_constant(self):
+        """Test GET /api/v1/places/ does not query once per owner"""
+        self._seed(2)
+        few = self._count_queries('/api/v1/places/')
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+        self._seed(8)
+        many = self._count_queries('/api/v1/places/')
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 2)
+
+    def test_detail_query_count_is_bounded(self):
+        """Test GET /api/v1/places/<id> loads owner, amenities and reviews in bulk"""
+        place_id = self._seed(1)[0]
+        self.assertLessEqual(self._count_queries(f'/api/v1/places/{place_id}'), 3)
+
+
+class TestPlaceSearch(PlaceListMixin, unittest.TestCase):
+    """Filtering and sorting on GET /api/v1/places/"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        with cls.app.app_context():
+            db.create_all()
+            owner = User(first_name="Owner", last_name="One",
+                         email="search-owner@test.com", password="x")
+            guest = User(first_name="Guest", last_name="Two",
+                         email="search-guest@test.com", password="x")
+            wifi = Amenity(name="Search WiFi")
+            places = [
+                Place(title="Beach Hut", description="Tiny 100% cosy", price=80.0,
+                      latitude=0.0, longitude=0.0, owner=owner, amenities=[wifi]),
+                Place(title="Beach Villa", description="Large", price=300.0,
+                      latitude=0.0, longitude=0.0, owner=owner),
+                Place(title="Loft", description="Near the beach", price=120.0,
+                      latitude=0.0, longitude=0.0, owner=owner, amenities=[wifi],
+                      review_count=1, rating_sum=5),
+            ]
+            db.session.add_all(places + [guest])
+            db.session.commit()
+            cls.wifi_id = wifi.id
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+
+    def test_price_range_and_sort(self):
+        """Test min/max price with descending price order"""
+        self.assertEqual(self._titles('/api/v1/places/?max_price=200&sort=-price'),
+                         ['Loft', 'Beach Hut'])
+        self.assertEqual(self._titles('/api/v1/places/?min_price=100&sort=price'),
+                         ['Loft', 'Beach Villa'])
+
+    def test_text_and_amenity_filters(self):
+        """Test q matches title or description and amenity filters by ID"""
+        self.assertEqual(sorted(self._titles('/api/v1/places/?q=BEACH')),
+                         ['Beach Hut', 'Beach Villa', 'Loft'])
+        self.assertEqual(self._titles('/api/v1/places/?q=100%25'), ['Beach Hut'])
+        self.assertEqual(sorted(self._titles('/api/v1/places/?q=bea&max_price=200')),
+                         ['Beach Hut', 'Loft'])
+        self.assertEqual(self._titles('/api/v1/places/?q=%25%25'), [])
+        self.assertEqual(self._titles(f'/api/v1/places/?amenity={self.wifi_id}&sort=price'),
+                         ['Beach Hut', 'Loft'])
+
+    def test_sorted_pages_follow_cursor(self):
+        """Test the next link continues the sorted order"""
+        response = self.client.get('/api/v1/places/?sort=-rating&limit=1')
+        titles = [p['title'] for p in response.json]
+        while 'Link' in response.headers:
+            response = self.client.get(response.headers['Link'].split('>')[0].lstrip('<'))
+            titles.extend(p['title'] for p in response.json)
+        self.assertEqual(titles[0], 'Loft')
+        self.assertEqual(sorted(titles), ['Beach Hut', 'Beach Villa', 'Loft'])
+
+    def test_invalid_parameters_return_400(self):
+        """Test malformed filters are rejected"""
+        self.assertEqual(self.client.get('/api/v1/places/?min_price=cheap').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/?sort=title').status_code, 400)
+
+
+class TestPlaceLocation(PlaceListMixin, unittest.TestCase):
+    """Radius and bounding-box searches"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        with cls.app.app_context():
+            db.create_all()
+            owner = User(first_name="Owner", last_name="One",
+                         email="geo-owner@test.com", password="x")
+            for title, lat, lon in [("Louvre", 48.8606, 2.3376),
+                                    ("Versailles", 48.8049, 2.1204),
+                                    ("London", 51.5074, -0.1278),
+                                    ("Fiji", -17.7134, 178.065),
+                                    ("Samoa", -13.759, -172.1046)]:
+                db.session.add(Place(title=title, price=10.0, latitude=lat,
+                                     longitude=lon, owner=owner))
+            db.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+
+    def test_nearby_orders_by_distance(self):
+        """Test GET /api/v1/places/nearby returns places inside the radius, nearest first"""
+        url = '/api/v1/places/nearby?lat=48.8566&lon=2.3522&radius_km={}'
+        self.assertEqual(self._titles(url.format(5)), ['Louvre'])
+        self.assertEqual(self._titles(url.format(30)), ['Louvre', 'Versailles'])
+        response = self.client.get(url.format(30) + '&limit=1')
+        self.assertLess(response.json[0]['distance_km'], 2)
+        next_url = response.headers['Link'].split('>')[0].lstrip('<')
+        self.assertEqual(self._titles(next_url), ['Versailles'])
+
+    def test_bbox(self):
+        """Test GET /api/v1/places/bbox, including across the antimeridian"""
+        self.assertEqual(self._titles('/api/v1/places/bbox?min_lat=50&min_lon=-1&max_lat=52&max_lon=1'),
+                         ['London'])
+        self.assertEqual(
+            sorted(self._titles('/api/v1/places/bbox?min_lat=-20&min_lon=170&max_lat=-10&max_lon=-170')),
+            ['Fiji', 'Samoa'])
+
+    def test_invalid_coordinates_return_400(self):
+        """Test out-of-range or missing coordinates are rejected"""
+        self.assertEqual(self.client.get('/api/v1/places/nearby?lat=91&lon=0&radius_km=1').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/nearby?lat=1&lon=1').status_code, 400)
+
+
+class TestPlaceFullTextSearch(PlaceListMixin, unittest.TestCase):
+    """Ranked full-text search on GET /api/v1/places/search"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        with cls.app.app_context():
+            db.create_all()
+            owner = User(first_name="Owner", last_name="One",
+                         email="fts-owner@test.com", password="x")
+            for title, description in [("Loft", "Bright loft, ten minutes from the beach"),
+                                       ("Beach Hut", "Sand, sea and beach"),
+                                       ("Cabin", "Quiet mountain cabin")]:
+                db.session.add(Place(title=title, description=description, price=10.0,
+                                     latitude=0.0, longitude=0.0, owner=owner))
+            db.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+
+    def test_results_are_ranked(self):
+        """Test every word must match and denser matches come first"""
+        self.assertEqual(self._titles('/api/v1/places/search?q=beach'), ['Beach Hut', 'Loft'])
+        self.assertEqual(self._titles('/api/v1/places/search?q=bright+BEACH'), ['Loft'])
+        self.assertEqual(self._titles('/api/v1/places/search?q=beach+igloo'), [])
+        self.assertEqual(self._titles('/api/v1/places/search?q="OR"*'), [])
+
+    def test_pages_follow_rank(self):
+        """Test the next link continues in rank order"""
+        response = self.client.get('/api/v1/places/search?q=beach&limit=1')
+        self.assertEqual([p['title'] for p in response.json], ['Beach Hut'])
+        next_url = response.headers['Link'].split('>')[0].lstrip('<')
+        self.assertEqual(self._titles(next_url), ['Loft'])
+
+    def test_index_follows_writes(self):
+        """Test the FTS index tracks updates and deletes through triggers"""
+        with self.app.app_context():
+            cabin = Place.query.filter_by(title="Cabin").one()
+            cabin.description = "Cabin by the beach"
+            db.session.commit()
+            self.assertEqual(len(self._titles('/api/v1/places/search?q=beach')), 3)
+            self.assertEqual(self._titles('/api/v1/places/search?q=mountain'), [])
+            cabin.description = "Quiet mountain cabin"
+            db.session.commit()
+
+    def test_missing_query_returns_400(self):
+        """Test q is required"""
+        self.assertEqual(self.client.get('/api/v1/places/search').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/search?q=beach&after=nope').status_code, 400)
+
+
+class TestPlaceConditionalGet(unittest.TestCase):
+    """ETag revalidation on place reads"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        with cls.app.app_context():
+            db.create_all()
+            owner = User(first_name="Owner", last_name="One",
+                         email="etag-owner@test.com", password="x")
+            guest = User(first_name="Guest", last_name="Two",
+                         email="etag-guest@test.com", password="x")
+            place = Place(title="Loft", price=10.0, latitude=0.0, longitude=0.0, owner=owner)
+            db.session.add_all([place, guest])
+            db.session.commit()
+            cls.place_id, cls.guest_id = place.id, guest.id
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+
+    def _revalidate(self, url, etag):
+        return self.client.get(url, headers={'If-None-Match': etag}).status_code
+
+    def test_detail_follows_review_writes(self):
+        """Test a new review invalidates the place detail ETag"""
+        from app.services.facade import HBnBFacade
+        url = f'/api/v1/places/{self.place_id}'
+        etag = self.client.get(url).headers['ETag']
+        self.assertEqual(self._revalidate(url, etag), 304)
+        with self.app.app_context():
+            HBnBFacade().create_review({"user_id": self.guest_id, "place_id": self.place_id,
+                                        "text": "Nice", "rating": 4})
+        self.assertEqual(self._revalidate(url, etag), 200)
+
+    def test_etag_depends_on_query(self):
+        """Test different pages or filters never share an ETag"""
+        first = self.client.get('/api/v1/places/?limit=1').headers['ETag']
+        other = self.client.get('/api/v1/places/?limit=2').headers['ETag']
+        self.assertNotEqual(first, other)
+        self.assertEqual(self._revalidate('/api/v1/places/?limit=2', first), 200)
+
+    def test_errors_are_not_tagged(self):
+        """Test error responses carry no ETag"""
+        response = self.client.get('/api/v1/places/missing')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response.headers)
+
+
+class TestPlaceCreation(unittest.TestCase):
+    """POST /api/v1/places/ as one unit of work"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        from flask_jwt_extended import create_access_token
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        with cls.app.app_context():
+            db.create_all()
+            owner = User(first_name="Owner", last_name="One",
+                         email="create-owner@test.com", password="x")
+            wifi = Amenity(name="Create WiFi")
+            db.session.add_all([owner, wifi])
+            db.session.commit()
+            cls.wifi_id = wifi.id
+            cls.token = create_access_token(identity=owner.id,
+                                            additional_claims={"is_admin": False})
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+
+    def test_amenity_links_are_committed(self):
+        """Test amenities posted with a place are stored with it"""
+        response = self.client.post('/api/v1/places/', json={
+            "title": "Loft", "description": "", "price": 10.0,
+            "latitude": 0.0, "longitude": 0.0, "amenities": [self.wifi_id, "missing"]
+        }, headers={"Authorization": f"Bearer {self.token}"})
+        self.assertEqual(response.status_code, 201)
+        with self.app.app_context():
+            place = db.session.get(Place, response.json["id"])
+            self.assertEqual([a.id for a in place.amenities], [self.wifi_id])
+
+
+class TestPlaceBatch(unittest.TestCase):
+    """POST /api/v1/places:batch and the repository bulk writes behind it"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        from flask_jwt_extended import create_access_token
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        with cls.app.app_context():
+            db.create_all()
+            admin = User(first_name="Admin", last_name="One",
+                         email="batch-admin@test.com", password="x", is_admin=True)
+            guest = User(first_name="Guest", last_name="One",
+                         email="batch-guest@test.com", password="x")
+            wifi = Amenity(name="Batch WiFi")
+            pool = Amenity(name="Batch Pool")
+            db.session.add_all([admin, guest, wifi, pool])
+            db.session.commit()
+            cls.admin_id, cls.wifi_id, cls.pool_id = admin.id, wifi.id, pool.id
+            cls.admin = {"Authorization": "Bearer " + create_access_token(
+                identity=admin.id, additional_claims={"is_admin": True})}
+            cls.user = {"Authorization": "Bearer " + create_access_token(
+                identity=guest.id, additional_claims={"is_admin": False})}
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+
+    @staticmethod
+    def _place(title, **extra):
+        return dict({"title": title, "description": "", "price": 10.0,
+                     "latitude": 0.0, "longitude": 0.0}, **extra)
+
+    def test_requires_admin(self):
+        """Test non-admins cannot import"""
+        response = self.client.post('/api/v1/places:batch', json=[self._place("No")],
+                                    headers=self.user)
+        self.assertEqual(response.status_code, 403)
+
+    def test_json_array_in_chunks(self):
+        """Test a JSON array is written one commit per chunk, with amenity links"""
+        from app.services.container import get_services
+        places = [self._place(f"Batch {i}", amenities=[self.wifi_id]) for i in range(5)]
+        commits = []
+        with self.app.app_context():
+            listener = lambda conn: commits.append(1)
+            event.listen(db.engine, "commit", listener)
+            try:
+                count = get_services().facade.import_places(places, self.admin_id,
+                                                            chunk_size=2)
+            finally:
+                event.remove(db.engine, "commit", listener)
+            self.assertEqual((count, len(commits)), (5, 3))
+            place = Place.query.filter_by(title="Batch 4").one()
+            self.assertEqual(place.owner_id, self.admin_id)
+            self.assertEqual([a.id for a in place.amenities], [self.wifi_id])
+
+        response = self.client.post('/api/v1/places:batch', json=[self._place("Batch API")],
+                                    headers=self.admin)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["imported"], 1)
+
+    def test_ndjson_upsert(self):
+        """Test NDJSON upserts update existing places and replace their links"""
+        import json
+        body = "\n".join(json.dumps(self._place("Upsert", id="upsert-1", price=p,
+                                                  amenities=[a]))
+                          for p, a in ((20.0, self.wifi_id), (30.0, self.pool_id)))
+        response = self.client.post('/api/v1/places:batch?upsert=true', data=body,
+                                    content_type="application/x-ndjson", headers=self.admin)
+        self.assertEqual(response.status_code, 201)
+        with self.app.app_context():
+            place = db.session.get(Place, "upsert-1")
+            self.assertEqual(place.price, 30.0)
+            self.assertEqual([a.id for a in place.amenities], [self.pool_id])
+            self.assertIsNotNone(place.created_at)
+
+        # Without upsert a repeated id is an error
+        response = self.client.post('/api/v1/places:batch', data=body,
+                                    content_type="application/x-ndjson", headers=self.admin)
+        self.assertEqual(response.status_code, 400)
+
+    def test_upsert_without_on_conflict(self):
+        """Test upserts on a database without INSERT ... ON CONFLICT"""
+        from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+        with mock.patch.object(SQLAlchemyRepository, "_conflict_insert", return_value=None):
+            self.test_ndjson_upsert()
+            with self.app.app_context():
+                created_at = db.session.get(Place, "upsert-1").created_at
+            response = self.client.post(
+                '/api/v1/places:batch?upsert=true',
+                json=[self._place("Moved", id="upsert-1", price=40.0, amenities=[]),
+                      self._place("Fresh", id="upsert-2")],
+                headers=self.admin)
+        self.assertEqual(response.status_code, 201)
+        with self.app.app_context():
+            place = db.session.get(Place, "upsert-1")
+            self.assertEqual((place.title, place.price, place.amenities), ("Moved", 40.0, []))
+            self.assertEqual(place.created_at, created_at)
+            self.assertEqual(db.session.get(Place, "upsert-2").title, "Fresh")
+
+    def test_invalid_item_keeps_earlier_chunks(self):
+        """Test a bad item is reported with how many places were already stored"""
+        from app.services.container import get_services
+        places = [self._place("Kept"), self._place("Bad", price=-1)]
+        with self.app.app_context():
+            get_services().place_repo.BULK_CHUNK_SIZE = 1
+            try:
+                response = self.client.post('/api/v1/places:batch', json=places,
+                                            headers=self.admin)
+            finally:
+                del get_services().place_repo.BULK_CHUNK_SIZE
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json["imported"], 1)
+        self.assertIn("Place 1", response.json["error"])
+
+        response = self.client.post('/api/v1/places:batch',
+                                    json=[self._place("Ghost", amenities=["missing"])],
+                                    headers=self.admin)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json["imported"], 0)
+
+    def test_amenities_must_be_a_list(self):
+        """Test an amenities string is refused, not split into characters"""
+        response = self.client.post('/api/v1/places:batch',
+                                    json=[self._place("Fine", amenities=[self.wifi_id]),
+                                          self._place("Odd", amenities=self.wifi_id)],
+                                    headers=self.admin)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json["imported"], 0)
+        self.assertEqual(response.json["error"], "Place 1: amenities must be a list of IDs")
+
+
+if __name__ == '__main__':
+    unittest.main()
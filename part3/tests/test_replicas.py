@@ -0,0 +1,167 @@
+"""Tests for read-replica routing"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from sqlalchemy import create_engine
+from app import create_app, db
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.replicas import ReplicaRouter, heartbeat, replica_engines
+from config import TestingConfig
+
+
+class TestReplicaRouting(unittest.TestCase):
+    """Test cases for sending GET reads to a replica and writes to the primary"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.directory = tempfile.mkdtemp()
+        self.primary = os.path.join(self.directory, "primary.db")
+        self.replica = os.path.join(self.directory, "replica.db")
+
+        class Config(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + self.primary
+            SQLALCHEMY_READ_REPLICAS = ["sqlite:///" + self.replica]
+            REPLICA_CHECK_INTERVAL = 0
+            ENTITY_CACHE_SIZE = 0
+
+        self.app = create_app(Config)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = User(first_name="Rep", last_name="Lica", email="replica@example.com",
+                         password="secret")
+            db.session.add(owner)
+            db.session.flush()
+            place = Place(title="Primary title", price=50.0, latitude=1.0, longitude=1.0,
+                          owner_id=owner.id)
+            db.session.add(place)
+            db.session.commit()
+            self.place_id = place.id
+        self._replicate()
+        # Tell the copies apart: only the replica has the new title
+        self._sql(self.replica, "UPDATE places SET title = 'Replica title'")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.engine.dispose()
+        self.app.extensions["replicas"].dispose()
+        shutil.rmtree(self.directory)
+
+    def _replicate(self):
+        source, target = sqlite3.connect(self.primary), sqlite3.connect(self.replica)
+        source.backup(target)
+        source.close()
+        target.close()
+
+    @staticmethod
+    def _sql(path, statement, *parameters):
+        connection = sqlite3.connect(path)
+        with connection:
+            rows = connection.execute(statement, parameters).fetchall()
+        connection.close()
+        return rows
+
+    def _lag_replica(self, seconds):
+        (beat,), = self._sql(self.primary, "SELECT beat FROM replica_heartbeat")
+        self._sql(self.replica, "UPDATE replica_heartbeat SET beat = ?", beat - seconds)
+
+    def test_replica_connections_are_set_up_like_the_primary(self):
+        """Test replica connections run the primary's pragmas and SQL functions"""
+        self.app.config["SQLITE_PRAGMAS"] = {"cache_size": -1234}
+        engine = replica_engines(self.app)["replica_0"]
+        try:
+            with engine.connect() as connection:
+                self.assertEqual(
+                    connection.exec_driver_sql("PRAGMA cache_size").scalar(), -1234)
+                self.assertEqual(connection.exec_driver_sql(
+                    "SELECT haversine_km(1.0, 1.0, 1.0, 1.0)").scalar(), 0.0)
+        finally:
+            engine.dispose()
+
+    def test_get_requests_read_the_replica(self):
+        """Test listings and lookups are answered from the replica"""
+        response = self.client.get("/api/v1/places/")
+        self.assertEqual([p["title"] for p in response.json], ["Replica title"])
+        response = self.client.get(f"/api/v1/places/{self.place_id}")
+        self.assertEqual(response.json["title"], "Replica title")
+        self.assertIn("ETag", response.headers)
+
+    def test_writes_and_other_methods_use_the_primary(self):
+        """Test non-GET requests and sessions that have written read the primary"""
+        facade = self.app.extensions["hbnb"].facade
+        with self.app.test_request_context(method="PUT"):
+            self.assertEqual(facade.get_all_places()[0].title, "Primary title")
+        with self.app.test_request_context(method="GET"):
+            self.assertEqual(facade.get_all_places()[0].title, "Replica title")
+            db.session.expire_all()
+            facade.update_place(self.place_id, {"price": 60.0})
+            self.assertEqual(facade.get_all_places()[0].title, "Primary title")
+
+    def test_commits_stamp_the_heartbeat(self):
+        """Test a write moves the primary heartbeat, so the replica shows lag"""
+        router = self.app.extensions["replicas"]
+        with self.app.app_context():
+            self.assertEqual(router.check(), {"replica_0": 0.0})
+            before = self._sql(self.primary, "SELECT beat FROM replica_heartbeat")[0][0]
+            db.session.get(Place, self.place_id).price = 70.0
+            db.session.commit()
+            after = self._sql(self.primary, "SELECT beat FROM replica_heartbeat")[0][0]
+            self.assertGreater(after, before)
+            self.assertGreater(router.check()["replica_0"], 0.0)
+
+    def test_lagging_replica_is_skipped(self):
+        """Test a replica further behind than REPLICA_MAX_LAG is not read"""
+        self._lag_replica(60)
+        response = self.client.get("/api/v1/places/")
+        self.assertEqual([p["title"] for p in response.json], ["Primary title"])
+        self.assertEqual(self.app.extensions["replicas"].status(), {"replica_0": 60.0})
+
+        self._replicate()
+        self._sql(self.replica, "UPDATE places SET title = 'Replica title'")
+        response = self.client.get("/api/v1/places/")
+        self.assertEqual([p["title"] for p in response.json], ["Replica title"])
+        self.assertEqual(self.app.extensions["replicas"].status(), {"replica_0": 0.0})
+
+    def test_trailing_reads_get_no_etag(self):
+        """Test a body from a replica that is behind, but within limits, is not tagged"""
+        self._lag_replica(1)
+        response = self.client.get("/api/v1/places/")
+        self.assertEqual([p["title"] for p in response.json], ["Replica title"])
+        self.assertNotIn("ETag", response.headers)
+
+    def test_unreachable_replica_is_skipped(self):
+        """Test a replica that cannot be read falls back to the primary"""
+        self._sql(self.replica, "DROP TABLE replica_heartbeat")
+        response = self.client.get("/api/v1/places/")
+        self.assertEqual([p["title"] for p in response.json], ["Primary title"])
+        self.assertEqual(self.app.extensions["replicas"].status(), {"replica_0": None})
+
+
+class TestReplicaRouter(unittest.TestCase):
+    """Test cases for choosing among replicas"""
+
+    def test_fresh_replicas_take_turns(self):
+        """Test reads rotate over fresh replicas and checks wait for the interval"""
+        engines = {name: create_engine("sqlite://") for name in ("primary", "a", "b")}
+        for name, beat in (("primary", 100.0), ("a", 99.0), ("b", 100.0)):
+            with engines[name].begin() as connection:
+                heartbeat.create(connection)
+                connection.execute(heartbeat.insert().values(id=1, beat=beat))
+        now = [0.0]
+        router = ReplicaRouter(engines["primary"], {"a": engines["a"], "b": engines["b"]},
+                               max_lag=5.0, check_interval=10.0, clock=lambda: now[0])
+        self.assertEqual([router.pick()[0] for _ in range(4)], ["a", "b", "a", "b"])
+        self.assertEqual(router.status(), {"a": 1.0, "b": 0.0})
+
+        with engines["a"].begin() as connection:
+            connection.execute(heartbeat.update().values(beat=50.0))
+        self.assertEqual(router.pick()[0], "a")
+        now[0] = 10.0
+        self.assertEqual({router.pick()[0] for _ in range(3)}, {"b"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,101 +1,220 @@
-"""Tests for Review API endpoints"""
-import unittest
-from app import create_app, db
-from app.models.review import Review
-
-
-class TestReviewEndpoints(unittest.TestCase):
-    """Test cases for Review API"""
-    
-    @classmethod
-    def setUpClass(cls):
-        """Set up test fixtures"""
-        cls.app = create_app("config.TestingConfig")
-        cls.client = cls.app.test_client()
-        
-        with cls.app.app_context():
-            db.create_all()
-    
-    @classmethod
-    def tearDownClass(cls):
-        """Clean up after tests"""
-        with cls.app.app_context():
-            db.drop_all()
-    
-    def test_get_reviews_returns_200(self):
-        """Test GET /api/v1/reviews/ returns 200"""
-        response = self.client.get('/api/v1/reviews/')
-        self.assertEqual(response.status_code, 200)
-        self.assertIsInstance(response.json, list)
-    
-    def test_get_nonexistent_review_returns_404(self):
-        """Test GET /api/v1/reviews/<id> returns 404 for invalid ID"""
-        response = self.client.get('/api/v1/reviews/nonexistent-id')
-        self.assertEqual(response.status_code, 404)
-    
-    def test_create_review_requires_auth(self):
-        """Test POST /api/v1/reviews/ requires authentication"""
-        response = self.client.post('/api/v1/reviews/',
-            json={
-                "place_id": "test-place-id",
-                "text": "Great place!",
-                "rating": 5
-            },
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 401)
-    
-    def test_update_review_requires_auth(self):
-        """Test PUT /api/v1/reviews/<id> requires authentication"""
-        response = self.client.put('/api/v1/reviews/some-id',
-            json={"text": "Updated review", "rating": 4},
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 401)
-    
-    def test_delete_review_requires_auth(self):
-        """Test DELETE /api/v1/reviews/<id> requires authentication"""
-        response = self.client.delete('/api/v1/reviews/some-id')
-        self.assertEqual(response.status_code, 401)
-
-
-class TestReviewModel(unittest.TestCase):
-    """Test cases for Review model"""
-    
-    @classmethod
-    def setUpClass(cls):
-        """Set up test fixtures"""
-        cls.app = create_app("config.TestingConfig")
-    
-    def test_review_creation(self):
-        """Test Review model can be instantiated"""
-        with self.app.app_context():
-            review = Review(
-                text="Amazing experience!",
-                rating=5,
-                user_id="test-user-id",
-                place_id="test-place-id"
-            )
-            self.assertEqual(review.text, "Amazing experience!")
-            self.assertEqual(review.rating, 5)
-            db.session.add(review)
-            db.session.flush()
-            self.assertIsNotNone(review.id)
-            db.session.rollback()
-    
-    def test_review_rating_range(self):
-        """Test review rating should be between 1-5"""
-        with self.app.app_context():
-            # Valid ratings
-            for rating in [1, 2, 3, 4, 5]:
-                review = Review(
-                    text="Test",
-                    rating=rating,
-                    user_id="user-id",
-                    place_id="place-id"
-                )
-                self.assertEqual(review.rating, rating)
-
-
-if __name__ == '__main__':
-    unittest.main()
+"""Tests for Review API endpoints"""
+import unittest
+from app import create_app, db
+from app.models.review import Review
+
+
+class TestReviewEndpoints(unittest.TestCase):
+    """Test cases for Review API"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        
+        with cls.app.app_context():
+            db.create_all()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+    
+    def test_get_reviews_returns_200(self):
+        """Test GET /api/v1/reviews/ returns 200"""
+        response = self.client.get('/api/v1/reviews/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json, list)
+    
+    def test_get_nonexistent_review_returns_404(self):
+        """Test GET /api/v1/reviews/<id> returns 404 for invalid ID"""
+        response = self.client.get('/api/v1/reviews/nonexistent-id')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_create_review_requires_auth(self):
+        """Test POST /api/v1/reviews/ requires authentication"""
+        response = self.client.post('/api/v1/reviews/',
+            json={
+                "place_id": "test-place-id",
+                "text": "Great place!",
+                "rating": 5
+            },
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+    
+    def test_update_review_requires_auth(self):
+        """Test PUT /api/v1/reviews/<id> requires authentication"""
+        response = self.client.put('/api/v1/reviews/some-id',
+            json={"text": "Updated review", "rating": 4},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+    
+    def test_delete_review_requires_auth(self):
+        """Test DELETE /api/v1/reviews/<id> requires authentication"""
+        response = self.client.delete('/api/v1/reviews/some-id')
+        self.assertEqual(response.status_code, 401)
+
+
+class TestReviewModel(unittest.TestCase):
+    """Test cases for Review model"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+    
+    def test_review_creation(self):
+        """Test Review model can be instantiated"""
+        with self.app.app_context():
+            review = Review(
+                text="Amazing experience!",
+                rating=5,
+                user_id="test-user-id",
+                place_id="test-place-id"
+            )
+            self.assertEqual(review.text, "Amazing experience!")
+            self.assertEqual(review.rating, 5)
+            db.session.add(review)
+            db.session.flush()
+            self.assertIsNotNone(review.id)
+            db.session.rollback()
+    
+    def test_review_rating_range(self):
+        """Test review rating should be between 1-5"""
+        with self.app.app_context():
+            # Valid ratings
+            for rating in [1, 2, 3, 4, 5]:
+                review = Review(
+                    text="Test",
+                    rating=rating,
+                    user_id="user-id",
+                    place_id="place-id"
+                )
+                self.assertEqual(review.rating, rating)
+
+
+class TestReviewFacade(unittest.TestCase):
+    """Test cases for review queries through the facade"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.rollback()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_get_reviews_by_place_only_returns_that_place(self):
+        """Test reviews are filtered by place in SQL"""
+        from app.services.facade import HBnBFacade
+        facade = HBnBFacade()
+        owner = facade.create_user({"first_name": "Owner", "last_name": "One",
+                                    "email": "owner@test.com", "password": "pw123456"})
+        guest = facade.create_user({"first_name": "Guest", "last_name": "Two",
+                                    "email": "guest@test.com", "password": "pw123456"})
+        place_data = {"title": "Place", "description": "", "price": 10.0,
+                      "latitude": 1.0, "longitude": 1.0, "owner_id": owner.id}
+        first = facade.create_place(place_data)
+        second = facade.create_place(dict(place_data, title="Other"))
+        review = facade.create_review({"user_id": guest.id, "place_id": first.id,
+                                       "text": "Nice", "rating": 5})
+        facade.create_review({"user_id": guest.id, "place_id": second.id,
+                              "text": "Fine", "rating": 3})
+
+        self.assertEqual([r.id for r in facade.get_reviews_by_place(first.id)], [review.id])
+        self.assertEqual(len(facade.get_places_by_owner(owner.id)), 2)
+        self.assertEqual(facade.get_places_by_owner(guest.id), [])
+
+    def test_place_rating_aggregates(self):
+        """Test review_count/rating_sum follow review writes and backfill"""
+        from app.commands import backfill_place_ratings
+        from app.models.place import Place
+        from app.services.facade import HBnBFacade
+        facade = HBnBFacade()
+        owner = facade.create_user({"first_name": "Owner", "last_name": "One",
+                                    "email": "owner@test.com", "password": "pw123456"})
+        guests = [facade.create_user({"first_name": "Guest", "last_name": str(i),
+                                      "email": f"guest{i}@test.com", "password": "pw123456"})
+                  for i in range(2)]
+        place = facade.create_place({"title": "Place", "description": "", "price": 10.0,
+                                     "latitude": 1.0, "longitude": 1.0, "owner_id": owner.id})
+        self.assertIsNone(place.avg_rating)
+
+        first = facade.create_review({"user_id": guests[0].id, "place_id": place.id,
+                                      "text": "Nice", "rating": 5})
+        facade.create_review({"user_id": guests[1].id, "place_id": place.id,
+                              "text": "Meh", "rating": 2})
+        db.session.refresh(place)
+        self.assertEqual((place.review_count, place.avg_rating), (2, 3.5))
+
+        facade.update_review(first.id, {"rating": 4})
+        facade.delete_review(first.id)
+        db.session.refresh(place)
+        self.assertEqual((place.review_count, place.rating_sum), (1, 2))
+
+        place.review_count, place.rating_sum = 0, 0
+        db.session.commit()
+        backfill_place_ratings()
+        db.session.refresh(place)
+        self.assertEqual((place.review_count, place.rating_sum), (1, 2))
+        best = Place.query.order_by(Place.avg_rating.desc()).first()
+        self.assertEqual(best.id, place.id)
+
+    def test_deleting_a_deleted_review_leaves_aggregates_alone(self):
+        """Test a delete racing another one, through a stale read, does not decrement twice"""
+        from unittest import mock
+        from app.services.facade import HBnBFacade
+        facade = HBnBFacade()
+        owner = facade.create_user({"first_name": "Owner", "last_name": "One",
+                                    "email": "owner@test.com", "password": "pw123456"})
+        guest = facade.create_user({"first_name": "Guest", "last_name": "Two",
+                                    "email": "guest@test.com", "password": "pw123456"})
+        place = facade.create_place({"title": "Place", "description": "", "price": 10.0,
+                                     "latitude": 1.0, "longitude": 1.0, "owner_id": owner.id})
+        review = facade.create_review({"user_id": guest.id, "place_id": place.id,
+                                       "text": "Nice", "rating": 5})
+
+        facade.delete_review(review.id)
+        with mock.patch.object(facade, "get_review", return_value=review):
+            facade.delete_review(review.id)
+        db.session.refresh(place)
+        self.assertEqual((place.review_count, place.rating_sum), (0, 0))
+        self.assertIsNone(facade.get_review(review.id))
+
+
+    def test_search_review_text(self):
+        """Test review text search survives drop/create and rebuilds on demand"""
+        from app.persistence.sqlite import install_fts
+        from app.services.facade import HBnBFacade
+        facade = HBnBFacade()
+        owner = facade.create_user({"first_name": "Owner", "last_name": "One",
+                                    "email": "owner@test.com", "password": "pw123456"})
+        guest = facade.create_user({"first_name": "Guest", "last_name": "Two",
+                                    "email": "guest@test.com", "password": "pw123456"})
+        place = facade.create_place({"title": "Place", "description": "", "price": 10.0,
+                                     "latitude": 1.0, "longitude": 1.0, "owner_id": owner.id})
+        review = facade.create_review({"user_id": guest.id, "place_id": place.id,
+                                       "text": "Spotless room, quiet street", "rating": 5})
+
+        self.assertEqual(facade.search_review_text("quiet"), [review])
+        self.assertEqual(facade.search_review_text("!!"), [])
+        with db.engine.begin() as connection:
+            install_fts(connection, rebuild=True)
+        self.assertEqual(facade.search_review_text("spotless ROOM"), [review])
+        facade.delete_review(review.id)
+        self.assertEqual(facade.search_review_text("quiet"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,98 +1,177 @@
-"""Tests for User API endpoints"""
-import unittest
-from app import create_app, db
-from app.models.user import User
-
-
-class TestUserEndpoints(unittest.TestCase):
-    """Test cases for User API"""
-    
-    @classmethod
-    def setUpClass(cls):
-        """Set up test fixtures"""
-        cls.app = create_app("config.TestingConfig")
-        cls.client = cls.app.test_client()
-        
-        with cls.app.app_context():
-            db.create_all()
-    
-    @classmethod
-    def tearDownClass(cls):
-        """Clean up after tests"""
-        with cls.app.app_context():
-            db.drop_all()
-    
-    def test_get_users_returns_200(self):
-        """Test GET /api/v1/users/ returns 200"""
-        response = self.client.get('/api/v1/users/')
-        self.assertEqual(response.status_code, 200)
-        self.assertIsInstance(response.json, list)
-    
-    def test_get_nonexistent_user_returns_404(self):
-        """Test GET /api/v1/users/<id> returns 404 for invalid ID"""
-        response = self.client.get('/api/v1/users/nonexistent-id')
-        self.assertEqual(response.status_code, 404)
-    
-    def test_create_user_requires_auth(self):
-        """Test POST /api/v1/users/ requires authentication"""
-        response = self.client.post('/api/v1/users/', 
-            json={
-                "first_name": "Test",
-                "last_name": "User",
-                "email": "test@example.com",
-                "password": "password123"
-            },
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 401)
-    
-    def test_update_user_requires_auth(self):
-        """Test PUT /api/v1/users/<id> requires authentication"""
-        response = self.client.put('/api/v1/users/some-id',
-            json={"first_name": "Updated"},
-            content_type='application/json'
-        )
-        self.assertEqual(response.status_code, 401)
-
-
-class TestUserModel(unittest.TestCase):
-    """Test cases for User model"""
-    
-    @classmethod
-    def setUpClass(cls):
-        """Set up test fixtures"""
-        cls.app = create_app("config.TestingConfig")
-    
-    def test_password_hashing(self):
-        """Test password is properly hashed"""
-        with self.app.app_context():
-            user = User(
-                first_name="Test",
-                last_name="User",
-                email="hash@test.com"
-            )
-            user.hash_password("mypassword123")
-            
-            # Password should be hashed, not plain text
-            self.assertNotEqual(user.password, "mypassword123")
-            self.assertTrue(user.password.startswith("$2b$"))
-    
-    def test_password_verification(self):
-        """Test password verification works correctly"""
-        with self.app.app_context():
-            user = User(
-                first_name="Test",
-                last_name="User",
-                email="verify@test.com"
-            )
-            user.hash_password("correctpassword")
-            
-            # Correct password should verify
-            self.assertTrue(user.verify_password("correctpassword"))
-            
-            # Wrong password should not verify
-            self.assertFalse(user.verify_password("wrongpassword"))
-
-
-if __name__ == '__main__':
-    unittest.main()
+"""Tests for User API endpoints"""
+import unittest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+
+
+class TestUserEndpoints(unittest.TestCase):
+    """Test cases for User API"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+        cls.client = cls.app.test_client()
+        
+        with cls.app.app_context():
+            db.create_all()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with cls.app.app_context():
+            db.drop_all()
+    
+    def test_get_users_returns_200(self):
+        """Test GET /api/v1/users/ returns 200"""
+        response = self.client.get('/api/v1/users/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json, list)
+    
+    def test_get_users_paginated(self):
+        """Test GET /api/v1/users/ pages with limit and the next link"""
+        with self.app.app_context():
+            for i in range(3):
+                db.session.add(User(first_name="Page", last_name=str(i),
+                                    email=f"page{i}@test.com", password="x"))
+            db.session.commit()
+
+        response = self.client.get('/api/v1/users/?limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 2)
+        self.assertIn('rel="next"', response.headers['Link'])
+
+        seen = [u['id'] for u in response.json]
+        while 'Link' in response.headers:
+            next_url = response.headers['Link'].split('>')[0].lstrip('<')
+            response = self.client.get(next_url)
+            seen.extend(u['id'] for u in response.json)
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertGreaterEqual(len(seen), 3)
+
+    def test_get_users_invalid_limit_returns_400(self):
+        """Test GET /api/v1/users/ rejects a bad limit"""
+        response = self.client.get('/api/v1/users/?limit=abc')
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_nonexistent_user_returns_404(self):
+        """Test GET /api/v1/users/<id> returns 404 for invalid ID"""
+        response = self.client.get('/api/v1/users/nonexistent-id')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_create_user_requires_auth(self):
+        """Test POST /api/v1/users/ requires authentication"""
+        response = self.client.post('/api/v1/users/', 
+            json={
+                "first_name": "Test",
+                "last_name": "User",
+                "email": "test@example.com",
+                "password": "password123"
+            },
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+    
+    def test_update_user_requires_auth(self):
+        """Test PUT /api/v1/users/<id> requires authentication"""
+        response = self.client.put('/api/v1/users/some-id',
+            json={"first_name": "Updated"},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class TestUserTransactions(unittest.TestCase):
+    """Unit-of-work behaviour of user writes"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+
+    def setUp(self):
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.facade = self.app.extensions["hbnb"].facade
+        self.commits = 0
+
+    def tearDown(self):
+        db.session.rollback()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count_commit(self, conn):
+        self.commits += 1
+
+    def test_admin_update_is_one_commit(self):
+        """Test a password and profile change are committed together"""
+        user = self.facade.create_user({"first_name": "Ann", "last_name": "Lee",
+                                        "email": "ann@test.com", "password": "pw123456"})
+        event.listen(db.engine, "commit", self._count_commit)
+        try:
+            self.facade.admin_update_user(user.id, {"password": "newpass99",
+                                                    "first_name": "Anne"})
+        finally:
+            event.remove(db.engine, "commit", self._count_commit)
+        self.assertEqual(self.commits, 1)
+        db.session.remove()
+        user = User.query.filter_by(email="ann@test.com").one()
+        self.assertEqual(user.first_name, "Anne")
+        self.assertTrue(user.verify_password("newpass99"))
+
+    def test_failed_unit_of_work_rolls_back(self):
+        """Test nothing in the block is kept when it raises"""
+        with self.assertRaises(RuntimeError):
+            with self.facade.transaction():
+                self.facade.create_user({"first_name": "Ann", "last_name": "Lee",
+                                         "email": "ann@test.com", "password": "pw123456"})
+                with self.facade.transaction():
+                    self.facade.create_amenity({"name": "Sauna"})
+                raise RuntimeError("abort")
+        self.assertIsNone(self.facade.get_user_by_email("ann@test.com"))
+        self.assertIsNone(self.facade.get_amenity_by_name("Sauna"))
+
+
+class TestUserModel(unittest.TestCase):
+    """Test cases for User model"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.app = create_app("config.TestingConfig")
+    
+    def test_password_hashing(self):
+        """Test password is properly hashed"""
+        with self.app.app_context():
+            user = User(
+                first_name="Test",
+                last_name="User",
+                email="hash@test.com"
+            )
+            user.hash_password("mypassword123")
+            
+            # Password should be hashed, not plain text
+            self.assertNotEqual(user.password, "mypassword123")
+            self.assertTrue(user.password.startswith("$2b$"))
+    
+    def test_password_verification(self):
+        """Test password verification works correctly"""
+        with self.app.app_context():
+            user = User(
+                first_name="Test",
+                last_name="User",
+                email="verify@test.com"
+            )
+            user.hash_password("correctpassword")
+            
+            # Correct password should verify
+            self.assertTrue(user.verify_password("correctpassword"))
+            
+            # Wrong password should not verify
+            self.assertFalse(user.verify_password("wrongpassword"))
+
+
+if __name__ == '__main__':
+    unittest.main()
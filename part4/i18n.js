@@ -21,6 +21,7 @@ const translations = {
     "index.card.perNight": "/ night",
     "index.card.viewDetails": "View Details",
     "index.empty": "No places found matching your criteria.",
+    "index.loadMore": "Load more",
     "index.error.load": "Failed to load places.",
     "index.error.network": "Network error. Could not load places.",
 
@@ -120,6 +121,7 @@ const translations = {
     "index.card.perNight": "/ ليلة",
     "index.card.viewDetails": "عرض التفاصيل",
     "index.empty": "لم يتم العثور على أماكن تطابق معاييرك.",
+    "index.loadMore": "عرض المزيد",
     "index.error.load": "فشل تحميل الأماكن.",
     "index.error.network": "خطأ في الشبكة. تعذر تحميل الأماكن.",
 
@@ -213,80 +213,159 @@ async function handleLogin(event) {
 
 // Store places data globally so filtering can access it
 let allPlaces = [];
+let filterTimer = null;
+// URL of the next page of places (from the Link header), null on the last page
+let nextPlacesUrl = null;
+// Bumped by every new listing so responses to an older one are ignored
+let placesRequestId = 0;
 
 /**
- * Fetch all places from the API
+ * Extract the rel="next" URL from a Link header
+ * @param {string|null} header - Link header value
+ * @returns {string|null}
+ */
+function parseNextLink(header) {
+    if (!header) return null;
+    for (const part of header.split(',')) {
+        const match = part.match(/<([^>]+)>\s*;\s*rel="?next"?/);
+        if (match) return new URL(match[1], API_BASE_URL).href;
+    }
+    return null;
+}
+
+/**
+ * Fetch the first page of places from the API, letting the server apply any filters
+ * @param {string|null} token - JWT token (optional)
+ * @param {Object} [filters] - Optional query parameters (max_price, q)
+ */
+async function fetchPlaces(token, filters = {}) {
+    const query = new URLSearchParams(filters).toString();
+    const requestId = ++placesRequestId;
+    allPlaces = [];
+    nextPlacesUrl = null;
+    await fetchPlacesPage(token, `${API_BASE_URL}/places/${query ? '?' + query : ''}`, requestId);
+}
+
+/**
+ * Fetch one page of places and add it to the list
  * @param {string|null} token - JWT token (optional)
+ * @param {string} url - Page URL
+ * @param {number} requestId - Listing the page belongs to
  */
-async function fetchPlaces(token) {
+async function fetchPlacesPage(token, url, requestId) {
+    const append = allPlaces.length > 0;
     try {
         const headers = {};
         if (token) {
             headers['Authorization'] = `Bearer ${token}`;
         }
 
-        const response = await fetch(`${API_BASE_URL}/places/`, {
+        const response = await fetch(url, {
             method: 'GET',
             headers: headers
         });
+        if (requestId !== placesRequestId) return;
 
         if (response.ok) {
             const places = await response.json();
-            allPlaces = places;
-            displayPlaces(places);
-        } else {
+            if (requestId !== placesRequestId) return;
+            allPlaces = allPlaces.concat(places);
+            nextPlacesUrl = parseNextLink(response.headers.get('Link'));
+            displayPlaces(places, append);
+        } else if (!append) {
             document.getElementById('places-list').innerHTML =
                 '<p class="error-message">Failed to load places.</p>';
+        } else {
+            showToast('error', t('toast.error'), 'Failed to load more places.');
         }
     } catch (error) {
-        document.getElementById('places-list').innerHTML =
-            '<p class="error-message">Network error. Could not load places.</p>';
+        if (requestId !== placesRequestId) return;
+        if (!append) {
+            document.getElementById('places-list').innerHTML =
+                '<p class="error-message">Network error. Could not load places.</p>';
+        } else {
+            showToast('error', t('toast.error'), 'Network error. Could not load more places.');
+        }
     }
+    updateLoadMore();
+}
+
+/**
+ * Fetch the next page of the current listing
+ */
+async function loadMorePlaces() {
+    if (!nextPlacesUrl) return;
+    const btn = document.getElementById('load-more-btn');
+    if (btn) btn.disabled = true;
+    const url = nextPlacesUrl;
+    nextPlacesUrl = null;
+    await fetchPlacesPage(getToken(), url, placesRequestId);
+}
+
+/**
+ * Show the "load more" button while the listing has further pages
+ */
+function updateLoadMore() {
+    const btn = document.getElementById('load-more-btn');
+    if (!btn) return;
+    btn.disabled = false;
+    btn.style.display = nextPlacesUrl ? 'inline-block' : 'none';
 }
 
 /**
  * Display places as cards in the places-list section
  * @param {Array} places - Array of place objects
+ * @param {boolean} [append] - Add the cards after those already shown
  */
-function displayPlaces(places) {
+function displayPlaces(places, append = false) {
     const placesList = document.getElementById('places-list');
     if (!placesList) return;
 
-    placesList.innerHTML = '';
+    if (!append) {
+        placesList.innerHTML = '';
 
-    if (places.length === 0) {
-        placesList.innerHTML = '<div class="empty-state"><p>' + t('index.empty') + '</p></div>';
-        return;
+        if (places.length === 0) {
+            placesList.innerHTML = '<div class="empty-state"><p>' + t('index.empty') + '</p></div>';
+            return;
+        }
     }
 
-    places.forEach((place, index) => {
-        const card = document.createElement('div');
-        card.className = 'place-card';
-        card.dataset.price = place.price;
-        card.style.animationDelay = `${index * 0.08}s`;
+    places.forEach((place, index) => placesList.appendChild(createPlaceCard(place, index)));
+}
 
-        const desc = place.description
-            ? (place.description.length > 120 ? escapeHTML(place.description.slice(0, 120)) + '…' : escapeHTML(place.description))
-            : 'No description available.';
+/**
+ * Build the card for one place
+ * @param {Object} place - Place object
+ * @param {number} index - Position among the cards being added, for the entrance delay
+ * @returns {HTMLElement}
+ */
+function createPlaceCard(place, index) {
+    const card = document.createElement('div');
+    card.className = 'place-card';
+    card.dataset.price = place.price;
+    card.style.animationDelay = `${index * 0.08}s`;
 
-        const priceStr = (typeof convertPrice === 'function')
-            ? convertPrice(place.price)
-            : '$' + Number(place.price).toFixed(2);
+    const desc = place.description
+        ? (place.description.length > 120 ? escapeHTML(place.description.slice(0, 120)) + '…' : escapeHTML(place.description))
+        : 'No description available.';
 
-        const favClass = isFavorite(place.id) ? ' favorited' : '';
+    const priceStr = (typeof convertPrice === 'function')
+        ? convertPrice(place.price)
+        : '$' + Number(place.price).toFixed(2);
 
-        card.innerHTML = `
-            <button class="favorite-btn${favClass}" data-place-id="${place.id}" aria-label="Toggle favorite" onclick="handleFavoriteClick(event, this, '${place.id}')">
-                <svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M20.84 4.61a5.5 5.5 0 0 0-7.78 0L12 5.67l-1.06-1.06a5.5 5.5 0 0 0-7.78 7.78l1.06 1.06L12 21.23l7.78-7.78 1.06-1.06a5.5 5.5 0 0 0 0-7.78z"/></svg>
-            </button>
-            <h3>${escapeHTML(place.title)}</h3>
-            <p class="price">${priceStr} <span style="font-weight:400;font-size:0.85rem;color:#999">/ ${t('index.card.perNight')}</span></p>
-            <p>${desc}</p>
-            <a href="place.html?id=${place.id}" class="details-button">${t('index.card.viewDetails')}</a>
-        `;
+    const favClass = isFavorite(place.id) ? ' favorited' : '';
 
-        placesList.appendChild(card);
-    });
+    card.innerHTML = `
+        <button class="favorite-btn${favClass}" data-place-id="${place.id}" aria-label="Toggle favorite" onclick="handleFavoriteClick(event, this, '${place.id}')">
+            <svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M20.84 4.61a5.5 5.5 0 0 0-7.78 0L12 5.67l-1.06-1.06a5.5 5.5 0 0 0-7.78 7.78l1.06 1.06L12 21.23l7.78-7.78 1.06-1.06a5.5 5.5 0 0 0 0-7.78z"/></svg>
+        </button>
+        <h3>${escapeHTML(place.title)}</h3>
+        <p class="price">${priceStr} <span style="font-weight:400;font-size:0.85rem;color:#999">/ ${t('index.card.perNight')}</span></p>
+        <p>${desc}</p>
+        <a href="place.html?id=${place.id}" class="details-button">${t('index.card.viewDetails')}</a>
+    `;
+
+    return card;
 }
 
 /**
@@ -305,7 +384,7 @@ function handleFavoriteClick(evt, btn, placeId) {
 }
 
 /**
- * Filter displayed places by maximum price and search query
+ * Filter places by maximum price and search query on the server
  * @param {string} maxPrice - Maximum price value or "all"
  * @param {string} [searchQuery] - Optional text search
  */
@@ -313,29 +392,29 @@ function filterPlacesByPrice(maxPrice, searchQuery) {
     const placesList = document.getElementById('places-list');
     if (!placesList) return;
 
-    let filtered = allPlaces;
+    const filters = {};
 
     // Price filter
     if (maxPrice && maxPrice !== 'all') {
-        const max = parseFloat(maxPrice);
-        filtered = filtered.filter(place => place.price <= max);
+        filters.max_price = parseFloat(maxPrice);
     }
 
     // Search filter
     const query = searchQuery || (document.getElementById('search-input') ? document.getElementById('search-input').value : '');
     if (query && query.trim().length > 0) {
-        const q = query.trim().toLowerCase();
-        filtered = filtered.filter(place =>
-            (place.title && place.title.toLowerCase().includes(q)) ||
-            (place.description && place.description.toLowerCase().includes(q))
-        );
+        filters.q = query.trim();
     }
 
-    displayPlaces(filtered);
+    // Debounce so typing in the search box sends one request, not one per key
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(() => fetchPlaces(getToken(), filters), 250);
 }
 
 // ==================== PLACE DETAILS PAGE ====================
 
+// Last place loaded, so a currency change can re-render without a request
+let currentPlace = null;
+
 /**
  * Fetch and display details for a specific place
  * @param {string|null} token - JWT token (optional)
@@ -355,6 +434,7 @@ async function fetchPlaceDetails(token, placeId) {
 
         if (response.ok) {
             const place = await response.json();
+            currentPlace = place;
             displayPlaceDetails(place);
         } else {
             document.getElementById('place-details').innerHTML =
@@ -675,6 +755,12 @@ document.addEventListener('DOMContentLoaded', () => {
         // Fetch places regardless of authentication (public endpoint)
         fetchPlaces(token);
 
+        // Setup "load more" for the pages after the first
+        const loadMoreBtn = document.getElementById('load-more-btn');
+        if (loadMoreBtn) {
+            loadMoreBtn.addEventListener('click', loadMorePlaces);
+        }
+
         // Setup price filter
         const priceFilter = document.getElementById('price-filter');
         if (priceFilter) {
@@ -692,11 +778,9 @@ document.addEventListener('DOMContentLoaded', () => {
             });
         }
 
-        // Currency change callback — re-render cards
+        // Currency change callback — re-render the cards already loaded
         window.onCurrencyChange = function () {
-            const priceVal = document.getElementById('price-filter') ? document.getElementById('price-filter').value : 'all';
-            const searchVal = document.getElementById('search-input') ? document.getElementById('search-input').value : '';
-            filterPlacesByPrice(priceVal, searchVal);
+            displayPlaces(allPlaces);
         };
     }
 
@@ -735,9 +819,13 @@ document.addEventListener('DOMContentLoaded', () => {
         // Setup character counter for review textarea
         setupCharCounter('review-text', 1000);
 
-        // Currency change callback — re-fetch to re-render
+        // Currency change callback — re-render the place already loaded
         window.onCurrencyChange = function () {
-            fetchPlaceDetails(token, placeId);
+            if (currentPlace) {
+                displayPlaceDetails(currentPlace);
+            } else {
+                fetchPlaceDetails(token, placeId);
+            }
         };
     }
 